@@ -0,0 +1,130 @@
+# connection_manager.py: Shared MySQL and MongoDB connections of one conversion job, which are closed when the job completes.
+
+import os, threading, urllib.parse
+import mysql.connector
+import mysql.connector.pooling
+from mysql.connector.errors import PoolError
+from pymongo import MongoClient
+
+# Manager of the running conversion job, see ConnectionManager.open() and get_active_connection_manager().
+active_connection_manager = None
+
+def get_active_connection_manager():
+	"""
+	Get connection manager of the running conversion job, None if no job is running (connections are not shared then).
+	"""
+	return active_connection_manager
+
+def generate_mongodb_connection_string(conv_output_option):
+	username = urllib.parse.quote_plus(conv_output_option.username)
+	password = urllib.parse.quote_plus(conv_output_option.password)
+	return f"mongodb://{username}:{password}@{conv_output_option.host}:{conv_output_option.port}/"
+
+class ConnectionManager:
+	"""
+	Shared connections of one conversion job:
+		- One MongoClient per MongoDB server, keyed by ConvOutputOption (host, username, password, port). MongoClient pools its own connections.
+		- One mysql.connector connection pool per MySQL database, keyed by ConvInitOption (host, username, password, port, dbname).
+	Clients and pools are created on first use. A forked worker process does not use clients and pools of its parent, it creates its own.
+	Params:
+		mongodb_pool_size: Maximum number of connections of each MongoClient (maxPoolSize).
+		mysql_pool_size: Number of connections of each MySQL connection pool (at most 32). 0 means MySQL connections are not pooled.
+	Usage:
+		connection_manager = ConnectionManager(...).open()
+		... open_connection_mysql() and open_connection_mongodb() (see utilities.py) share connections of the manager
+		connection_manager.close()
+	"""
+	def __init__(self, mongodb_pool_size = 100, mysql_pool_size = 5):
+		super(ConnectionManager, self).__init__()
+		self.mongodb_pool_size = mongodb_pool_size
+		self.mysql_pool_size = min(mysql_pool_size, mysql.connector.pooling.CNX_POOL_MAXSIZE)
+		self.lock = threading.Lock()
+		self.pid = os.getpid()
+		self.mongodb_client_dict = {}
+		self.mysql_connection_pool_dict = {}
+
+	def __enter__(self):
+		return self.open()
+
+	def __exit__(self, *args):
+		self.close()
+
+	def open(self):
+		"""
+		Make this manager the one of the running job, so connections which are opened afterward are shared.
+		"""
+		global active_connection_manager
+		active_connection_manager = self
+		return self
+
+	def __check_process(self):
+		# Clients and pools which were inherited from parent process belong to it, they are neither used nor closed here.
+		if self.pid != os.getpid():
+			self.pid = os.getpid()
+			self.mongodb_client_dict = {}
+			self.mysql_connection_pool_dict = {}
+
+	def get_mongodb_client(self, conv_output_option):
+		"""
+		Get shared MongoClient of MongoDB server which conv_output_option (instance of class ConvOutputOption) specifies.
+		"""
+		key = (conv_output_option.host, conv_output_option.username, conv_output_option.password, conv_output_option.port)
+		with self.lock:
+			self.__check_process()
+			mongo_client = self.mongodb_client_dict.get(key)
+			if mongo_client is None:
+				mongo_client = MongoClient(generate_mongodb_connection_string(conv_output_option), maxPoolSize = self.mongodb_pool_size)
+				self.mongodb_client_dict[key] = mongo_client
+		return mongo_client
+
+	def get_mysql_connection(self, conv_init_option):
+		"""
+		Get a connection from shared pool of MySQL database which conv_init_option (instance of class ConvInitOption) specifies,
+		closing it gives it back to the pool.
+		Return None if pool is exhausted or connections are not pooled.
+		"""
+		if self.mysql_pool_size <= 0:
+			return None
+		key = (conv_init_option.host, conv_init_option.username, conv_init_option.password, conv_init_option.port, conv_init_option.dbname)
+		with self.lock:
+			self.__check_process()
+			connection_pool = self.mysql_connection_pool_dict.get(key)
+			if connection_pool is None:
+				connection_pool = mysql.connector.pooling.MySQLConnectionPool(
+					pool_name = f"mysql2mongodb_{len(self.mysql_connection_pool_dict)}_{os.getpid()}",
+					pool_size = self.mysql_pool_size,
+					host = conv_init_option.host,
+					user = conv_init_option.username,
+					password = conv_init_option.password,
+					database = conv_init_option.dbname,
+					auth_plugin='mysql_native_password'
+				)
+				self.mysql_connection_pool_dict[key] = connection_pool
+				print(f"Create MySQL connection pool of {self.mysql_pool_size} connections to database {conv_init_option.dbname}.")
+		try:
+			return connection_pool.get_connection()
+		except PoolError:
+			return None
+
+	def close(self):
+		"""
+		Close shared MongoClients and idle connections of MySQL pools (of current process), then stop sharing connections.
+		Connections which are still in use are closed by their users.
+		"""
+		global active_connection_manager
+		if active_connection_manager is self:
+			active_connection_manager = None
+		with self.lock:
+			self.__check_process()
+			for mongo_client in self.mongodb_client_dict.values():
+				mongo_client.close()
+			for connection_pool in self.mysql_connection_pool_dict.values():
+				# Take every idle connection out of pool and disconnect it, so it is not given back.
+				while True:
+					try:
+						connection = connection_pool.get_connection()
+					except mysql.connector.Error:
+						break
+					connection.disconnect()
+			self.mongodb_client_dict = {}
+			self.mysql_connection_pool_dict = {}
@@ -26,5 +26,106 @@ class ConvOutputOption:
 		self.password = password
 		self.port = port
 		# self.dbtype = dbtype = "MongoDB"
-		self.dbname = dbname		
-		
\ No newline at end of file
+		self.dbname = dbname
+
+class ConvProcessOption:
+	"""
+	Class Conversion Process Option.
+	This class holds tuning options of conversion processes, which do not depend on any connection.
+		- migration_chunk_size: Number of rows which are fetched from MySQL, converted and written to MongoDB at once while migrating a table.
+			Documents are loaded from MongoDB and written back to MySQL (for validation) by chunks of the same size.
+		- migration_workers: Maximum number of tables which are migrated concurrently. 1 means sequential migration.
+		- migration_pool_type: "process" or "thread", kind of worker pool which is used for concurrent migration.
+		- migration_partition_workers: Maximum number of primary key slices of one table which are migrated concurrently. 1 means tables are not split.
+		- migration_partition_rows: Expected number of rows per primary key slice.
+		- insert_batch_size: Maximum number of documents per MongoDB insert batch.
+		- insert_batch_bytes: Maximum BSON size (in bytes) per MongoDB insert batch.
+		- insert_max_in_flight: Maximum number of insert batches which are sent to MongoDB concurrently.
+		- relation_conversion_mode: How relations are converted to references:
+			"lookup": one $lookup + $merge aggregation per relation, data never leaves MongoDB (MongoDB 4.4 or newer).
+			"bulk": stream referenced keys and send unordered bulk_write batches of UpdateMany operations (for MongoDB without $merge).
+			"update": load referenced collection and send one update_many per referenced key.
+		- relation_bulk_batch_size: Number of UpdateMany operations per bulk_write batch in "bulk" mode.
+		- relation_workers: Maximum number of relations which are converted concurrently. Relations which write into the same collection are always converted one by one.
+		- schema_workers: Maximum number of collections which are created (with their schema validators) or indexed concurrently.
+		- constraint_mode: When schema validators and secondary indexes are created:
+			"before-load": collections are created with validators and indexed before data is migrated, every insert is validated and maintains indexes.
+			"after-load": bare collections are created, data is migrated, then indexes are built and validators are attached,
+				existing documents are validated offline (invalid documents are reported, not rejected).
+		- schema_backend: How MySQL schema is introspected:
+			"schemacrawler": run SchemaCrawler (JVM) and import the JSON file it serialized.
+			"information_schema": read INFORMATION_SCHEMA in a few bulk queries, in process. The schema document has the same shape.
+		- schema_cache: If True, converted schema, validators and index plan are cached by fingerprint of MySQL schema definition,
+			and reused (instead of introspecting again) when the same schema is converted later.
+		- schema_cache_dbname: Name of MongoDB database which stores schema cache, it must not be a target database.
+		- mongodb_pool_size: Maximum number of connections of the MongoClient which is shared by a conversion job.
+		- mysql_pool_size: Number of connections of each MySQL connection pool (at most 32). 0 means MySQL connections are not pooled.
+		- input_mode: How data of uploaded mysqldump file is read:
+			"mysql": whole dump is restored into a MySQL staging database, then tables are selected from it.
+			"dump": only definitions (tables, views, triggers) are restored into MySQL, rows of INSERT statements are parsed from the dump
+				and written to MongoDB directly. Dumps which parser does not handle are staged through MySQL ("mysql" mode) instead.
+				Data is not staged in MySQL, so validation_mode does not apply: dump is parsed again and compared with MongoDB directly.
+		- restore_workers: Number of mysql clients which restore table sections of dump concurrently, when dump is staged through MySQL.
+			1 means dump is restored as a whole by one client.
+		- download_chunk_size: Size (in bytes) of chunks which source dump is downloaded (and hashed) by.
+		- download_timeout: Seconds without any data from server, after which download is resumed by a new request.
+		- download_retries: Maximum number of consecutive attempts to resume an interrupted download.
+		- download_streaming: If True, dump is restored (by one mysql client) or parsed ("dump" input mode) while it is being downloaded,
+			instead of after download completes.
+		- validation_mode: How converted data is validated:
+			"round-trip": documents are converted back into MySQL database <dbname>_validated, which is compared with original database.
+			"direct": rows of every table are compared with documents of its collection, both streamed in primary key order,
+				nothing is written to MySQL.
+			"sample": exact row counts and a sample of rows of every table are compared directly, a table is validated fully
+				only if its sample finds a mismatch.
+		- validation_load_mode: How documents are loaded back into MySQL in "round-trip" validation mode:
+			"insert": one batched INSERT (executemany) per chunk.
+			"load-data": every chunk is written to a temporary tab-separated file and loaded by LOAD DATA LOCAL INFILE,
+				with unique and foreign key checks disabled. Server must allow it (local_infile = ON), otherwise rows are inserted.
+		- validation_chunk_rows: Expected number of rows per primary key slice, which checksums of original and validated tables are compared by.
+			Rows are compared only in slices which checksums differ.
+		- validation_sample_rows: Number of rows per table which are compared in "sample" validation mode.
+		- validation_sample_method: How rows are sampled by primary key in "sample" validation mode:
+			"random": uniformly random keys (ORDER BY RAND() on primary key).
+			"stratified": one key per stratum of primary key, by index seeks (for integer keys) or keyset pages.
+		- validation_confidence: Confidence of mismatch rate upper bound, which is logged for tables which random sample has no mismatch.
+	"""
+	def __init__(self, migration_chunk_size = 10000, migration_workers = 1, migration_pool_type = "process", migration_partition_workers = 1, migration_partition_rows = 500000,
+		insert_batch_size = 1000, insert_batch_bytes = 16 * 1024 * 1024, insert_max_in_flight = 1, relation_conversion_mode = "lookup", relation_bulk_batch_size = 1000,
+		relation_workers = 1, schema_workers = 1, constraint_mode = "before-load",
+		schema_backend = "schemacrawler", schema_cache = False, schema_cache_dbname = "mysql2mongodb_schema_cache",
+		mongodb_pool_size = 100, mysql_pool_size = 5, input_mode = "mysql", restore_workers = 1,
+		download_chunk_size = 1024 * 1024, download_timeout = 60, download_retries = 5, download_streaming = False,
+		validation_mode = "round-trip", validation_load_mode = "insert", validation_chunk_rows = 100000,
+		validation_sample_rows = 1000, validation_sample_method = "random", validation_confidence = 0.95):
+		super(ConvProcessOption, self).__init__()
+		self.migration_chunk_size = migration_chunk_size
+		self.migration_workers = migration_workers
+		self.migration_pool_type = migration_pool_type
+		self.migration_partition_workers = migration_partition_workers
+		self.migration_partition_rows = migration_partition_rows
+		self.insert_batch_size = insert_batch_size
+		self.insert_batch_bytes = insert_batch_bytes
+		self.insert_max_in_flight = insert_max_in_flight
+		self.relation_conversion_mode = relation_conversion_mode
+		self.relation_bulk_batch_size = relation_bulk_batch_size
+		self.relation_workers = relation_workers
+		self.schema_workers = schema_workers
+		self.constraint_mode = constraint_mode
+		self.schema_backend = schema_backend
+		self.schema_cache = schema_cache
+		self.schema_cache_dbname = schema_cache_dbname
+		self.mongodb_pool_size = mongodb_pool_size
+		self.mysql_pool_size = mysql_pool_size
+		self.input_mode = input_mode
+		self.restore_workers = restore_workers
+		self.download_chunk_size = download_chunk_size
+		self.download_timeout = download_timeout
+		self.download_retries = download_retries
+		self.download_streaming = download_streaming
+		self.validation_mode = validation_mode
+		self.validation_load_mode = validation_load_mode
+		self.validation_chunk_rows = validation_chunk_rows
+		self.validation_sample_rows = validation_sample_rows
+		self.validation_sample_method = validation_sample_method
+		self.validation_confidence = validation_confidence
@@ -0,0 +1,128 @@
+# direct_validation.py: Compare MySQL rows with MongoDB documents directly, by a merge-join of both streams in primary key order.
+
+from collections import Counter
+from datetime import datetime
+from bson.decimal128 import Decimal128
+from ckanext.mysql2mongodb.data_conv.table_checksum import format_logged_key
+
+# Maximum number of keys which are logged per kind of difference and table, the rest is only counted.
+MAX_LOGGED_DIFFERENCES = 1000
+
+def normalize_value(value):
+	"""
+	Normalize value of a converted row or a loaded document, so both compare equal when document stores row correctly:
+	Decimal128 as Decimal, arrays as tuples, datetime truncated to milliseconds (precision of BSON dates).
+	"""
+	dtype = type(value)
+	if dtype is Decimal128:
+		return value.to_decimal()
+	elif dtype is list or dtype is tuple:
+		return tuple([normalize_value(item) for item in value])
+	elif dtype is datetime:
+		return value.replace(microsecond=value.microsecond // 1000 * 1000)
+	elif dtype is dict:
+		return tuple(sorted([(key, normalize_value(item)) for key, item in value.items()]))
+	return value
+
+def normalize_document(doc):
+	"""
+	Normalize document (a converted row, see RowConverter, or a document loaded from MongoDB without "_id"), NULL fields are omitted.
+	"""
+	return {key: normalize_value(value) for key, value in doc.items() if value is not None}
+
+class TableDifference:
+	"""
+	Differences between rows of a MySQL table and documents of its collection.
+		- rows: Number of rows, documents: number of documents.
+		- missing: Rows which have no document, extra: documents which have no row, mismatched: documents which differ from their rows.
+	Keys of differences are logged up to MAX_LOGGED_DIFFERENCES per kind, all of them are counted.
+	"""
+	def __init__(self, table_name):
+		super(TableDifference, self).__init__()
+		self.table_name = table_name
+		self.rows = 0
+		self.documents = 0
+		self.difference_count_dict = {"missing": 0, "extra": 0, "mismatched": 0}
+		self.difference_key_dict = {"missing": [], "extra": [], "mismatched": []}
+
+	def add(self, difference, key):
+		self.difference_count_dict[difference] = self.difference_count_dict[difference] + 1
+		if len(self.difference_key_dict[difference]) < MAX_LOGGED_DIFFERENCES:
+			self.difference_key_dict[difference].append(format_logged_key(key) if key is not None else None)
+
+	def has_difference(self):
+		return any(count > 0 for count in self.difference_count_dict.values())
+
+	def to_log(self):
+		log_data = {"table-name": self.table_name, "rows": self.rows, "documents": self.documents}
+		for difference in self.difference_count_dict.keys():
+			log_data[difference] = self.difference_key_dict[difference]
+			log_data[f"{difference}-count"] = self.difference_count_dict[difference]
+		return log_data
+
+def merge_join_documents(table_name, row_docs, collection_docs, key_columns):
+	"""
+	Compare converted rows of table (row_docs) with documents of its collection (collection_docs), both iterables of documents.
+	Both sides should be in primary key order, then each row meets its document at once and memory stays flat.
+	Sort orders of MySQL (collation) and MongoDB may differ for string keys, so rows and documents which were not met yet
+	wait in pending dicts until the other side reaches their key, nothing is reported wrongly, only memory grows.
+	Tables without primary key are compared as multisets of documents, which are held in memory.
+	Return TableDifference.
+	"""
+	table_difference = TableDifference(table_name)
+	if len(key_columns) == 0:
+		row_counter = Counter()
+		for doc in row_docs:
+			table_difference.rows = table_difference.rows + 1
+			row_counter[repr(sorted(normalize_document(doc).items()))] += 1
+		collection_counter = Counter()
+		for doc in collection_docs:
+			table_difference.documents = table_difference.documents + 1
+			collection_counter[repr(sorted(normalize_document(doc).items()))] += 1
+		for difference, counter in [("missing", row_counter - collection_counter), ("extra", collection_counter - row_counter)]:
+			for _ in range(sum(counter.values())):
+				table_difference.add(difference, None)
+		return table_difference
+
+	pending_rows = {}
+	pending_docs = {}
+
+	def get_key(doc):
+		return tuple([normalize_value(doc.get(col_name)) for col_name in key_columns])
+
+	row_iterator = iter(row_docs)
+	doc_iterator = iter(collection_docs)
+	row_doc = next(row_iterator, None)
+	collection_doc = next(doc_iterator, None)
+	while row_doc is not None or collection_doc is not None:
+		if row_doc is not None:
+			table_difference.rows = table_difference.rows + 1
+			row_doc = normalize_document(row_doc)
+			row_key = get_key(row_doc)
+		if collection_doc is not None:
+			table_difference.documents = table_difference.documents + 1
+			collection_doc = normalize_document(collection_doc)
+			collection_key = get_key(collection_doc)
+		if row_doc is not None and collection_doc is not None and row_key == collection_key:
+			if row_doc != collection_doc:
+				table_difference.add("mismatched", row_key)
+		else:
+			if row_doc is not None:
+				matched_doc = pending_docs.pop(row_key, None)
+				if matched_doc is None:
+					pending_rows[row_key] = row_doc
+				elif matched_doc != row_doc:
+					table_difference.add("mismatched", row_key)
+			if collection_doc is not None:
+				matched_row = pending_rows.pop(collection_key, None)
+				if matched_row is None:
+					pending_docs[collection_key] = collection_doc
+				elif matched_row != collection_doc:
+					table_difference.add("mismatched", collection_key)
+		row_doc = next(row_iterator, None)
+		collection_doc = next(doc_iterator, None)
+	for key in pending_rows.keys():
+		table_difference.add("missing", key)
+	for key in pending_docs.keys():
+		table_difference.add("extra", key)
+	return table_difference
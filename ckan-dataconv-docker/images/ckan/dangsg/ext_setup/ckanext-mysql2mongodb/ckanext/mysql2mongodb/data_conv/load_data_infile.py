@@ -0,0 +1,91 @@
+# load_data_infile.py: Load rows into MySQL tables by LOAD DATA LOCAL INFILE, from tab-separated files which rows are written to.
+
+import os, tempfile
+from datetime import date, datetime, timedelta
+
+# Errors which mean LOAD DATA LOCAL is disabled, by server (local_infile = OFF) or by client, so rows must be inserted instead.
+LOAD_DATA_LOCAL_DISABLED_ERRNO_LIST = (1148, 2068, 3948)
+
+# Bytes which are escaped in fields, ESCAPED BY '\\' turns them back.
+LOAD_DATA_ESCAPE_LIST = [(b"\\", b"\\\\"), (b"\t", b"\\t"), (b"\n", b"\\n"), (b"\0", b"\\0")]
+
+def format_load_data_time(cell_data):
+	"""
+	Format timedelta as MySQL TIME, which may be longer than one day or negative, e.g. "-838:59:59".
+	"""
+	sign = "-" if cell_data < timedelta(0) else ""
+	cell_data = abs(cell_data)
+	total_seconds = cell_data.days * 86400 + cell_data.seconds
+	return f"{sign}{total_seconds // 3600}:{total_seconds % 3600 // 60:02d}:{total_seconds % 60:02d}.{cell_data.microseconds:06d}"
+
+def format_load_data_cell(cell_data):
+	"""
+	Format cell of a row as field of a LOAD DATA file (bytes), NULL is \\N.
+	"""
+	if cell_data is None:
+		return b"\\N"
+	dtype = type(cell_data)
+	if dtype is bytes or dtype is bytearray:
+		field = bytes(cell_data)
+	elif dtype is str:
+		field = cell_data.encode("utf-8", errors="surrogateescape")
+	elif dtype is bool:
+		return b"1" if cell_data else b"0"
+	elif dtype is datetime:
+		return cell_data.isoformat(sep=" ").encode("ascii")
+	elif dtype is date:
+		return cell_data.isoformat().encode("ascii")
+	elif dtype is timedelta:
+		return format_load_data_time(cell_data).encode("ascii")
+	elif dtype is float:
+		return repr(cell_data).encode("ascii")
+	else:
+		field = str(cell_data).encode("utf-8")
+	for char, escaped_char in LOAD_DATA_ESCAPE_LIST:
+		if char in field:
+			field = field.replace(char, escaped_char)
+	return field
+
+def write_load_data_file(rows, file):
+	"""
+	Write rows (Iterable of Tuple(<cell>, ...)) to binary file, one line per row, fields separated by tab.
+	"""
+	for row in rows:
+		file.write(b"\t".join([format_load_data_cell(cell_data) for cell_data in row]) + b"\n")
+
+def generate_sql_loading_data(table_name, columns_name_list, geometry_columns_name_list = ()):
+	"""
+	Generate LOAD DATA LOCAL INFILE statement of table, with "{file_path}" placeholder for path of file.
+	Geometry columns are read as WKT into user variables, and set by ST_GeomFromText().
+	File has binary character set, so bytes of fields are stored as they were written (text is written as UTF-8).
+	"""
+	column_sql_list = []
+	set_sql_list = []
+	for col_idx, col_name in enumerate(columns_name_list):
+		if col_name in geometry_columns_name_list:
+			column_sql_list.append(f"@col_{col_idx}")
+			set_sql_list.append(f"`{col_name}` = ST_GeomFromText(@col_{col_idx})")
+		else:
+			column_sql_list.append(f"`{col_name}`")
+	sql = f"""LOAD DATA LOCAL INFILE '{{file_path}}' IGNORE INTO TABLE {table_name} CHARACTER SET binary FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' ({", ".join(column_sql_list)})"""
+	if len(set_sql_list) > 0:
+		sql = sql + " SET " + ", ".join(set_sql_list)
+	return sql
+
+def load_rows_into_table(mysql_connection, sql_loading_data, rows):
+	"""
+	Write rows to a temporary file and load it by LOAD DATA LOCAL INFILE statement (see generate_sql_loading_data()), then commit.
+	File is removed after loading, so at most one chunk of rows is on disk at a time.
+	"""
+	file_descriptor, file_path = tempfile.mkstemp(prefix="mysql2mongodb_", suffix=".tsv")
+	try:
+		with os.fdopen(file_descriptor, "wb") as f:
+			write_load_data_file(rows, f)
+		mycursor = mysql_connection.cursor()
+		try:
+			mycursor.execute(sql_loading_data.replace("{file_path}", file_path.replace("\\", "\\\\").replace("'", "\\'")))
+		finally:
+			mycursor.close()
+		mysql_connection.commit()
+	finally:
+		os.remove(file_path)
@@ -0,0 +1,347 @@
+# schema_introspection.py: Native MySQL schema introspection, which reads INFORMATION_SCHEMA in a few bulk queries
+# and produces the same schema document shape as SchemaCrawler "serialize" command.
+
+import hashlib, json, uuid
+from datetime import datetime
+
+# Namespace of generated uuids. Uuids are derived from object names, so introspecting the same schema twice gives the same document.
+SCHEMA_UUID_NAMESPACE = uuid.UUID("6f1c2a3e-0d5b-4c8e-9a7f-3b2e1d4c5a60")
+
+SQL_FETCH_TABLES = """SELECT TABLE_NAME, TABLE_TYPE, ENGINE, TABLE_COLLATION, TABLE_ROWS, AVG_ROW_LENGTH, DATA_LENGTH, MAX_DATA_LENGTH, INDEX_LENGTH, DATA_FREE, AUTO_INCREMENT, ROW_FORMAT, CREATE_TIME, TABLE_COMMENT
+	FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = %s ORDER BY TABLE_TYPE, TABLE_NAME"""
+SQL_FETCH_COLUMNS = """SELECT TABLE_NAME, COLUMN_NAME, ORDINAL_POSITION, COLUMN_DEFAULT, IS_NULLABLE, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, NUMERIC_SCALE,
+		CHARACTER_SET_NAME, COLLATION_NAME, COLUMN_TYPE, EXTRA, COLUMN_COMMENT, GENERATION_EXPRESSION
+	FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_SCHEMA = %s ORDER BY TABLE_NAME, ORDINAL_POSITION"""
+SQL_FETCH_INDEXES = """SELECT TABLE_NAME, INDEX_NAME, NON_UNIQUE, SEQ_IN_INDEX, COLUMN_NAME, INDEX_TYPE, CARDINALITY
+	FROM INFORMATION_SCHEMA.STATISTICS WHERE TABLE_SCHEMA = %s ORDER BY TABLE_NAME, INDEX_NAME <> 'PRIMARY', INDEX_NAME, SEQ_IN_INDEX"""
+SQL_FETCH_FOREIGN_KEYS = """SELECT KCU.CONSTRAINT_NAME, KCU.TABLE_NAME, KCU.COLUMN_NAME, KCU.ORDINAL_POSITION, KCU.REFERENCED_TABLE_NAME, KCU.REFERENCED_COLUMN_NAME, RC.UPDATE_RULE, RC.DELETE_RULE
+	FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE KCU
+	JOIN INFORMATION_SCHEMA.REFERENTIAL_CONSTRAINTS RC ON RC.CONSTRAINT_SCHEMA = KCU.CONSTRAINT_SCHEMA AND RC.CONSTRAINT_NAME = KCU.CONSTRAINT_NAME AND RC.TABLE_NAME = KCU.TABLE_NAME
+	WHERE KCU.TABLE_SCHEMA = %s AND KCU.REFERENCED_TABLE_SCHEMA = KCU.TABLE_SCHEMA
+	ORDER BY KCU.TABLE_NAME, KCU.CONSTRAINT_NAME, KCU.ORDINAL_POSITION"""
+SQL_FETCH_TRIGGERS = """SELECT TRIGGER_NAME, EVENT_MANIPULATION, EVENT_OBJECT_TABLE, ACTION_ORDER, ACTION_CONDITION, ACTION_STATEMENT, ACTION_ORIENTATION, ACTION_TIMING
+	FROM INFORMATION_SCHEMA.TRIGGERS WHERE TRIGGER_SCHEMA = %s ORDER BY EVENT_OBJECT_TABLE, ACTION_TIMING, EVENT_MANIPULATION, ACTION_ORDER"""
+
+def generate_uuid(*names):
+	return str(uuid.uuid5(SCHEMA_UUID_NAMESPACE, "/".join(map(str, names))))
+
+def decode_cell(cell_data):
+	"""
+	MySQL connector returns some INFORMATION_SCHEMA columns of MySQL 8 (COLUMN_TYPE, COLUMN_DEFAULT, ...) as bytes.
+	Datetime values are converted to epoch milliseconds, as SchemaCrawler does, so the document can be serialized as JSON.
+	"""
+	if type(cell_data) in [bytes, bytearray]:
+		return cell_data.decode("utf-8")
+	if type(cell_data) is datetime:
+		return int(cell_data.timestamp() * 1000)
+	return cell_data
+
+def fetch_information_schema(mysql_cursor, sql, dbname):
+	mysql_cursor.execute(sql, (dbname,))
+	return [tuple(map(decode_cell, row)) for row in mysql_cursor.fetchall()]
+
+def generate_column_width(data_type, character_maximum_length, numeric_precision, numeric_scale):
+	"""
+	Column width, like SchemaCrawler: "(<length>)" for character types, "(<precision>, <scale>)" for decimal types, otherwise "".
+	"""
+	if data_type in ["decimal", "numeric"]:
+		return f"({numeric_precision}, {numeric_scale})"
+	if character_maximum_length is not None and data_type not in ["binary", "varbinary", "tinyblob", "blob", "mediumblob", "longblob", "geometry"]:
+		return f"({character_maximum_length})"
+	return ""
+
+def introspect_mysql_schema(mysql_connection, dbname, product_version = None):
+	"""
+	Introspect MySQL database <dbname> from INFORMATION_SCHEMA (TABLES, COLUMNS, STATISTICS, KEY_COLUMN_USAGE, REFERENTIAL_CONSTRAINTS, TRIGGERS).
+	Return schema document which has the same shape as SchemaCrawler one:
+		Dict(
+			"@uuid": <schema uuid>,
+			"all-table-columns": List[<column schema>],
+			"catalog": Dict(
+				"name": <database name>,
+				"database-info": Dict("product-name": "MySQL", "product-version": <MySQL version>),
+				"column-data-types": List[<data type uuid>],
+				"system-column-data-types": List[<data type schema>],
+				"tables": List[<table schema>]
+			)
+		)
+	Like SchemaCrawler, an object is serialized once and referenced by its uuid afterward (table types, foreign keys of referenced tables),
+	primary keys are referenced by uuid of index "PRIMARY" and "remarks" of a table is its comment ("VIEW" for views).
+	Only fields which are used by conversion are filled.
+	"""
+	mysql_cursor = mysql_connection.cursor()
+	if product_version is None:
+		mysql_cursor.execute("SELECT VERSION()")
+		product_version = decode_cell(mysql_cursor.fetchone()[0])
+	table_rows = fetch_information_schema(mysql_cursor, SQL_FETCH_TABLES, dbname)
+	column_rows = fetch_information_schema(mysql_cursor, SQL_FETCH_COLUMNS, dbname)
+	index_rows = fetch_information_schema(mysql_cursor, SQL_FETCH_INDEXES, dbname)
+	foreign_key_rows = fetch_information_schema(mysql_cursor, SQL_FETCH_FOREIGN_KEYS, dbname)
+	trigger_rows = fetch_information_schema(mysql_cursor, SQL_FETCH_TRIGGERS, dbname)
+	mysql_cursor.close()
+
+	# Data types
+	data_types_dict = {}
+	# Columns
+	all_table_columns = []
+	columns_dict = {}
+	table_columns_dict = {}
+	for table_name, col_name, ordinal_position, default_value, is_nullable, data_type, character_maximum_length, numeric_precision, numeric_scale, \
+			character_set_name, collation_name, column_type, extra, column_comment, generation_expression in column_rows:
+		data_type_name = data_type.upper() + (" UNSIGNED" if "unsigned" in column_type else "")
+		if data_type_name not in data_types_dict:
+			data_types_dict[data_type_name] = {
+				"@uuid": generate_uuid(dbname, "data-type", data_type_name),
+				"name": data_type_name,
+				"full-name": data_type_name,
+				"database-specific-type-name": data_type.upper(),
+				"enumerated": data_type in ["enum", "set"],
+				"literal-prefix": "'" if character_set_name is not None else "",
+				"literal-suffix": "'" if character_set_name is not None else "",
+				"unsigned": "unsigned" in column_type,
+			}
+		column_schema = {
+			"@uuid": generate_uuid(dbname, "column", table_name, col_name),
+			"name": col_name,
+			"short-name": f"{table_name}.{col_name}",
+			"full-name": f"{dbname}.{table_name}.{col_name}",
+			"attributes": {
+				"CHARACTER_SET_NAME": character_set_name,
+				"COLLATION_NAME": collation_name,
+				"COLUMN_COMMENT": column_comment,
+				"COLUMN_TYPE": column_type,
+				"GENERATION_EXPRESSION": generation_expression,
+				"IS_NULLABLE": is_nullable,
+			},
+			"auto-incremented": "auto_increment" in extra,
+			"column-data-type": data_types_dict[data_type_name]["@uuid"],
+			"decimal-digits": numeric_scale if numeric_scale is not None else 0,
+			"default-value": default_value,
+			"generated": generation_expression not in [None, ""],
+			"hidden": False,
+			"nullable": is_nullable == "YES",
+			"ordinal-position": ordinal_position,
+			"part-of-foreign-key": False,
+			"part-of-index": False,
+			"part-of-primary-key": False,
+			"part-of-unique-index": False,
+			"remarks": column_comment,
+			"size": character_maximum_length if character_maximum_length is not None else (numeric_precision if numeric_precision is not None else 0),
+			"width": generate_column_width(data_type, character_maximum_length, numeric_precision, numeric_scale),
+		}
+		all_table_columns.append(column_schema)
+		columns_dict[(table_name, col_name)] = column_schema
+		table_columns_dict.setdefault(table_name, []).append(column_schema["@uuid"])
+
+	# Indexes, one row per index column
+	table_indexes_dict = {}
+	indexes_dict = {}
+	for table_name, index_name, non_unique, seq_in_index, col_name, index_type, cardinality in index_rows:
+		if (table_name, index_name) not in indexes_dict:
+			index_schema = {
+				"@uuid": generate_uuid(dbname, "index", table_name, index_name),
+				"name": index_name,
+				"short-name": f"{table_name}.{index_name}",
+				"full-name": f"{dbname}.{table_name}.{index_name}",
+				"attributes": {
+					"INDEX_TYPE": index_type,
+					"TABLE_NAME": table_name,
+				},
+				"cardinality": cardinality,
+				"columns": [],
+				"definition": "",
+				"index-type": "other",
+				"unique": int(non_unique) == 0,
+			}
+			indexes_dict[(table_name, index_name)] = index_schema
+			table_indexes_dict.setdefault(table_name, []).append(index_schema)
+		index_schema = indexes_dict[(table_name, index_name)]
+		# Functional key parts (MySQL 8.0.13 or newer) have no column.
+		if col_name is not None and (table_name, col_name) in columns_dict:
+			column_schema = columns_dict[(table_name, col_name)]
+			index_schema["columns"].append(column_schema["@uuid"])
+			column_schema["part-of-index"] = True
+			if index_schema["unique"]:
+				column_schema["part-of-unique-index"] = True
+			if index_name == "PRIMARY":
+				column_schema["part-of-primary-key"] = True
+
+	# Foreign keys, one row per foreign key column
+	foreign_key_list = []
+	foreign_keys_dict = {}
+	for constraint_name, table_name, col_name, ordinal_position, referenced_table_name, referenced_col_name, update_rule, delete_rule in foreign_key_rows:
+		if (table_name, col_name) not in columns_dict or (referenced_table_name, referenced_col_name) not in columns_dict:
+			continue
+		if (table_name, constraint_name) not in foreign_keys_dict:
+			foreign_key_schema = {
+				"@uuid": generate_uuid(dbname, "foreign-key", table_name, constraint_name),
+				"name": constraint_name,
+				"full-name": constraint_name,
+				"column-references": [],
+				"constraint-type": "foreign_key",
+				"definition": "",
+				"delete-rule": delete_rule.lower(),
+				"specific-name": constraint_name,
+				"update-rule": update_rule.lower(),
+			}
+			foreign_keys_dict[(table_name, constraint_name)] = foreign_key_schema
+			foreign_key_list.append((table_name, referenced_table_name, foreign_key_schema))
+		foreign_key_schema = foreign_keys_dict[(table_name, constraint_name)]
+		foreign_key_schema["column-references"].append({
+			"@uuid": generate_uuid(dbname, "column-reference", table_name, constraint_name, ordinal_position),
+			"foreign-key-column": columns_dict[(table_name, col_name)]["@uuid"],
+			"key-sequence": ordinal_position,
+			"primary-key-column": columns_dict[(referenced_table_name, referenced_col_name)]["@uuid"],
+		})
+		columns_dict[(table_name, col_name)]["part-of-foreign-key"] = True
+	# Like SchemaCrawler, a foreign key belongs to both referencing and referenced tables.
+	table_foreign_keys_dict = {}
+	table_constraints_dict = {}
+	for table_name, referenced_table_name, foreign_key_schema in foreign_key_list:
+		table_foreign_keys_dict.setdefault(table_name, []).append(foreign_key_schema)
+		if referenced_table_name != table_name:
+			table_foreign_keys_dict.setdefault(referenced_table_name, []).append(foreign_key_schema)
+		table_constraints_dict.setdefault(table_name, []).append({
+			"@uuid": generate_uuid(dbname, "table-constraint", table_name, foreign_key_schema["name"]),
+			"name": foreign_key_schema["name"],
+			"short-name": f"{table_name}.{foreign_key_schema['name']}",
+			"full-name": f"{dbname}.{table_name}.{foreign_key_schema['name']}",
+			"columns": [],
+			"constraint-type": "foreign_key",
+			"definition": "",
+			"type": "foreign_key",
+		})
+
+	# Triggers
+	table_triggers_dict = {}
+	for trigger_name, event_manipulation, table_name, action_order, action_condition, action_statement, action_orientation, action_timing in trigger_rows:
+		table_triggers_dict.setdefault(table_name, []).append({
+			"@uuid": generate_uuid(dbname, "trigger", table_name, trigger_name),
+			"name": trigger_name,
+			"short-name": f"{table_name}.{trigger_name}",
+			"full-name": f"{dbname}.{table_name}.{trigger_name}",
+			"action-condition": action_condition if action_condition is not None else "",
+			"action-order": action_order,
+			"action-orientation": action_orientation.lower(),
+			"action-statement": action_statement,
+			"condition-timing": action_timing.lower(),
+			"event-manipulation-type": event_manipulation.lower(),
+		})
+
+	# Tables
+	tables_schema = []
+	serialized_uuid_set = set()
+	def serialize_once(obj):
+		if obj["@uuid"] in serialized_uuid_set:
+			return obj["@uuid"]
+		serialized_uuid_set.add(obj["@uuid"])
+		return obj
+	for table_name, table_type, engine, table_collation, table_rows_num, avg_row_length, data_length, max_data_length, index_length, data_free, \
+			auto_increment, row_format, create_time, table_comment in table_rows:
+		table_type = "VIEW" if table_type == "VIEW" else "TABLE"
+		table_type_schema = {
+			"@uuid": generate_uuid(dbname, "table-type", table_type),
+			"table-type": table_type,
+			"view": table_type == "VIEW",
+		}
+		indexes = table_indexes_dict.get(table_name, [])
+		primary_key = next(filter(lambda index_schema: index_schema["name"] == "PRIMARY", indexes), None)
+		tables_schema.append({
+			"@uuid": generate_uuid(dbname, "table", table_name),
+			"name": table_name,
+			"full-name": f"{dbname}.{table_name}",
+			"attributes": {
+				"AUTO_INCREMENT": auto_increment,
+				"AVG_ROW_LENGTH": avg_row_length,
+				"CREATE_TIME": create_time,
+				"DATA_FREE": data_free,
+				"DATA_LENGTH": data_length,
+				"ENGINE": engine,
+				"INDEX_LENGTH": index_length,
+				"MAX_DATA_LENGTH": max_data_length,
+				"ROW_FORMAT": row_format,
+				"TABLE_COLLATION": table_collation,
+				"TABLE_COMMENT": table_comment,
+				"TABLE_ROWS": table_rows_num,
+			},
+			"columns": table_columns_dict.get(table_name, []),
+			"definition": "",
+			"foreign-keys": [serialize_once(foreign_key_schema) for foreign_key_schema in table_foreign_keys_dict.get(table_name, [])],
+			"indexes": indexes,
+			"primary-key": primary_key["@uuid"] if primary_key is not None else None,
+			"remarks": table_comment if table_comment is not None else "",
+			"table-constraints": table_constraints_dict.get(table_name, []),
+			"table-type": serialize_once(table_type_schema),
+			"triggers": table_triggers_dict.get(table_name, []),
+		})
+
+	return {
+		"@uuid": generate_uuid(dbname, "schema"),
+		"all-table-columns": all_table_columns,
+		"catalog": {
+			"@uuid": generate_uuid(dbname, "catalog"),
+			"name": dbname,
+			"database-info": {
+				"product-name": "MySQL",
+				"product-version": product_version,
+			},
+			"column-data-types": [data_type_schema["@uuid"] for data_type_schema in data_types_dict.values()],
+			"system-column-data-types": list(data_types_dict.values()),
+			"tables": tables_schema,
+		},
+	}
+
+def fingerprint_mysql_schema(mysql_connection, dbname, salt = ""):
+	"""
+	Fingerprint of MySQL schema definition: SHA-256 hex digest of INFORMATION_SCHEMA rows, which describe tables, columns, indexes, foreign keys and triggers.
+	Statistics which change with data (number of rows, sizes, index cardinality, create time) are left out,
+	so the same DDL gives the same fingerprint, whatever data was loaded.
+	Database name is hashed too, since it is stored in schema document (catalog name), so databases which share DDL do not share fingerprint.
+	Params:
+		salt: Extra text which is hashed too, e.g. name of schema backend, so different kinds of schema document do not share fingerprint.
+	"""
+	mysql_cursor = mysql_connection.cursor()
+	table_rows = fetch_information_schema(mysql_cursor, SQL_FETCH_TABLES, dbname)
+	column_rows = fetch_information_schema(mysql_cursor, SQL_FETCH_COLUMNS, dbname)
+	index_rows = fetch_information_schema(mysql_cursor, SQL_FETCH_INDEXES, dbname)
+	foreign_key_rows = fetch_information_schema(mysql_cursor, SQL_FETCH_FOREIGN_KEYS, dbname)
+	trigger_rows = fetch_information_schema(mysql_cursor, SQL_FETCH_TRIGGERS, dbname)
+	mysql_cursor.close()
+	definition = {
+		"salt": salt,
+		"dbname": dbname,
+		# TABLE_NAME, TABLE_TYPE, ENGINE, TABLE_COLLATION, TABLE_COMMENT
+		"tables": [[row[0], row[1], row[2], row[3], row[13]] for row in table_rows],
+		"columns": column_rows,
+		# All but CARDINALITY
+		"indexes": [row[:-1] for row in index_rows],
+		"foreign-keys": foreign_key_rows,
+		"triggers": trigger_rows,
+	}
+	return hashlib.sha256(json.dumps(definition, default=str).encode("utf-8")).hexdigest()
+
+def refresh_table_statistics(db_schema, mysql_connection, dbname):
+	"""
+	Refresh statistics attributes (TABLE_ROWS, DATA_LENGTH, ...) of tables in a schema document, which was introspected before (e.g. cached),
+	since they are used for planning migration.
+	"""
+	mysql_cursor = mysql_connection.cursor()
+	table_rows = fetch_information_schema(mysql_cursor, SQL_FETCH_TABLES, dbname)
+	mysql_cursor.close()
+	table_statistics_dict = {}
+	for table_name, table_type, engine, table_collation, table_rows_num, avg_row_length, data_length, max_data_length, index_length, data_free, \
+			auto_increment, row_format, create_time, table_comment in table_rows:
+		table_statistics_dict[table_name] = {
+			"AUTO_INCREMENT": auto_increment,
+			"AVG_ROW_LENGTH": avg_row_length,
+			"CREATE_TIME": create_time,
+			"DATA_FREE": data_free,
+			"DATA_LENGTH": data_length,
+			"INDEX_LENGTH": index_length,
+			"MAX_DATA_LENGTH": max_data_length,
+			"TABLE_ROWS": table_rows_num,
+		}
+	for table_schema in db_schema["catalog"]["tables"]:
+		if table_schema["name"] in table_statistics_dict:
+			table_schema["attributes"].update(table_statistics_dict[table_schema["name"]])
+	return db_schema
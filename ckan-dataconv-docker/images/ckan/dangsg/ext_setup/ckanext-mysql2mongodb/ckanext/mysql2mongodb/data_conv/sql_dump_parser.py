@@ -0,0 +1,459 @@
+# sql_dump_parser.py: Streaming parser of mysqldump files, which reads table definitions and rows of extended INSERT statements
+# without loading data into MySQL.
+
+import io, re, struct
+import mysql.connector
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from ckanext.mysql2mongodb.data_conv.row_converter import find_converted_dtype
+from ckanext.mysql2mongodb.data_conv.sql_dump_compression import open_sql_dump_file
+
+class SqlDumpParseError(Exception):
+	"""
+	Raised when a dump contains statements or values which parser does not handle.
+	Such dumps have to be staged through MySQL instead.
+	"""
+	pass
+
+# Rest of a quoted string or a comment which continues on next lines, after its opening token.
+QUOTE_END_REGEX_DICT = {
+	"'": re.compile(r"[^'\\]*(?:\\.[^'\\]*)*'", re.S),
+	'"': re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.S),
+	"`": re.compile(r"[^`]*`"),
+	"/*": re.compile(r".*?\*/", re.S),
+}
+
+CREATE_TABLE_REGEX = re.compile(r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(?:(?:`[^`]+`|\w+)\.)?(`[^`]+`|\w+)\s*\(", re.I)
+INSERT_REGEX = re.compile(r"INSERT\s+INTO\s+(?:(?:`[^`]+`|\w+)\.)?(`[^`]+`|\w+)\s*(?:\(([^)]*)\))?\s*VALUES\s*", re.I)
+TABLE_KEY_DEFINITIONS = ("PRIMARY", "KEY", "INDEX", "UNIQUE", "FULLTEXT", "SPATIAL", "CONSTRAINT", "FOREIGN", "CHECK")
+# One value of a row: opening parenthesis before first value of row, then value, then separator:
+# "," before next value, ")" (and "," if another row follows) after last value. Groups are read by position in parse_row_values().
+VALUE_REGEX = re.compile(r"""\s*(\(\s*)?(?:
+		'([^'\\]*(?:(?:\\.|'')[^'\\]*)*)'
+		|([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+		|(NULL)
+		|_binary\s*'([^'\\]*(?:(?:\\.|'')[^'\\]*)*)'
+		|(?:0x([0-9A-Fa-f]*)|[xX]'([0-9A-Fa-f]*)')
+		|[bB]'([01]*)'
+	)\s*(?:(,)|\)\s*,?)""", re.X | re.S | re.I)
+UNESCAPE_REGEX = re.compile(r"\\(.)|''", re.S)
+UNESCAPE_DICT = {"0": "\0", "b": "\b", "n": "\n", "r": "\r", "t": "\t", "Z": "\x1a", "%": "\\%", "_": "\\_"}
+
+def open_sql_dump(file_path):
+	"""
+	Open mysqldump file (which may be compressed, see sql_dump_compression.py) as text stream, see open_sql_dump_stream().
+	"""
+	return open_sql_dump_stream(open_sql_dump_file(file_path))
+
+def open_sql_dump_stream(byte_stream):
+	"""
+	Open binary stream of mysqldump script (e.g. a file, or a running download) as text stream.
+	Bytes which are not UTF-8 (e.g. _binary strings) are kept as surrogates, so they can be encoded back to original bytes.
+	"""
+	return io.TextIOWrapper(byte_stream, encoding="utf-8", errors="surrogateescape", newline="")
+
+def compile_statement_body_regex(delimiter):
+	"""
+	Compile regex which skips text of a statement on one line, up to delimiter, line comment or a quote (or block comment) which continues on next line.
+	Quoted strings and block comments are skipped as a whole, so delimiters in them are ignored.
+	"""
+	first_char = re.escape(delimiter[0])
+	return re.compile(
+		r"(?:[^'\"`#/\-" + first_char + r"]+"
+		r"|'[^'\\]*(?:\\.[^'\\]*)*'"
+		r'|"[^"\\]*(?:\\.[^"\\]*)*"'
+		r"|`[^`]*`"
+		r"|/\*.*?\*/"
+		r"|(?!" + re.escape(delimiter) + r"|/\*|--\s)[/\-" + first_char + r"])*", re.S)
+
+def iterate_sql_statements(sql_stream):
+	"""
+	Split SQL script into statements, lazily, line by line.
+	Quoted strings, identifiers and comments are skipped while looking for delimiter, DELIMITER commands are handled like mysql client does.
+	Line comments are dropped, block comments (including executable /*!...*/ ones) are kept in statements.
+	A whole line (e.g. an extended INSERT statement of mysqldump) is usually skipped by one match of a compiled regex.
+	"""
+	delimiter = ";"
+	body_regex = compile_statement_body_regex(delimiter)
+	statement_parts = []
+	quote = None
+	for line in sql_stream:
+		if quote is None and len(statement_parts) == 0:
+			stripped_line = line.strip()
+			if stripped_line == "" or stripped_line == "--" or stripped_line.startswith("-- ") or stripped_line.startswith("#"):
+				continue
+			if stripped_line.upper().startswith("DELIMITER "):
+				delimiter = stripped_line.split()[1]
+				body_regex = compile_statement_body_regex(delimiter)
+				continue
+		pos = 0
+		line_len = len(line)
+		while pos < line_len:
+			if quote is not None:
+				match = QUOTE_END_REGEX_DICT[quote].match(line, pos)
+				if match is None:
+					statement_parts.append(line[pos:])
+					break
+				statement_parts.append(line[pos:match.end()])
+				pos = match.end()
+				quote = None
+				continue
+			body_end = body_regex.match(line, pos).end()
+			# Whitespace after the last statement of line does not start a new statement.
+			if body_end > pos and (len(statement_parts) > 0 or not line[pos:body_end].isspace()):
+				statement_parts.append(line[pos:body_end])
+			pos = body_end
+			if pos == line_len:
+				break
+			if line.startswith(delimiter, pos):
+				statement = "".join(statement_parts).strip()
+				statement_parts = []
+				if statement != "":
+					yield statement
+				pos = pos + len(delimiter)
+			elif line.startswith("/*", pos):
+				statement_parts.append("/*")
+				quote = "/*"
+				pos = pos + 2
+			elif line[pos] in QUOTE_END_REGEX_DICT:
+				statement_parts.append(line[pos])
+				quote = line[pos]
+				pos = pos + 1
+			else:
+				# Line comment, rest of line is dropped.
+				if len(statement_parts) > 0:
+					statement_parts.append("\n")
+				pos = line_len
+	statement = "".join(statement_parts).strip()
+	if quote is not None:
+		raise SqlDumpParseError("SQL script ends inside a quoted string or comment!")
+	if statement != "":
+		yield statement
+
+def is_data_statement(statement):
+	"""
+	Check if statement writes rows (INSERT or REPLACE).
+	"""
+	return statement[:7].upper() in ("INSERT ", "REPLACE")
+
+def unquote_identifier(identifier):
+	if identifier.startswith("`"):
+		return identifier[1:-1].replace("``", "`")
+	return identifier
+
+def split_definitions(definitions_sql, pos = 0):
+	"""
+	Split comma separated definitions in parentheses (e.g. body of CREATE TABLE), pos is the position after opening parenthesis.
+	Commas in nested parentheses and quotes are ignored.
+	Return list of definitions.
+	"""
+	definitions = []
+	depth = 0
+	start = pos
+	while pos < len(definitions_sql):
+		char = definitions_sql[pos]
+		if char in QUOTE_END_REGEX_DICT:
+			match = QUOTE_END_REGEX_DICT[char].match(definitions_sql, pos + 1)
+			if match is None:
+				raise SqlDumpParseError("Unterminated quote in table definition!")
+			pos = match.end()
+			continue
+		if char == "(":
+			depth = depth + 1
+		elif char == ")":
+			if depth == 0:
+				definitions.append(definitions_sql[start:pos].strip())
+				return definitions
+			depth = depth - 1
+		elif char == "," and depth == 0:
+			definitions.append(definitions_sql[start:pos].strip())
+			start = pos + 1
+		pos = pos + 1
+	raise SqlDumpParseError("Unterminated parenthesis in table definition!")
+
+def parse_create_table(statement):
+	"""
+	Parse columns of CREATE TABLE statement.
+	Return None if statement is not CREATE TABLE, otherwise:
+		Tuple(<table name>, List[Tuple(<column name>, <MySQL data type>)]), columns are in ordinal order.
+	Raise SqlDumpParseError if a column can not be typed (unhandled data type) or is generated (its values are not dumped).
+	"""
+	match = CREATE_TABLE_REGEX.match(statement)
+	if match is None:
+		return None
+	table_name = unquote_identifier(match.group(1))
+	column_list = []
+	for definition in split_definitions(statement, match.end()):
+		if definition.split(None, 1)[0].upper() in TABLE_KEY_DEFINITIONS:
+			continue
+		column_match = re.match(r"(`(?:[^`]|``)+`|\w+)\s+(\w+)", definition)
+		if column_match is None:
+			raise SqlDumpParseError(f"Can not parse definition of table {table_name}: {definition}")
+		col_name = unquote_identifier(column_match.group(1))
+		dtype = column_match.group(2).upper()
+		if find_converted_dtype(dtype) is None:
+			raise SqlDumpParseError(f"Data type {dtype} of column {table_name}.{col_name} has not been handled!")
+		if re.search(r"\bGENERATED\s+ALWAYS\b|\bAS\s*\(", definition, re.I) is not None:
+			raise SqlDumpParseError(f"Generated column {table_name}.{col_name} has not been handled!")
+		column_list.append((col_name, dtype))
+	return (table_name, column_list)
+
+def unescape_string(value):
+	if "\\" not in value and "''" not in value:
+		return value
+	return UNESCAPE_REGEX.sub(lambda match: "'" if match.group(1) is None else UNESCAPE_DICT.get(match.group(1), match.group(1)), value)
+
+def encode_binary(value):
+	if type(value) is bytes:
+		return value
+	return value.encode("utf-8", "surrogateescape")
+
+def parse_row_values(values_sql):
+	"""
+	Parse rows of VALUES clause: (<value>, ...), (<value>, ...), ...
+	Yield every row as list of raw values: str (quoted string or number), bytes (binary or hex literal), int (bit literal) or None (NULL).
+	"""
+	pos = 0
+	row = None
+	for match in VALUE_REGEX.finditer(values_sql):
+		if match.start() != pos:
+			break
+		pos = match.end()
+		row_start, quoted, number, null, binary, hex_value, hex_string, bits, next_value = match.groups()
+		if row is None:
+			if row_start is None:
+				raise SqlDumpParseError(f"Can not parse row at: {values_sql[match.start():match.start() + 50]}")
+			row = []
+		elif row_start is not None:
+			raise SqlDumpParseError(f"Can not parse value at: {values_sql[match.start():match.start() + 50]}")
+		if quoted is not None:
+			row.append(unescape_string(quoted))
+		elif number is not None:
+			row.append(number)
+		elif null is not None:
+			row.append(None)
+		elif binary is not None:
+			row.append(encode_binary(unescape_string(binary)))
+		elif bits is not None:
+			row.append(int(bits, 2) if bits != "" else 0)
+		else:
+			row.append(bytes.fromhex(hex_value if hex_value is not None else hex_string))
+		if next_value is None:
+			yield row
+			row = None
+	if row is not None or pos != len(values_sql):
+		raise SqlDumpParseError(f"Can not parse value at: {values_sql[pos:pos + 50]}")
+
+def parse_insert_statement(statement):
+	"""
+	Parse INSERT statement.
+	Return Tuple(<table name>, <list of column names, None if statement does not list columns>, <rows generator, see parse_row_values()>)
+	Raise SqlDumpParseError if statement is not a plain INSERT INTO ... VALUES (e.g. INSERT IGNORE, REPLACE, INSERT ... SELECT).
+	"""
+	match = INSERT_REGEX.match(statement)
+	if match is None:
+		raise SqlDumpParseError(f"Data statement has not been handled: {statement[:50]}")
+	column_list = None
+	if match.group(2) is not None:
+		column_list = [unquote_identifier(col_name.strip()) for col_name in match.group(2).split(",")]
+	return (unquote_identifier(match.group(1)), column_list, parse_row_values(statement[match.end():]))
+
+def parse_datetime_cell(value):
+	if value.startswith("0000-00-00"):
+		return None
+	if "." in value:
+		# Fractional seconds are dumped with precision of column, fromisoformat() needs 6 digits.
+		value, fraction = value.split(".")
+		value = value + "." + fraction.ljust(6, "0")
+	return datetime.fromisoformat(value)
+
+def parse_date_cell(value):
+	if value.startswith("0000-00-00"):
+		return None
+	return date.fromisoformat(value)
+
+def parse_time_cell(value):
+	sign = -1 if value.startswith("-") else 1
+	hms, _, fraction = value.lstrip("-").partition(".")
+	hours, minutes, seconds = [int(part) for part in hms.split(":")]
+	return sign * timedelta(hours=hours, minutes=minutes, seconds=seconds, microseconds=int(fraction.ljust(6, "0")) if fraction != "" else 0)
+
+def parse_bit_cell(value):
+	if type(value) is int:
+		return value
+	if type(value) is str and value.isdigit():
+		return int(value)
+	return int.from_bytes(encode_binary(value), "big")
+
+def parse_string_cell(value):
+	if type(value) is bytes:
+		return value.decode("utf-8")
+	return value
+
+def parse_set_cell(value):
+	if value == "":
+		return set()
+	return set(value.split(","))
+
+def format_wkt_number(number):
+	if number.is_integer() and abs(number) < 1e15:
+		return str(int(number))
+	return repr(number)
+
+def read_wkb_geometry(wkb, pos):
+	"""
+	Read one WKB geometry at pos.
+	Return Tuple(<WKT of geometry>, <position after geometry>).
+	"""
+	byte_order = "<" if wkb[pos] == 1 else ">"
+	geometry_type = struct.unpack_from(byte_order + "I", wkb, pos + 1)[0]
+	pos = pos + 5
+
+	def read_points(pos):
+		points_num = struct.unpack_from(byte_order + "I", wkb, pos)[0]
+		coordinates = struct.unpack_from(byte_order + "d" * (2 * points_num), wkb, pos + 4)
+		points = [format_wkt_number(coordinates[idx]) + " " + format_wkt_number(coordinates[idx + 1]) for idx in range(0, len(coordinates), 2)]
+		return ",".join(points), pos + 4 + 16 * points_num
+
+	def read_rings(pos):
+		rings_num = struct.unpack_from(byte_order + "I", wkb, pos)[0]
+		pos = pos + 4
+		rings = []
+		for _ in range(rings_num):
+			ring, pos = read_points(pos)
+			rings.append("(" + ring + ")")
+		return ",".join(rings), pos
+
+	if geometry_type == 1:
+		x, y = struct.unpack_from(byte_order + "dd", wkb, pos)
+		return "POINT(" + format_wkt_number(x) + " " + format_wkt_number(y) + ")", pos + 16
+	elif geometry_type == 2:
+		points, pos = read_points(pos)
+		return "LINESTRING(" + points + ")", pos
+	elif geometry_type == 3:
+		rings, pos = read_rings(pos)
+		return "POLYGON(" + rings + ")", pos
+	elif geometry_type in (4, 5, 6, 7):
+		geometries_num = struct.unpack_from(byte_order + "I", wkb, pos)[0]
+		pos = pos + 4
+		geometries = []
+		for _ in range(geometries_num):
+			geometry, pos = read_wkb_geometry(wkb, pos)
+			if geometry_type != 7:
+				# Members of MULTI* are written without their type, e.g. MULTIPOINT((1 2),(3 4))
+				geometry = geometry[geometry.index("("):]
+			geometries.append(geometry)
+		return ["MULTIPOINT", "MULTILINESTRING", "MULTIPOLYGON", "GEOMETRYCOLLECTION"][geometry_type - 4] + "(" + ",".join(geometries) + ")", pos
+	raise SqlDumpParseError(f"WKB geometry type {geometry_type} has not been handled!")
+
+def parse_geometry_cell(value):
+	"""
+	Convert MySQL internal geometry (4 bytes SRID + WKB) to WKT, like ST_AsText() does.
+	Only SRID 0 is handled, since axis order of geographic SRS depends on MySQL catalog.
+	"""
+	value = encode_binary(value)
+	srid = struct.unpack_from("<I", value, 0)[0]
+	if srid != 0:
+		raise SqlDumpParseError(f"Geometry with SRID {srid} has not been handled!")
+	return read_wkb_geometry(value, 4)[0]
+
+def find_cell_parser(mysql_dtype):
+	"""
+	Get parsing function for dumped values of a MySQL data type.
+	Values are typed like MySQL Connector returns them when table is selected by DataConversion.generate_sql_selecting_table()
+	(e.g. DECIMAL as Decimal, single geometries as WKT), so rows can be converted by the same RowConverter.
+	TIMESTAMP values are kept as they were dumped (mysqldump writes them in UTC).
+	"""
+	if mysql_dtype == "YEAR":
+		return int
+	elif mysql_dtype == "DATE":
+		return parse_date_cell
+	elif mysql_dtype == "TIME":
+		return parse_time_cell
+	elif mysql_dtype == "BIT":
+		return parse_bit_cell
+	elif mysql_dtype == "SET":
+		return parse_set_cell
+	target_dtype = find_converted_dtype(mysql_dtype)
+	if target_dtype in ("integer", "boolean"):
+		return int
+	elif target_dtype == "decimal":
+		return Decimal
+	elif target_dtype == "double":
+		return float
+	elif target_dtype == "timestamp":
+		return parse_datetime_cell
+	elif target_dtype in ("binary", "blob", "multiple-geometry"):
+		return encode_binary
+	elif target_dtype == "single-geometry":
+		return parse_geometry_cell
+	return parse_string_cell
+
+def iterate_sql_dump_rows(sql_stream, chunk_size = 10000):
+	"""
+	Stream rows of all tables from mysqldump script.
+	Columns of every table are read from its CREATE TABLE statement, which mysqldump writes before INSERT statements of that table.
+	Yield Tuple(<table name>, <column names>, <chunk of typed rows>), rows are in ordinal column order, at most chunk_size rows per chunk.
+	Rows of consecutive INSERT statements of the same table are merged into chunks.
+	Raise SqlDumpParseError if a statement or a value has not been handled.
+	"""
+	table_columns_dict = {}
+	table_cell_parsers_dict = {}
+	chunk_table = None
+	chunk = []
+	for statement in iterate_sql_statements(sql_stream):
+		if not is_data_statement(statement):
+			create_table = parse_create_table(statement)
+			if create_table is not None:
+				table_name, column_list = create_table
+				table_columns_dict[table_name] = [col_name for col_name, _ in column_list]
+				table_cell_parsers_dict[table_name] = [find_cell_parser(dtype) for _, dtype in column_list]
+			continue
+		table_name, column_list, rows = parse_insert_statement(statement)
+		if table_name not in table_columns_dict:
+			raise SqlDumpParseError(f"Rows of table {table_name} are dumped before its definition!")
+		if column_list is not None and column_list != table_columns_dict[table_name]:
+			raise SqlDumpParseError(f"INSERT statement of table {table_name} does not list all columns in ordinal order!")
+		if chunk_table != table_name and len(chunk) > 0:
+			yield (chunk_table, table_columns_dict[chunk_table], chunk)
+			chunk = []
+		chunk_table = table_name
+		cell_parsers = table_cell_parsers_dict[table_name]
+		columns_num = len(cell_parsers)
+		for row in rows:
+			if len(row) != columns_num:
+				raise SqlDumpParseError(f"Row of table {table_name} has {len(row)} values, but table has {columns_num} columns!")
+			chunk.append([None if cell_data is None else cell_parser(cell_data) for cell_parser, cell_data in zip(cell_parsers, row)])
+			if len(chunk) >= chunk_size:
+				yield (table_name, table_columns_dict[table_name], chunk)
+				chunk = []
+	if len(chunk) > 0:
+		yield (chunk_table, table_columns_dict[chunk_table], chunk)
+
+def restore_sql_dump_schema(mysql_connection, sql_stream):
+	"""
+	Execute all statements of mysqldump script except data statements, so MySQL database has every table, view and trigger, but no row.
+	Table definitions are parsed on the way, so dumps which iterate_sql_dump_rows() can not handle are rejected before data is touched.
+	Return list of table names.
+	Raise SqlDumpParseError if a table definition has not been handled or a statement fails.
+	"""
+	table_name_list = []
+	mysql_cursor = mysql_connection.cursor()
+	try:
+		for statement in iterate_sql_statements(sql_stream):
+			if is_data_statement(statement):
+				if INSERT_REGEX.match(statement) is None:
+					raise SqlDumpParseError(f"Data statement has not been handled: {statement[:50]}")
+				continue
+			create_table = parse_create_table(statement)
+			if create_table is not None:
+				table_name_list.append(create_table[0])
+			try:
+				mysql_cursor.execute(statement)
+				if mysql_cursor.with_rows:
+					mysql_cursor.fetchall()
+			except mysql.connector.Error as e:
+				raise SqlDumpParseError(f"Statement of dump failed: {e}") from e
+	finally:
+		mysql_cursor.close()
+	return table_name_list
@@ -0,0 +1,153 @@
+# sql_dump_restore.py: Restore mysqldump files into MySQL with mysql client, table sections of dump are restored concurrently.
+
+import os, re, subprocess, time
+from itertools import chain
+from ckanext.mysql2mongodb.data_conv.utilities import open_worker_pool
+from ckanext.mysql2mongodb.data_conv.sql_dump_compression import find_sql_dump_compression, open_sql_dump_file, iterate_stream_chunks
+
+# Comment lines which mysqldump writes before every section of dump.
+# Sections of tables (and temporary views, which stand for views until tables exist) do not depend on each other.
+TABLE_SECTION_MARKERS = (b"-- Table structure for table ", b"-- Temporary view structure for view ", b"-- Temporary table structure for view ")
+# Sections which must be restored after all tables exist.
+FINAL_SECTION_MARKERS = (b"-- Final view structure for view ", b"-- Dumping events for database ", b"-- Dumping routines for database ")
+# Dumps of several databases switch database (USE) between sections, they are restored as a whole.
+UNSPLITTABLE_SECTION_MARKERS = (b"-- Current Database: ",)
+# Executed at the start of every restore session, so no session checks keys of restored rows.
+RESTORE_SESSION_SQL = b"SET SESSION unique_checks = 0;\nSET SESSION foreign_key_checks = 0;\n"
+
+def find_sql_dump_sections(file_path):
+	"""
+	Scan mysqldump file once and find byte ranges of its sections.
+	Return None if dump can not be split (no table section, or several databases), otherwise:
+		Dict(
+			"preamble": Tuple(<start>, <end>), session settings before the first section, which every section is restored after,
+			"tables": List[Dict("name": <table or view name>, "start": <start>, "end": <end>)],
+			"final": List[Tuple(<start>, <end>)], sections which are restored after all tables, in dump order.
+		)
+	"""
+	table_sections = []
+	final_sections = []
+	preamble_end = None
+	current_section = None
+	offset = 0
+	with open(file_path, "rb") as f:
+		for line in f:
+			if line.startswith(b"-- "):
+				if line.startswith(UNSPLITTABLE_SECTION_MARKERS):
+					return None
+				is_table_section = line.startswith(TABLE_SECTION_MARKERS)
+				if is_table_section or line.startswith(FINAL_SECTION_MARKERS):
+					if preamble_end is None:
+						preamble_end = offset
+					if current_section is not None:
+						current_section["end"] = offset
+					if is_table_section:
+						name_match = re.search(rb"`((?:[^`]|``)+)`", line)
+						current_section = {"name": name_match.group(1).decode("utf-8") if name_match is not None else "", "start": offset}
+						table_sections.append(current_section)
+					else:
+						current_section = {"start": offset}
+						final_sections.append(current_section)
+			offset = offset + len(line)
+	if len(table_sections) == 0:
+		return None
+	current_section["end"] = offset
+	return {
+		"preamble": (0, preamble_end),
+		"tables": table_sections,
+		"final": [(section["start"], section["end"]) for section in final_sections],
+	}
+
+def open_mysql_client(host, username, password, dbname):
+	"""
+	Start mysql client which executes SQL script written to its stdin.
+	Password is passed by environment, so it is not shown in process list.
+	"""
+	return subprocess.Popen(["mysql", "-h", host, "-u", username, dbname], stdin=subprocess.PIPE, env=dict(os.environ, MYSQL_PWD=password))
+
+def iterate_file_range(file_path, start, end, buffer_size = 1024 * 1024):
+	"""
+	Read bytes [start, end) of file, buffer by buffer.
+	"""
+	with open(file_path, "rb") as f:
+		f.seek(start)
+		remaining = end - start
+		while remaining > 0:
+			buffer = f.read(min(buffer_size, remaining))
+			if len(buffer) == 0:
+				break
+			yield buffer
+			remaining = remaining - len(buffer)
+
+def restore_sql_chunks(conv_init_option, sql_chunks, source_name):
+	"""
+	Restore SQL script, which is given as iterator of byte chunks, by one mysql client (one session).
+	Raise Exception if mysql client fails.
+	If reading chunks fails (e.g. download or decompression error), mysql client is killed before its stdin is closed,
+	so a truncated script is not committed as if it were complete.
+	"""
+	mysql_process = open_mysql_client(conv_init_option.host, conv_init_option.username, conv_init_option.password, conv_init_option.dbname)
+	try:
+		for chunk in sql_chunks:
+			mysql_process.stdin.write(chunk)
+		mysql_process.stdin.close()
+	except BrokenPipeError:
+		# mysql client stopped reading because a statement failed, its exit code is checked below.
+		pass
+	except BaseException:
+		mysql_process.kill()
+		mysql_process.wait()
+		raise
+	if mysql_process.wait() != 0:
+		raise Exception(f"Failed while restoring {source_name} (mysql exit code {mysql_process.returncode})!")
+
+def restore_sql_dump_ranges(conv_init_option, file_path, byte_ranges):
+	"""
+	Restore byte ranges of mysqldump file, in order, by one mysql client (one session) which has unique_checks and foreign_key_checks disabled.
+	"""
+	sql_chunks = chain([RESTORE_SESSION_SQL], *[iterate_file_range(file_path, start, end) for start, end in byte_ranges])
+	restore_sql_chunks(conv_init_option, sql_chunks, file_path)
+
+def restore_sql_dump_stream(conv_init_option, sql_chunks, source_name = "stream"):
+	"""
+	Restore mysqldump script which is read from an iterator of byte chunks (e.g. a running download, see FileDownload.iterate_chunks())
+	by one mysql client, so restore goes along with reading. Such script can not be split, see restore_sql_dump().
+	"""
+	tic = time.time()
+	restore_sql_chunks(conv_init_option, chain([RESTORE_SESSION_SQL], sql_chunks), source_name)
+	toc = time.time()
+	time_taken = round((toc-tic)*1000, 1)
+	print(f"Time for restoring {source_name}: {time_taken}")
+
+def restore_sql_dump(conv_init_option, file_path, workers = 1):
+	"""
+	Restore mysqldump file into MySQL database which conv_init_option (instance of class ConvInitOption) specifies.
+	With more than 1 worker, dump is split into sections (see find_sql_dump_sections()) without being copied:
+	table sections are restored concurrently by <workers> mysql clients, biggest first, every section in its own session
+	which has unique_checks and foreign_key_checks disabled and runs preamble of dump (character set, time zone, SQL mode) first.
+	Views, routines and events, which depend on tables, are restored afterward by one client.
+	Dumps which can not be split are restored by one client, as a whole.
+	Compressed dumps can not be split without being decompressed to disk, they are decompressed into one client while it restores them.
+	"""
+	tic = time.time()
+	is_compressed = find_sql_dump_compression(file_path) is not None
+	dump_sections = find_sql_dump_sections(file_path) if workers > 1 and not is_compressed else None
+	if is_compressed:
+		restore_sql_chunks(conv_init_option, chain([RESTORE_SESSION_SQL], iterate_stream_chunks(open_sql_dump_file(file_path))), file_path)
+	elif dump_sections is None or len(dump_sections["tables"]) <= 1:
+		restore_sql_dump_ranges(conv_init_option, file_path, [(0, os.path.getsize(file_path))])
+	else:
+		preamble = dump_sections["preamble"]
+		table_sections = sorted(dump_sections["tables"], key=lambda section: section["end"] - section["start"], reverse=True)
+
+		def restore_table_section(section):
+			restore_sql_dump_ranges(conv_init_option, file_path, [preamble, (section["start"], section["end"])])
+
+		with open_worker_pool("thread", min(workers, len(table_sections))) as pool:
+			# Every section has to be restored, first failure is raised after all are finished.
+			pool.map(restore_table_section, table_sections, chunksize=1)
+		if len(dump_sections["final"]) > 0:
+			restore_sql_dump_ranges(conv_init_option, file_path, [preamble] + dump_sections["final"])
+	toc = time.time()
+	time_taken = round((toc-tic)*1000, 1)
+	print(f"Time for restoring {file_path}: {time_taken}")
@@ -0,0 +1,105 @@
+# table_checksum.py: Compare a MySQL table with its copy by order-independent checksums of primary key slices, rows are compared only in slices which differ.
+
+from collections import Counter
+from datetime import datetime
+from ckanext.mysql2mongodb.data_conv.table_partition import get_primary_key_slices
+
+def generate_sql_row_hash(column_name_list):
+	"""
+	Generate SQL expression of 64-bit hash of a row: first 16 hex digits of MD5 of all cells, joined by "#".
+	CONCAT_WS() skips NULL cells, so a bitmap of NULL cells is appended too, which tells NULL from empty string.
+	BLOB, TEXT and geometry cells are hashed as their bytes.
+	"""
+	cells_sql = ", ".join([f"`{col_name}`" for col_name in column_name_list])
+	null_bitmap_sql = "CONCAT(" + ", ".join([f"ISNULL(`{col_name}`)" for col_name in column_name_list]) + ")"
+	return f"CAST(CONV(LEFT(MD5(CONCAT_WS('#', {cells_sql}, {null_bitmap_sql})), 16), 16, 10) AS UNSIGNED)"
+
+def generate_sql_where(table_slice):
+	return f" WHERE {table_slice['condition']}" if table_slice is not None else ""
+
+def fetch_slice_checksum(mysql_cursor, table_sql, row_hash_sql, table_slice):
+	"""
+	Get checksum of primary key slice (or whole table if table_slice is None): Tuple(<number of rows>, <BIT_XOR of row hashes>, <SUM of row hashes>).
+	Checksum does not depend on order of rows, so it is computed by one scan of slice, without sorting.
+	Duplicate rows (of tables without primary key) cancel each other out in BIT_XOR, not in SUM.
+	"""
+	mysql_cursor.execute(f"SELECT COUNT(*), BIT_XOR({row_hash_sql}), COALESCE(SUM({row_hash_sql}), 0) FROM {table_sql}{generate_sql_where(table_slice)}", table_slice["params"] if table_slice is not None else None)
+	row_count, checksum, hash_sum = mysql_cursor.fetchone()
+	return (int(row_count), int(checksum), int(hash_sum))
+
+def fetch_slice_row_hashes(mysql_cursor, table_sql, key_columns, row_hash_sql, table_slice):
+	"""
+	Get hashes of rows of primary key slice.
+	Return Dict(key: Tuple(<primary key cells>), value: <row hash>), or Counter of row hashes if table has no primary key.
+	"""
+	key_sql = ", ".join([f"`{col_name}`" for col_name in key_columns])
+	select_sql = f"{key_sql}, {row_hash_sql}" if len(key_columns) > 0 else row_hash_sql
+	mysql_cursor.execute(f"SELECT {select_sql} FROM {table_sql}{generate_sql_where(table_slice)}", table_slice["params"] if table_slice is not None else None)
+	if len(key_columns) == 0:
+		return Counter([row[0] for row in mysql_cursor.fetchall()])
+	return {tuple(row[:-1]): row[-1] for row in mysql_cursor.fetchall()}
+
+def format_logged_key(key):
+	"""
+	Turn cells of primary key into values which can be stored in MongoDB log (e.g. Decimal and date as strings).
+	"""
+	return [cell if cell is None or type(cell) in (int, float, str, bytes, datetime) else str(cell) for cell in key]
+
+def compare_slice_row_hashes(original_row_hashes, copied_row_hashes):
+	"""
+	Compare row hashes of a slice of original table and its copy.
+	Return List[Dict("key": <primary key cells>, "difference": "missing" | "extra" | "changed")],
+	"missing" rows are not in copy, "extra" rows are only in copy. Rows of tables without primary key are counted instead:
+	List[Dict("count": <number of rows>, "difference": "missing" | "extra")].
+	"""
+	if type(original_row_hashes) is Counter:
+		difference_list = []
+		for difference, row_hashes in [("missing", original_row_hashes - copied_row_hashes), ("extra", copied_row_hashes - original_row_hashes)]:
+			if len(row_hashes) > 0:
+				difference_list.append({"count": sum(row_hashes.values()), "difference": difference})
+		return difference_list
+	difference_list = []
+	for key, row_hash in original_row_hashes.items():
+		copied_row_hash = copied_row_hashes.get(key)
+		if copied_row_hash is None:
+			difference_list.append({"key": format_logged_key(key), "difference": "missing"})
+		elif copied_row_hash != row_hash:
+			difference_list.append({"key": format_logged_key(key), "difference": "changed"})
+	for key in copied_row_hashes.keys() - original_row_hashes.keys():
+		difference_list.append({"key": format_logged_key(key), "difference": "extra"})
+	return difference_list
+
+def compare_table_copies(mysql_connection, table_name, copied_dbname, column_name_list, key_columns, numeric_key, rows_num, chunk_rows):
+	"""
+	Compare table of database which mysql_connection is connected to, with its copy in database copied_dbname.
+	Table is split into primary key slices of about chunk_rows rows (see table_partition.py), and checksum of every slice
+	is computed on both databases. Only slices which checksums differ are compared row by row, by row hashes.
+	Tables without primary key are one slice.
+	Return:
+		Dict(
+			"chunks": <number of slices>,
+			"mismatched-chunks": <number of slices which differ>,
+			"rows": List of differences, see compare_slice_row_hashes(),
+		)
+	"""
+	partitions = -(-rows_num // chunk_rows) if chunk_rows > 0 else 1
+	table_slices = get_primary_key_slices(mysql_connection, table_name, key_columns, numeric_key, partitions, rows_num)
+	row_hash_sql = generate_sql_row_hash(column_name_list)
+	original_table_sql = f"`{table_name}`"
+	copied_table_sql = f"`{copied_dbname}`.`{table_name}`"
+	difference_list = []
+	mismatched_chunks = 0
+	mysql_cursor = mysql_connection.cursor(buffered=True)
+	try:
+		for table_slice in table_slices:
+			original_checksum = fetch_slice_checksum(mysql_cursor, original_table_sql, row_hash_sql, table_slice)
+			copied_checksum = fetch_slice_checksum(mysql_cursor, copied_table_sql, row_hash_sql, table_slice)
+			if original_checksum == copied_checksum:
+				continue
+			mismatched_chunks = mismatched_chunks + 1
+			original_row_hashes = fetch_slice_row_hashes(mysql_cursor, original_table_sql, key_columns, row_hash_sql, table_slice)
+			copied_row_hashes = fetch_slice_row_hashes(mysql_cursor, copied_table_sql, key_columns, row_hash_sql, table_slice)
+			difference_list.extend(compare_slice_row_hashes(original_row_hashes, copied_row_hashes))
+	finally:
+		mysql_cursor.close()
+	return {"chunks": len(table_slices), "mismatched-chunks": mismatched_chunks, "rows": difference_list}
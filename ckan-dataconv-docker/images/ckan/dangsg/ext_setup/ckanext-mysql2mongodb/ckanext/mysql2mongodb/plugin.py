@@ -14,10 +14,11 @@ class Mysql2MongodbPlugin(plugins.SingletonPlugin):
         sql_file_name = resource["name"]
         sql_file_url = resource["url"]
         resource_id = resource["id"]
+        sql_file_hash = resource.get("hash")
         # pprint.pprint(f"{resource_id}")
         # pprint.pprint(f"{sql_file_name}") 
         # pprint.pprint(f"{sql_file_url}")
-        toolkit.enqueue_job(convert_data, [resource_id, sql_file_name, sql_file_url])
+        toolkit.enqueue_job(convert_data, [resource_id, sql_file_name, sql_file_url, sql_file_hash])
 
     def before_create(self, context, resource):
     	pass
@@ -0,0 +1,33 @@
+"""Tests for merge-join of MySQL rows and MongoDB documents of direct_validation.py."""
+from datetime import datetime
+from decimal import Decimal
+
+from bson.decimal128 import Decimal128
+
+from ckanext.mysql2mongodb.data_conv.direct_validation import merge_join_documents
+
+def test_merge_join_documents():
+	row_docs = [
+		{"id": 1, "price": Decimal128(Decimal("9.99")), "tags": ("new", "sale"), "updated": datetime(2021, 1, 2, 3, 4, 5, 600123)},
+		{"id": 2, "name": "b"},
+		{"id": 3, "name": "c"},
+		{"id": 5, "name": "e"},
+	]
+	collection_docs = [
+		{"id": 1, "price": Decimal128("9.99"), "tags": ["new", "sale"], "updated": datetime(2021, 1, 2, 3, 4, 5, 600000)},
+		{"id": 3, "name": "C"},
+		{"id": 4, "name": "d"},
+		{"id": 5, "name": "e"},
+	]
+	table_difference = merge_join_documents("item", row_docs, collection_docs, ["id"])
+	assert (table_difference.rows, table_difference.documents) == (4, 4)
+	assert table_difference.difference_key_dict == {"missing": [[2]], "extra": [[4]], "mismatched": [[3]]}
+
+def test_merge_join_documents_in_different_order():
+	row_docs = [{"code": code} for code in ["a", "B", "c"]]
+	collection_docs = [{"code": code} for code in ["B", "a", "c"]]
+	assert not merge_join_documents("item", row_docs, collection_docs, ["code"]).has_difference()
+
+def test_merge_join_documents_without_primary_key():
+	table_difference = merge_join_documents("log", [{"a": 1}, {"a": 1}, {"a": 2}], [{"a": 1}, {"a": 2}, {"a": 3}], [])
+	assert table_difference.difference_count_dict == {"missing": 1, "extra": 1, "mismatched": 0}
@@ -0,0 +1,66 @@
+"""Tests for validating data which was migrated from mysqldump file, of DataConversion.validate_sql_dump() in data_conversion.py."""
+import io
+
+from bson.decimal128 import Decimal128
+
+from ckanext.mysql2mongodb.data_conv import data_conversion
+from ckanext.mysql2mongodb.data_conv.data_conversion import DataConversion
+from ckanext.mysql2mongodb.data_conv.database_connection import ConvInitOption, ConvOutputOption
+from ckanext.mysql2mongodb.data_conv.sql_dump_parser import iterate_sql_dump_rows
+from ckanext.mysql2mongodb.tests.test_sql_dump_parser import SQL_DUMP
+
+class FakeSchema:
+	"""
+	Schema of tables of SQL_DUMP, and of an "empty" table which has no row in dump.
+	"""
+	def get_tables_name_list(self):
+		return ["item", "empty"]
+
+	def get_table_primary_key_columns(self, table_name):
+		return ["item_id"] if table_name == "item" else ["id"]
+
+	def get_table_column_and_data_type(self):
+		return {
+			"item": {"item_id": "INT", "name": "VARCHAR", "price": "DECIMAL", "tags": "SET", "added": "DATE", "updated": "TIMESTAMP", "location": "POINT"},
+			"empty": {"id": "INT"},
+		}
+
+def build_dump_conversion(tmp_path, monkeypatch):
+	file_path = tmp_path / "item.sql"
+	file_path.write_text(SQL_DUMP, encoding="utf-8")
+	log_list = []
+	monkeypatch.setattr(data_conversion, "open_connection_mongodb", lambda *args: None)
+	monkeypatch.setattr(data_conversion, "store_json_to_mongodb", lambda mongodb_conn, collection_name, log_data: log_list.append((collection_name, log_data)))
+	data_conv = DataConversion()
+	data_conv.set_config(ConvInitOption("localhost", "user", "password", 3306, "item"), ConvOutputOption("localhost", "user", "password", 27017, "item"), FakeSchema(), sql_dump_file=str(file_path))
+	return data_conv, log_list
+
+def iterate_migrated_documents(data_conv):
+	# Documents of "item" as migration stored them.
+	for _, _, rows in iterate_sql_dump_rows(io.StringIO(SQL_DUMP)):
+		for doc in data_conv.get_row_converter("item").convert_rows(rows):
+			yield doc
+
+def test_validate_sql_dump(tmp_path, monkeypatch):
+	data_conv, log_list = build_dump_conversion(tmp_path, monkeypatch)
+	collection_docs = [doc for doc in iterate_migrated_documents(data_conv) if doc["item_id"] != 2]
+	# Documents are loaded from MongoDB: Decimal128 values without trailing zeros, arrays as lists.
+	collection_docs[1]["price"] = Decimal128("0.5")
+	collection_docs[1]["tags"] = list(collection_docs[1]["tags"])
+	data_conv.iterate_collection_documents = lambda table_name: iter(collection_docs if table_name == "item" else [])
+	data_conv.validate_sql_dump()
+	assert [log_data["table-name"] for _, log_data in log_list] == ["item", "empty"]
+	assert all(collection_name == "validating_log" and log_data["validation-mode"] == "dump" for collection_name, log_data in log_list)
+	item_log = log_list[0][1]
+	assert (item_log["rows"], item_log["documents"]) == (3, 2)
+	assert (item_log["missing"], item_log["extra"], item_log["mismatched"]) == ([[2]], [], [])
+	assert (log_list[1][1]["rows"], log_list[1][1]["documents"]) == (0, 0)
+
+def test_validate_sql_dump_finds_changed_documents(tmp_path, monkeypatch):
+	data_conv, log_list = build_dump_conversion(tmp_path, monkeypatch)
+	# One document was changed, one was added to collection of "empty".
+	collection_docs = list(iterate_migrated_documents(data_conv))
+	collection_docs[2]["name"] = "C"
+	data_conv.iterate_collection_documents = lambda table_name: iter(collection_docs if table_name == "item" else [{"id": 1}])
+	data_conv.validate_sql_dump()
+	assert [(log_data["missing-count"], log_data["extra-count"], log_data["mismatched-count"]) for _, log_data in log_list] == [(0, 0, 1), (0, 1, 0)]
@@ -0,0 +1,72 @@
+"""Tests for converting fetched MySQL rows into MongoDB documents of row_converter.py."""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from bson.decimal128 import Decimal128
+
+from ckanext.mysql2mongodb.data_conv.row_converter import CONVERTED_DTYPE_DICT, RowConverter, convert_date_cell, convert_object_cell, find_cell_converter, find_converted_dtype
+
+# One fetched cell of every MySQL data type which is handled.
+SAMPLE_CELL_DICT = {
+	"TINYINT": 1, "SMALLINT": -2, "MEDIUMINT": 3, "INT": 4, "INTEGER": 5, "BIGINT": 2 ** 40,
+	"DECIMAL": Decimal("12.50"), "DEC": Decimal("-0.001"), "FIXED": Decimal("7"),
+	"FLOAT": 1.5, "DOUBLE": 2.25, "REAL": -3.0,
+	"BOOL": 1, "BOOLEAN": 0,
+	"DATE": date(2021, 3, 4), "YEAR": 2021,
+	"DATETIME": datetime(2021, 3, 4, 5, 6, 7), "TIMESTAMP": datetime(2020, 1, 1), "TIME": timedelta(hours=5, seconds=3),
+	"BIT": 5, "BINARY": b"\x00\x01", "VARBINARY": bytearray(b"ab"),
+	"TINYBLOB": b"t", "BLOB": b"blob", "MEDIUMBLOB": b"m", "LONGBLOB": b"l",
+	"CHARACTER": "c", "CHARSET": "utf8", "ASCII": "a", "UNICODE": "u", "CHAR": "ch", "VARCHAR": "varchar", "TINYTEXT": "tt", "TEXT": "text", "MEDIUMTEXT": "mt", "LONGTEXT": "lt",
+	"ENUM": "small", "SET": {"a"}, "JSON": '{"key": [1, 2]}',
+	"GEOMETRY": b"\x01\x01", "POINT": b"\x01", "LINESTRING": b"\x02", "POLYGON": b"\x03",
+	"MULTIPOINT": b"\x04", "MULTILINESTRING": b"\x05", "MULTIPOLYGON": b"\x06", "GEOMETRYCOLLECTION": b"\x07",
+}
+
+def baseline_convert_cell(dtype, cell_data):
+	# Per-cell conversion of store_fetched_data_to_mongodb() before RowConverter, which converters must match.
+	target_dtype = find_converted_dtype(dtype)
+	if dtype == "VARBINARY":
+		return bytes(cell_data)
+	elif dtype == "VARCHAR":
+		return str(cell_data)
+	elif dtype == "BIT":
+		return cell_data
+	elif dtype == "DATE":
+		return datetime(cell_data.year, cell_data.month, cell_data.day)
+	elif target_dtype == "decimal":
+		return Decimal128(cell_data)
+	elif target_dtype == "object":
+		if type(cell_data) is str:
+			return cell_data
+		return tuple(cell_data)
+	return cell_data
+
+def test_every_data_type_has_sample():
+	assert set(SAMPLE_CELL_DICT.keys()) == set(CONVERTED_DTYPE_DICT.keys())
+
+def test_find_cell_converter():
+	assert find_cell_converter("VARBINARY") is bytes
+	assert find_cell_converter("VARCHAR") is str
+	assert find_cell_converter("DATE") is convert_date_cell
+	assert [find_cell_converter(dtype) for dtype in ["DECIMAL", "DEC", "FIXED"]] == [Decimal128] * 3
+	assert [find_cell_converter(dtype) for dtype in ["ENUM", "SET", "JSON"]] == [convert_object_cell] * 3
+	assert [find_cell_converter(dtype) for dtype in ["INT", "YEAR", "BIT", "BLOB", "TEXT", "POINT", "UNKNOWN"]] == [None] * 7
+
+def test_cells_are_converted_as_before():
+	for dtype, cell_data in SAMPLE_CELL_DICT.items():
+		converter = find_cell_converter(dtype)
+		converted_data = cell_data if converter is None else converter(cell_data)
+		expected_data = baseline_convert_cell(dtype, cell_data)
+		assert converted_data == expected_data and type(converted_data) is type(expected_data), dtype
+
+def test_convert_rows():
+	dtype_list = list(SAMPLE_CELL_DICT.keys())
+	column_name_list = [f"col_{dtype.lower()}" for dtype in dtype_list]
+	row_converter = RowConverter(column_name_list, dtype_list)
+	row = tuple(SAMPLE_CELL_DICT.values())
+	# NULL cells are omitted, like before.
+	null_row = tuple(None if col_idx % 2 == 0 else cell_data for col_idx, cell_data in enumerate(row))
+	expected_doc = {col_name: baseline_convert_cell(dtype, cell_data) for col_name, dtype, cell_data in zip(column_name_list, dtype_list, row)}
+	expected_null_doc = {col_name: baseline_convert_cell(dtype, cell_data) for col_name, dtype, cell_data in zip(column_name_list, dtype_list, null_row) if cell_data is not None}
+	assert row_converter.convert_rows([row, null_row, ()]) == [expected_doc, expected_null_doc, {}]
+	assert list(row_converter.convert_row(row).keys()) == column_name_list
@@ -0,0 +1,16 @@
+"""Tests for sampling of sample_validation.py."""
+import pytest
+
+from ckanext.mysql2mongodb.data_conv.sample_validation import compute_mismatch_rate_upper_bound, generate_key_slice
+
+def test_generate_key_slice():
+	assert generate_key_slice(["film_id", "actor_id"], [(1, 2), (3, 4)]) == {
+		"condition": "(`film_id`, `actor_id`) IN ((%s, %s), (%s, %s))",
+		"params": (1, 2, 3, 4),
+	}
+
+def test_compute_mismatch_rate_upper_bound():
+	# Rule of three: a clean sample of n rows bounds mismatch rate by about 3 / n at 95% confidence.
+	assert compute_mismatch_rate_upper_bound(1000, 10 ** 6, 0.95) == pytest.approx(3 / 1000, rel=0.01)
+	assert compute_mismatch_rate_upper_bound(1000, 1000, 0.95) == 0.0
+	assert compute_mismatch_rate_upper_bound(0, 10, 0.95) == 1.0
@@ -0,0 +1,77 @@
+"""Tests for streaming mysqldump parser of sql_dump_parser.py."""
+import gzip, io
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from ckanext.mysql2mongodb.data_conv.sql_dump_parser import SqlDumpParseError, open_sql_dump, iterate_sql_statements, iterate_sql_dump_rows, parse_create_table
+from ckanext.mysql2mongodb.data_conv.sql_dump_compression import split_sql_dump_file_name
+
+SQL_DUMP = r"""-- MySQL dump 10.13  Distrib 8.0.22, for Linux (x86_64)
+/*!40101 SET NAMES utf8mb4 */;
+
+--
+-- Table structure for table `item`
+--
+
+DROP TABLE IF EXISTS `item`;
+CREATE TABLE `item` (
+  `item_id` int unsigned NOT NULL AUTO_INCREMENT,
+  `name` varchar(45) NOT NULL,
+  `price` decimal(5,2) DEFAULT NULL,
+  `tags` set('new','sale') DEFAULT '',
+  `added` date NOT NULL,
+  `updated` timestamp(3) NULL DEFAULT NULL,
+  `location` point DEFAULT NULL,
+  PRIMARY KEY (`item_id`),
+  KEY `idx_name` (`name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='items; (sold)';
+
+LOCK TABLES `item` WRITE;
+INSERT INTO `item` VALUES (1,'it''s; \"fine\"\n',9.99,'new,sale','2021-01-02','2021-01-02 03:04:05.600',0x000000000101000000000000000000F03F0000000000000040),(2,'b',NULL,'','2021-01-03',NULL,NULL);
+INSERT INTO `item` VALUES (3,'c',0.50,'sale','2021-01-04','2021-01-04 00:00:00.000',NULL);
+UNLOCK TABLES;
+
+DELIMITER ;;
+/*!50003 CREATE*/ /*!50003 TRIGGER `item_added` BEFORE INSERT ON `item` FOR EACH ROW SET NEW.added = NOW(); */;;
+DELIMITER ;
+"""
+
+def test_iterate_sql_statements():
+	statements = list(iterate_sql_statements(io.StringIO(SQL_DUMP)))
+	assert statements[0] == "/*!40101 SET NAMES utf8mb4 */"
+	assert statements[1] == "DROP TABLE IF EXISTS `item`"
+	assert statements[2].endswith("COMMENT='items; (sold)'")
+	assert statements[-1].startswith("/*!50003 CREATE*/") and statements[-1].endswith("NOW(); */")
+	assert len(statements) == 8
+
+def test_parse_create_table():
+	statement = list(iterate_sql_statements(io.StringIO(SQL_DUMP)))[2]
+	assert parse_create_table(statement) == ("item", [
+		("item_id", "INT"), ("name", "VARCHAR"), ("price", "DECIMAL"), ("tags", "SET"), ("added", "DATE"), ("updated", "TIMESTAMP"), ("location", "POINT"),
+	])
+	assert parse_create_table("DROP TABLE IF EXISTS `item`") is None
+	with pytest.raises(SqlDumpParseError):
+		parse_create_table("CREATE TABLE `t` (`a` int, `b` int GENERATED ALWAYS AS (`a` + 1) VIRTUAL)")
+
+def test_iterate_sql_dump_rows():
+	chunks = list(iterate_sql_dump_rows(io.StringIO(SQL_DUMP), chunk_size=2))
+	assert [(table_name, len(rows)) for table_name, _, rows in chunks] == [("item", 2), ("item", 1)]
+	column_name_list = chunks[0][1]
+	assert column_name_list == ["item_id", "name", "price", "tags", "added", "updated", "location"]
+	assert chunks[0][2][0] == [1, "it's; \"fine\"\n", Decimal("9.99"), {"new", "sale"}, date(2021, 1, 2), datetime(2021, 1, 2, 3, 4, 5, 600000), "POINT(1 2)"]
+	assert chunks[0][2][1] == [2, "b", None, set(), date(2021, 1, 3), None, None]
+
+def test_unhandled_data_statement():
+	with pytest.raises(SqlDumpParseError):
+		list(iterate_sql_dump_rows(io.StringIO(SQL_DUMP.replace("INSERT INTO", "REPLACE INTO"))))
+
+def test_compressed_sql_dump(tmp_path):
+	assert split_sql_dump_file_name("item.sql") == ("item", None)
+	assert split_sql_dump_file_name("item.sql.gz") == ("item", "gzip")
+	assert split_sql_dump_file_name("item.csv.gz") is None
+	file_path = tmp_path / "item.sql.gz"
+	file_path.write_bytes(gzip.compress(SQL_DUMP.encode("utf-8")))
+	with open_sql_dump(str(file_path)) as sql_stream:
+		assert [len(rows) for _, _, rows in iterate_sql_dump_rows(sql_stream)] == [3]
@@ -1,12 +1,22 @@
 import sys, json, bson, re, time
+import mysql.connector
 from ckanext.mysql2mongodb.data_conv.schema_conversion import SchemaConversion
-from ckanext.mysql2mongodb.data_conv.utilities import open_connection_mysql, open_connection_mongodb, import_json_to_mongodb, extract_dict, store_json_to_mongodb, load_mongodb_collection
+from ckanext.mysql2mongodb.data_conv.utilities import open_connection_mysql, open_connection_mongodb, import_json_to_mongodb, extract_dict, store_json_to_mongodb, load_mongodb_collection, iterate_mongodb_collection_chunks, open_worker_pool
+from ckanext.mysql2mongodb.data_conv.database_connection import ConvProcessOption
+from ckanext.mysql2mongodb.data_conv.table_partition import get_primary_key_slices
+from ckanext.mysql2mongodb.data_conv.row_converter import RowConverter, DocumentConverter, find_converted_dtype, find_cell_converter
+from ckanext.mysql2mongodb.data_conv.sql_dump_parser import SqlDumpParseError, open_sql_dump, iterate_sql_dump_rows
+from ckanext.mysql2mongodb.data_conv.load_data_infile import LOAD_DATA_LOCAL_DISABLED_ERRNO_LIST, generate_sql_loading_data, load_rows_into_table
+from ckanext.mysql2mongodb.data_conv.table_checksum import compare_table_copies
+from ckanext.mysql2mongodb.data_conv.direct_validation import merge_join_documents
+from ckanext.mysql2mongodb.data_conv.sample_validation import fetch_random_sample_keys, fetch_stratified_sample_keys, generate_key_slice, compute_mismatch_rate_upper_bound
 from bson.decimal128 import Decimal128
+from pymongo import UpdateMany
 from decimal import Decimal
 from bson import BSON
 from datetime import datetime
-from multiprocessing import Pool
-from itertools import repeat
+from multiprocessing import Pool, current_process
+from itertools import groupby, repeat
 	
 class DataConversion:
 	"""
@@ -18,18 +28,26 @@ class DataConversion:
 	def __init__(self):
 		super(DataConversion, self).__init__()
 
-	def set_config(self, schema_conv_init_option, schema_conv_output_option, schema):
+	def set_config(self, schema_conv_init_option, schema_conv_output_option, schema, conv_process_option = None, sql_dump_file = None):
 		"""
 		To set config, you need to provide:
 			- schema_conv_init_option: instance of class ConvInitOption, which specified connection to "Input" database (MySQL).
 			- schema_conv_output_option: instance of class ConvOutputOption, which specified connection to "Out" database (MongoDB).
 			- schema: MySQL schema object which was loaded from MongoDB.
+			- conv_process_option: (optional) instance of class ConvProcessOption, which specified tuning options of conversion.
+			- sql_dump_file: (optional) path of mysqldump file which data is parsed from, when it was not restored into MySQL ("dump" input mode).
 		"""
 		self.schema = schema
+		self.sql_dump_file = sql_dump_file
 		#set config
 		self.schema_conv_init_option = schema_conv_init_option
 		self.schema_conv_output_option = schema_conv_output_option
+		if conv_process_option is None:
+			conv_process_option = ConvProcessOption()
+		self.conv_process_option = conv_process_option
 		self.validated_dbname = self.schema_conv_init_option.dbname + "_validated"
+		# Set when server refuses LOAD DATA LOCAL INFILE, so other tables are inserted without trying it again.
+		self.load_data_disabled = False
 
 	def run(self):
 		self.__save()
@@ -37,11 +55,19 @@ class DataConversion:
 
 	def __save(self):
 		tic = time.time()
-		self.migrate_mysql_to_mongodb()
+		if self.sql_dump_file is None:
+			self.migrate_mysql_to_mongodb()
+		else:
+			self.migrate_sql_dump_to_mongodb()
 		toc = time.time()
 		time_taken=round((toc-tic)*1000, 1)
 		print(f"Time for migrating MySQL to MongoDB: {time_taken}")
-		self.validate()
+		if self.conv_process_option.constraint_mode == "after-load":
+			self.schema.create_mongo_constraints()
+		if self.sql_dump_file is None:
+			self.validate()
+		else:
+			self.validate_sql_dump()
 		self.convert_relations_to_references()
 
 	def validate(self):
@@ -55,7 +81,15 @@ class DataConversion:
 			3.3 Deinfe constraint
 		4 Import data to MySQL
 		5 Evaluate 
+		In "direct" mode (see ConvProcessOption.validation_mode), MySQL data is compared with MongoDB directly instead, see validate_directly(),
+		in "sample" mode only a sample of rows is compared, see validate_by_sample().
 		"""
+		if self.conv_process_option.validation_mode == "direct":
+			self.validate_directly()
+			return
+		if self.conv_process_option.validation_mode == "sample":
+			self.validate_by_sample()
+			return
 
 		mysql_connection = self.create_validated_database()
 
@@ -76,12 +110,217 @@ class DataConversion:
 		self.create_triggers(mysql_connection)
 
 		if mysql_connection.is_connected():
+			# Pooled connection can not be used after it was closed (given back to pool), so server version is read before.
+			server_info = mysql_connection.get_server_info()
 			mysql_connection.close()
-			print("Disconnected to MySQL Server version ", mysql_connection.get_server_info())
+			print("Disconnected to MySQL Server version ", server_info)
 
 
 		self.write_validation_log()
 
+	def validate_directly(self):
+		"""
+		Compare data of every table in MySQL with its collection in MongoDB, without writing anything to MySQL.
+		Rows (converted by the same RowConverter as migration) and documents are streamed in primary key order and merge-joined,
+		see merge_join_documents(). Missing, extra and mismatched rows of every table are written to validation log.
+		"""
+		print("Start validating directly!")
+		mongodb_conn = open_connection_mongodb(
+			self.schema_conv_output_option.host,
+			self.schema_conv_output_option.username,
+			self.schema_conv_output_option.password,
+			self.schema_conv_output_option.port, 
+			self.schema_conv_output_option.dbname
+			)
+		for table_name in self.schema.get_tables_name_list():
+			tic = time.time()
+			table_difference = merge_join_documents(table_name, self.iterate_table_documents(table_name), self.iterate_collection_documents(table_name), self.schema.get_table_primary_key_columns(table_name))
+			toc = time.time()
+			time_taken = round((toc-tic)*1000, 1)
+			print(f"Time for validating table {table_name} ({table_difference.rows} rows, {table_difference.documents} documents): {time_taken}")
+			if table_difference.has_difference():
+				print(f"Data of table {table_name} differs from MongoDB: {table_difference.difference_count_dict}")
+			store_json_to_mongodb(mongodb_conn, "validating_log", table_difference.to_log())
+		print("Writing log done!")
+
+	def validate_sql_dump(self):
+		"""
+		Validate data which was migrated from mysqldump file ("dump" input mode), it was never staged in MySQL.
+		Dump is parsed again and its rows are converted by the same RowConverter as migration, then merge-joined with documents
+		of their collection as validate_directly() does (mysqldump writes rows of InnoDB tables in primary key order).
+		Tables which have no row in dump are compared with their collection too. Differences of every table are written to validation log.
+		"""
+		print("Start validating dump!")
+		mongodb_conn = open_connection_mongodb(
+			self.schema_conv_output_option.host,
+			self.schema_conv_output_option.username,
+			self.schema_conv_output_option.password,
+			self.schema_conv_output_option.port, 
+			self.schema_conv_output_option.dbname
+			)
+		table_name_list = self.schema.get_tables_name_list()
+		validated_table_set = set()
+		with open_sql_dump(self.sql_dump_file) as sql_stream:
+			dump_rows = iterate_sql_dump_rows(sql_stream, self.conv_process_option.migration_chunk_size)
+			for table_name, table_chunks in groupby(dump_rows, key=lambda dump_chunk: dump_chunk[0]):
+				if table_name in validated_table_set:
+					# Data was migrated already, so validation must not fail here (SqlDumpParseError would make caller restore the dump and migrate it again).
+					print(f"Rows of table {table_name} are not dumped together, skip validating the rest of them!")
+					store_json_to_mongodb(mongodb_conn, "validating_log", {"table-name": table_name, "validation-mode": "dump", "skipped": "Rows of table are not dumped together, the first part of them was validated only."})
+					continue
+				validated_table_set.add(table_name)
+				self.validate_one_sql_dump_table(mongodb_conn, table_name, table_chunks)
+		for table_name in table_name_list:
+			if table_name not in validated_table_set:
+				self.validate_one_sql_dump_table(mongodb_conn, table_name, [])
+		print("Writing log done!")
+
+	def validate_one_sql_dump_table(self, mongodb_conn, table_name, table_chunks):
+		"""
+		Merge-join rows of one table, which are chunks yielded by iterate_sql_dump_rows(), with documents of its collection.
+		"""
+		tic = time.time()
+		row_converter = self.get_row_converter(table_name)
+		row_docs = (doc for _, _, fetched_data_list in table_chunks for doc in row_converter.convert_rows(fetched_data_list))
+		table_difference = merge_join_documents(table_name, row_docs, self.iterate_collection_documents(table_name), self.schema.get_table_primary_key_columns(table_name))
+		toc = time.time()
+		time_taken = round((toc-tic)*1000, 1)
+		print(f"Time for validating table {table_name} of dump ({table_difference.rows} rows, {table_difference.documents} documents): {time_taken}")
+		if table_difference.has_difference():
+			print(f"Data of table {table_name} in dump differs from MongoDB: {table_difference.difference_count_dict}")
+		log_data = table_difference.to_log()
+		log_data["validation-mode"] = "dump"
+		store_json_to_mongodb(mongodb_conn, "validating_log", log_data)
+
+	def validate_by_sample(self):
+		"""
+		Validate every table by exact row counts of MySQL and MongoDB, and a sample of ConvProcessOption.validation_sample_rows rows,
+		which are chosen by primary key ("random" or "stratified", see ConvProcessOption.validation_sample_method) and compared directly.
+		If a random sample has no mismatch, upper bound of mismatch rate (at ConvProcessOption.validation_confidence) is logged (stratified samples do not give one).
+		Otherwise (or if counts differ) validation of table is escalated to full direct validation, see validate_directly().
+		Tables without primary key are checked by counts only.
+		"""
+		print("Start validating by sample!")
+		mongodb_conn = open_connection_mongodb(
+			self.schema_conv_output_option.host,
+			self.schema_conv_output_option.username,
+			self.schema_conv_output_option.password,
+			self.schema_conv_output_option.port, 
+			self.schema_conv_output_option.dbname
+			)
+		mysql_conn = open_connection_mysql(
+			self.schema_conv_init_option.host, 
+			self.schema_conv_init_option.username, 
+			self.schema_conv_init_option.password,
+			self.schema_conv_init_option.dbname
+			)
+		mysql_cur = mysql_conn.cursor(buffered=True)
+		table_columns_list = self.schema.get_table_column_and_data_type()
+		sample_rows = self.conv_process_option.validation_sample_rows
+		sample_method = self.conv_process_option.validation_sample_method
+		confidence = self.conv_process_option.validation_confidence
+		try:
+			for table_name in self.schema.get_tables_name_list():
+				tic = time.time()
+				key_columns = self.schema.get_table_primary_key_columns(table_name)
+				mysql_cur.execute(f"SELECT COUNT(*) FROM `{table_name}`")
+				rows_num = mysql_cur.fetchone()[0]
+				documents_num = mongodb_conn[table_name].count_documents({})
+
+				sample_key_list = []
+				if len(key_columns) > 0:
+					if sample_method == "stratified":
+						numeric_key = len(key_columns) == 1 and self.find_converted_dtype(table_columns_list[table_name][key_columns[0]]) == "integer"
+						sample_key_list = fetch_stratified_sample_keys(mysql_cur, table_name, key_columns, numeric_key, sample_rows, rows_num)
+					else:
+						sample_key_list = fetch_random_sample_keys(mysql_cur, table_name, key_columns, sample_rows)
+				sample_difference = merge_join_documents(table_name,
+					self.iterate_table_documents(table_name, generate_key_slice(key_columns, sample_key_list)) if len(sample_key_list) > 0 else [],
+					self.iterate_sampled_collection_documents(table_name, sample_key_list), key_columns)
+				escalated = rows_num != documents_num or sample_difference.has_difference()
+
+				log_data = {
+					"table-name": table_name,
+					"validation-mode": "sample",
+					"rows": rows_num,
+					"documents": documents_num,
+					"sample-method": sample_method,
+					"sample-rows": len(sample_key_list),
+					"sample": sample_difference.to_log(),
+					"confidence": confidence,
+					# Bound holds for key-sampled tables which sample is clean, tables without primary key are not sampled.
+					# Bound holds for uniform random samples only, strata of stratified sample are not sampled uniformly (gaps of keys, first keys of pages).
+					"mismatch-rate-upper-bound": compute_mismatch_rate_upper_bound(len(sample_key_list), rows_num, confidence) if sample_method == "random" and not escalated and len(key_columns) > 0 else None,
+					"escalated": escalated,
+				}
+				if escalated:
+					print(f"Sample of table {table_name} found a mismatch ({rows_num} rows, {documents_num} documents), validate the whole table!")
+					table_difference = merge_join_documents(table_name, self.iterate_table_documents(table_name), self.iterate_collection_documents(table_name), key_columns)
+					log_data["full"] = table_difference.to_log()
+				toc = time.time()
+				time_taken = round((toc-tic)*1000, 1)
+				print(f"Time for validating table {table_name} by {len(sample_key_list)} sampled rows (mismatch rate upper bound {log_data['mismatch-rate-upper-bound']}): {time_taken}")
+				store_json_to_mongodb(mongodb_conn, "validating_log", log_data)
+		finally:
+			mysql_cur.close()
+			mysql_conn.close()
+		print("Writing log done!")
+
+	def iterate_sampled_collection_documents(self, table_name, key_list):
+		"""
+		Load documents of collection which primary keys are listed (as MySQL cells, see fetch_random_sample_keys()), without "_id".
+		Keys are converted as migration converts their cells, so they match stored fields.
+		"""
+		if len(key_list) == 0:
+			return []
+		key_columns = self.schema.get_table_primary_key_columns(table_name)
+		colname_coltype_dict = self.schema.get_table_column_and_data_type()[table_name]
+		key_converters = [find_cell_converter(colname_coltype_dict[col_name]) for col_name in key_columns]
+		key_doc_list = []
+		for key in key_list:
+			key_doc_list.append({col_name: cell if converter is None or cell is None else converter(cell) for col_name, converter, cell in zip(key_columns, key_converters, key)})
+		if len(key_columns) == 1:
+			query = {key_columns[0]: {"$in": [key_doc[key_columns[0]] for key_doc in key_doc_list]}}
+		else:
+			query = {"$or": key_doc_list}
+		mongodb_conn = open_connection_mongodb(
+			self.schema_conv_output_option.host,
+			self.schema_conv_output_option.username,
+			self.schema_conv_output_option.password,
+			self.schema_conv_output_option.port, 
+			self.schema_conv_output_option.dbname
+			)
+		return mongodb_conn[table_name].find(query, {"_id": 0})
+
+	def iterate_table_documents(self, table_name, table_slice = None):
+		"""
+		Fetch rows of table (or of its primary key slice) from MySQL in primary key order, and convert them to documents as migration does.
+		"""
+		row_converter = self.get_row_converter(table_name)
+		for fetched_data in self.iterate_fetched_data_chunks(table_name, table_slice=table_slice, ordered=True):
+			for doc in row_converter.convert_rows(fetched_data):
+				yield doc
+
+	def iterate_collection_documents(self, table_name):
+		"""
+		Load documents of collection from MongoDB in primary key order of table, without "_id".
+		"""
+		key_columns = self.schema.get_table_primary_key_columns(table_name)
+		doc_chunks = iterate_mongodb_collection_chunks(
+			self.schema_conv_output_option.host, 
+			self.schema_conv_output_option.username, 
+			self.schema_conv_output_option.password, 
+			self.schema_conv_output_option.port, 
+			self.schema_conv_output_option.dbname, 
+			table_name,
+			projection = {"_id": 0},
+			chunk_size = self.conv_process_option.migration_chunk_size,
+			sort = [(col_name, 1) for col_name in key_columns] if len(key_columns) > 0 else None
+		)
+		for doc_chunk in doc_chunks:
+			for doc in doc_chunk:
+				yield doc
+
 	def create_validated_database(self):
 		"""
 		Create validated database.
@@ -107,9 +346,14 @@ class DataConversion:
 		
 		mycursor.execute(f"CREATE DATABASE {self.validated_dbname}")
 		mycursor.close()
+		server_info = mydb.get_server_info()
 		mydb.close()
-		print("Disconnected to MySQL Server version ", mydb.get_server_info())
-		mydb = open_connection_mysql(host, username, password, self.validated_dbname)
+		print("Disconnected to MySQL Server version ", server_info)
+		mydb = open_connection_mysql(host, username, password, self.validated_dbname, allow_local_infile = self.conv_process_option.validation_load_mode == "load-data")
+		# Migrated TIMESTAMP values are in UTC (see iterate_fetched_data_chunks()), so they are written back in UTC too.
+		mycursor = mydb.cursor()
+		mycursor.execute("SET time_zone = '+00:00'")
+		mycursor.close()
 		print("Create validated table successfully!")
 		return mydb
 
@@ -604,64 +848,81 @@ class DataConversion:
 	def migrate_mongodb_to_mysql(self, mysql_connection):
 		"""
 		Migrate data from MongoDB back to MySQL
+		In "load-data" mode (see ConvProcessOption.validation_load_mode), unique and foreign key checks of session are disabled while loading.
 		"""
-		# for collection_name in self.schema.get_tables_name_list():
-		for collection_name in self.schema.get_tables_name_list()[:]:
-			self.migrate_one_collection_to_table(mysql_connection, collection_name)
+		use_load_data = self.conv_process_option.validation_load_mode == "load-data"
+		if use_load_data:
+			mycursor = mysql_connection.cursor()
+			mycursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+			mycursor.close()
+		try:
+			# for collection_name in self.schema.get_tables_name_list():
+			for collection_name in self.schema.get_tables_name_list()[:]:
+				self.migrate_one_collection_to_table(mysql_connection, collection_name)
+		finally:
+			if use_load_data:
+				mycursor = mysql_connection.cursor()
+				mycursor.execute("SET SESSION unique_checks = 1, foreign_key_checks = 1")
+				mycursor.close()
 
 	def migrate_one_collection_to_table(self, mysql_connection, collection_name):
 		"""
-		Migrate one collection from MongoDB back to MySQL
+		Migrate one collection from MongoDB back to MySQL.
+		Documents are streamed from a cursor (only fields of table columns are projected), chunk by chunk
+		(ConvProcessOption.migration_chunk_size documents), converted by a precompiled DocumentConverter,
+		and inserted by one executemany per chunk, which is committed at once. So memory does not grow with size of collection.
+		In "load-data" mode (see ConvProcessOption.validation_load_mode) chunks are loaded by LOAD DATA LOCAL INFILE instead,
+		rows are inserted if server refuses it.
 		"""
-		datas = load_mongodb_collection(
+		tic = time.time()
+		colname_coltype_dict = self.schema.get_table_column_and_data_type()[collection_name]
+		columns_name_list = list(colname_coltype_dict.keys())
+		document_converter = DocumentConverter(columns_name_list, list(colname_coltype_dict.values()))
+
+		# Geometry columns were migrated as WKT, see generate_sql_selecting_table().
+		geometry_columns_name_list = [col_name for col_name in columns_name_list if self.find_converted_dtype(colname_coltype_dict[col_name]) == "single-geometry"]
+		columns_value_sql = ["ST_GeomFromText(%s)" if col_name in geometry_columns_name_list else "%s" for col_name in columns_name_list]
+		sql = f"""INSERT IGNORE INTO {collection_name} ({", ".join([f"`{col_name}`" for col_name in columns_name_list])}) VALUES ({", ".join(columns_value_sql)})"""
+		use_load_data = self.conv_process_option.validation_load_mode == "load-data" and not self.load_data_disabled
+		sql_loading_data = generate_sql_loading_data(collection_name, columns_name_list, geometry_columns_name_list)
+
+		projection = dict.fromkeys(columns_name_list, 1)
+		projection["_id"] = 0
+		doc_chunks = iterate_mongodb_collection_chunks(
 			self.schema_conv_output_option.host, 
 			self.schema_conv_output_option.username, 
 			self.schema_conv_output_option.password, 
 			self.schema_conv_output_option.port, 
 			self.schema_conv_output_option.dbname, 
-			collection_name
+			collection_name,
+			projection = projection,
+			chunk_size = self.conv_process_option.migration_chunk_size
 		)
-		db_schema = self.schema.get()
-		col_dict = self.schema.get_columns_dict()
-		table_coluuid_list = list(filter(lambda table_schema: table_schema["name"] == collection_name, db_schema["catalog"]["tables"]))[0]["columns"]
-		columns_name_list = [col_dict[col_uuid] for col_uuid in table_coluuid_list]
-		columns_num = len(columns_name_list)
-
-		columns_name_sql = ["%s"] * columns_num
-		cols_info = list(filter(lambda col_inf: col_inf["table-name"] == collection_name, self.get_columns_info()))
-		for i in range(len(columns_name_sql)):
-			for col_info in cols_info:
-				if col_info["column-name"] == columns_name_list[i]:
-					if col_info["column-type"][:8] == "geometry":
-						columns_name_sql[i] = f"ST_GeomFromText({columns_name_sql[i]})"
-						break
-
+		migrated_rows = 0
 		mycursor = mysql_connection.cursor()
-		sql = f"""INSERT IGNORE INTO {collection_name} ({", ".join(columns_name_list)}) VALUES ({", ".join(columns_name_sql)})"""
-		# val = [[data[key] for key in columns_name_list] for data in datas]
-		val = []
-		for data in datas:
-			row = []
-			for key in columns_name_list:
-				if key in data.keys():
-					dtype = type(data[key])
-					if dtype is Decimal128:
-						cell_data = data[key].to_decimal()
-					elif dtype is list:
-						# return
-						cell_data = ",".join(data[key])
-					elif dtype is dict:
-						print(data[key])
-						return
-					else:
-						cell_data = data[key]
-				else:
-					cell_data = None
-				row.append(cell_data)
-			val.append(row)
-		mycursor.executemany(sql, val)
-		mysql_connection.commit()
-		print("Insert done!")		
+		try:
+			for doc_chunk in doc_chunks:
+				rows = document_converter.convert_documents(doc_chunk)
+				if use_load_data:
+					try:
+						load_rows_into_table(mysql_connection, sql_loading_data, rows)
+					except mysql.connector.Error as e:
+						if e.errno not in LOAD_DATA_LOCAL_DISABLED_ERRNO_LIST:
+							raise e
+						print(e)
+						print("LOAD DATA LOCAL INFILE is not allowed, insert rows instead!")
+						self.load_data_disabled = True
+						use_load_data = False
+				if not use_load_data:
+					mycursor.executemany(sql, rows)
+					mysql_connection.commit()
+				migrated_rows = migrated_rows + len(doc_chunk)
+		finally:
+			mycursor.close()
+		toc = time.time()
+		time_taken = round((toc-tic)*1000, 1)
+		print(f"Time for migrating {migrated_rows} documents of collection {collection_name} back to MySQL: {time_taken}")
+		print("Insert done!")
 
 
 	# def specify_sequence_of_migrating_tables(self):
@@ -757,7 +1018,9 @@ class DataConversion:
 			<key>: <table name>,
 			<value>: Dict(
 				schema: <schema log>,
-				data: <data log>
+				data: <data log>, rows which differ, see compare_table_copies(),
+				data-chunks: <number of primary key slices which were compared by checksum>,
+				mismatched-data-chunks: <number of slices which checksums differ>
 			)
 		)
 		"""
@@ -799,8 +1062,10 @@ class DataConversion:
 			self.schema_conv_init_option.host, 
 			self.schema_conv_init_option.username, 
 			self.schema_conv_init_option.password,
+			self.schema_conv_init_option.dbname
 			)
 		mysql_cur = mysql_conn.cursor()
+		tables_rows_dict = self.schema.get_tables_rows_dict()
 
 		table_columns_list = self.schema.get_table_column_and_data_type()
 
@@ -825,19 +1090,8 @@ class DataConversion:
 			"""
 
 			columns_of_table = list(table_columns_list[table_name])
-			columns_sql = ",".join(columns_of_table)
-
-			data_validating_sql = f"""
-				select {columns_sql}
-				from
-				(
-					SELECT * FROM {self.schema_conv_init_option.dbname}.{table_name} as A
-					union all
-					SELECT * FROM {self.validated_dbname}.{table_name} as B
-				) as C
-				group by {columns_sql}
-				having count(*) = 1
-			"""
+			key_columns = self.schema.get_table_primary_key_columns(table_name)
+			numeric_key = len(key_columns) == 1 and self.find_converted_dtype(table_columns_list[table_name][key_columns[0]]) == "integer"
 
 			log_data = {}
 			log_data["table-name"] = table_name
@@ -846,9 +1100,16 @@ class DataConversion:
 			schema_validating_data = mysql_cur.fetchall()
 			log_data["schema"] = schema_validating_data
 
-			mysql_cur.execute(data_validating_sql)
-			data_validating_data = mysql_cur.fetchall()
-			log_data["data"] = data_validating_data
+			# Data is compared by checksums of primary key slices, rows are compared only in slices which differ.
+			tic = time.time()
+			data_difference = compare_table_copies(mysql_conn, table_name, self.validated_dbname, columns_of_table, key_columns, numeric_key,
+				tables_rows_dict.get(table_name, 0), self.conv_process_option.validation_chunk_rows)
+			log_data["data"] = data_difference["rows"]
+			log_data["data-chunks"] = data_difference["chunks"]
+			log_data["mismatched-data-chunks"] = data_difference["mismatched-chunks"]
+			toc = time.time()
+			time_taken = round((toc-tic)*1000, 1)
+			print(f"Time for validating data of table {table_name} ({data_difference['chunks']} chunks, {data_difference['mismatched-chunks']} mismatched): {time_taken}")
 
 			store_json_to_mongodb(mongodb_conn, "validating_log", log_data)
 
@@ -862,57 +1123,52 @@ class DataConversion:
 		Mapping data type from MySQL to MongoDB.
 		Just use this function for migrate_mysql_to_mongodb function
 		"""
-		mongodb_dtype = {
-			"integer": "integer",
-			"decimal": "decimal",
-			"double": "double",
-			"boolean": "boolean",
-			"date": "date",
-			"timestamp": "timestamp",
-			"binary": "binary",
-			"blob": "blob",
-			"string": "string",
-			"object": "object",
-			"single-geometry": "single-geometry",
-			"multiple-geometry": "multiple-geometry",
-		}
-		
-		dtype_dict = {}
-		dtype_dict[mongodb_dtype["integer"]] = ["TINYINT", "SMALLINT", "MEDIUMINT", "INT", "INTEGER", "BIGINT"]
-		dtype_dict[mongodb_dtype["decimal"]] = ["DECIMAL", "DEC", "FIXED"]
-		dtype_dict[mongodb_dtype["double"]] = ["FLOAT", "DOUBLE", "REAL"]
-		dtype_dict[mongodb_dtype["boolean"]] = ["BOOL", "BOOLEAN"]
-		dtype_dict[mongodb_dtype["date"]] = ["DATE", "YEAR"]
-		dtype_dict[mongodb_dtype["timestamp"]] = ["DATETIME", "TIMESTAMP", "TIME"]
-		dtype_dict[mongodb_dtype["binary"]] = ["BIT", "BINARY", "VARBINARY"]
-		dtype_dict[mongodb_dtype["blob"]] = ["TINYBLOB", "BLOB", "MEDIUMBLOB", "LONGBLOB"]
-		dtype_dict[mongodb_dtype["string"]] = ["CHARACTER", "CHARSET", "ASCII", "UNICODE", "CHAR", "VARCHAR", "TINYTEXT", "TEXT", "MEDIUMTEXT", "LONGTEXT"]
-		dtype_dict[mongodb_dtype["object"]] = ["ENUM", "SET", "JSON"]
-		dtype_dict[mongodb_dtype["single-geometry"]] = ["GEOMETRY", "POINT", "LINESTRING", "POLYGON"]
-		dtype_dict[mongodb_dtype["multiple-geometry"]] = ["MULTIPOINT", "MULTILINESTRING", "MULTIPOLYGON", "GEOMETRYCOLLECTION"]
-
-		for target_dtype in dtype_dict.keys():
-			if(mysql_dtype) in dtype_dict[target_dtype]:
-				return mongodb_dtype[target_dtype]
-		return None 
+		return find_converted_dtype(mysql_dtype)
 
 	def migrate_mysql_to_mongodb(self):
 		"""
 		Migrate data from MySQL to MongoDB.
+		Tables are spread over a pool of ConvProcessOption.migration_workers workers (processes or threads, see ConvProcessOption.migration_pool_type).
+		Every worker opens its own MySQL and MongoDB connections in migrate_one_table_to_collection().
+		Biggest tables are scheduled first, so total time approaches the time of the biggest table instead of the sum of all tables.
 		"""
-		for table in self.schema.get_tables_name_list():
-			self.migrate_one_table_to_collection(table)
-		# table_name_list = self.schema.get_tables_name_list()
-		# with Pool() as pool:
-		# 	pool.map(self.migrate_one_table_to_collection, table_name_list)
-		# 	pool.close()
-		# 	pool.join()
-
+		table_size_dict = self.schema.get_tables_size_dict()
+		table_name_list = sorted(self.schema.get_tables_name_list(), key=lambda table: table_size_dict.get(table, 0), reverse=True)
+		workers = self.conv_process_option.migration_workers
+		if workers is None or workers <= 1 or len(table_name_list) <= 1:
+			for table in table_name_list:
+				self.migrate_one_table_to_collection(table)
+			return
+		with open_worker_pool(self.conv_process_option.migration_pool_type, min(workers, len(table_name_list))) as pool:
+			for _ in pool.imap_unordered(self.migrate_one_table_to_collection, table_name_list):
+				pass
 
 		
 	def migrate_one_table_to_collection(self, table_name):
-		fetched_data_list = self.get_fetched_data_list(table_name)
-		convert_data_list = self.store_fetched_data_to_mongodb(table_name, fetched_data_list)
+		"""
+		Migrate one table from MySQL to MongoDB.
+		Big tables are split into contiguous primary key slices (see get_table_slices()), which are migrated concurrently into the same collection
+		by a pool of ConvProcessOption.migration_partition_workers workers.
+		"""
+		table_slices = self.get_table_slices(table_name)
+		workers = min(self.conv_process_option.migration_partition_workers, len(table_slices))
+		if workers <= 1:
+			for table_slice in table_slices:
+				self.migrate_one_table_slice_to_collection(table_name, table_slice)
+			return
+		# Daemonic processes (e.g. workers of migrate_mysql_to_mongodb()) are not allowed to have children.
+		pool_type = "thread" if current_process().daemon else self.conv_process_option.migration_pool_type
+		with open_worker_pool(pool_type, workers) as pool:
+			pool.starmap(self.migrate_one_table_slice_to_collection, zip(repeat(table_name), table_slices))
+		print(f"Migrate table {table_name} in {len(table_slices)} slices successfully!")
+
+	def migrate_sql_dump_to_mongodb(self):
+		"""
+		Migrate data from mysqldump file to MongoDB, without restoring it into MySQL.
+		Rows of INSERT statements are streamed chunk by chunk (see iterate_sql_dump_rows()), typed by table definitions of the dump,
+		converted by the same row converters as rows selected from MySQL, then written to MongoDB.
+		Raise SqlDumpParseError if the dump has a statement or value which parser does not handle.
+		"""
 		mongodb_connection = open_connection_mongodb(
 			self.schema_conv_output_option.host,
 			self.schema_conv_output_option.username,
@@ -920,129 +1176,151 @@ class DataConversion:
 			self.schema_conv_output_option.port, 
 			self.schema_conv_output_option.dbname
 			)
-		store_json_to_mongodb(mongodb_connection, table_name, convert_data_list)
-		
-	def get_fetched_data_list(self, table_name):
+		table_columns_dict = self.schema.get_table_column_and_data_type()
+		with open_sql_dump(self.sql_dump_file) as sql_stream:
+			for table_name, column_name_list, fetched_data_list in iterate_sql_dump_rows(sql_stream, self.conv_process_option.migration_chunk_size):
+				if table_name not in table_columns_dict or list(table_columns_dict[table_name].keys()) != column_name_list:
+					raise SqlDumpParseError(f"Columns of table {table_name} in dump do not match MySQL schema!")
+				convert_data_list = self.store_fetched_data_to_mongodb(table_name, fetched_data_list)
+				store_json_to_mongodb(mongodb_connection, table_name, convert_data_list,
+					batch_size=self.conv_process_option.insert_batch_size,
+					batch_bytes=self.conv_process_option.insert_batch_bytes,
+					max_in_flight=self.conv_process_option.insert_max_in_flight)
+		print(f"Migrate data of dump {self.sql_dump_file} successfully!")
+
+	def get_table_slices(self, table_name):
+		"""
+		Split table into contiguous primary key slices, about ConvProcessOption.migration_partition_rows rows per slice.
+		Tables which have a single integer primary key are split by key range, other tables by keyset pages.
+		Return [None] (the whole table) if table is small, has no primary key or partitioning is disabled.
+		"""
+		if self.conv_process_option.migration_partition_workers <= 1:
+			return [None]
+		rows_num = self.schema.get_tables_rows_dict().get(table_name, 0)
+		partitions = -(-rows_num // self.conv_process_option.migration_partition_rows)
+		key_columns = self.schema.get_table_primary_key_columns(table_name)
+		if partitions <= 1 or len(key_columns) == 0:
+			return [None]
 		colname_coltype_dict = self.schema.get_table_column_and_data_type()[table_name]
+		numeric_key = len(key_columns) == 1 and self.find_converted_dtype(colname_coltype_dict[key_columns[0]]) == "integer"
+		db_connection = open_connection_mysql(
+			self.schema_conv_init_option.host, 
+			self.schema_conv_init_option.username, 
+			self.schema_conv_init_option.password, 
+			self.schema_conv_init_option.dbname, 
+		)
 		try:
-			db_connection = open_connection_mysql(
-				self.schema_conv_init_option.host, 
-				self.schema_conv_init_option.username, 
-				self.schema_conv_init_option.password, 
-				self.schema_conv_init_option.dbname, 
+			return get_primary_key_slices(db_connection, table_name, key_columns, numeric_key, partitions, rows_num)
+		finally:
+			db_connection.close()
+
+	def migrate_one_table_slice_to_collection(self, table_name, table_slice = None):
+		"""
+		Migrate one slice of table from MySQL to MongoDB. Slice None means the whole table.
+		Data is streamed chunk by chunk: each chunk of fetched rows is converted and written to MongoDB before the next chunk is fetched,
+		so memory usage is bounded by ConvProcessOption.migration_chunk_size instead of the size of table.
+		"""
+		mongodb_connection = open_connection_mongodb(
+			self.schema_conv_output_option.host,
+			self.schema_conv_output_option.username,
+			self.schema_conv_output_option.password,
+			self.schema_conv_output_option.port, 
+			self.schema_conv_output_option.dbname
 			)
-			if db_connection.is_connected():
-				# col_fetch_seq = []
-				sql_cmd = "SELECT"
-				for col_name in colname_coltype_dict.keys():
-					# col_fetch_seq.append(col_name)
-					dtype = colname_coltype_dict[col_name]
-					target_dtype = self.find_converted_dtype(dtype)
-
-					# Generating SQL for selecting from MySQL Database
-					if target_dtype is None:
-						raise Exception(f"Data type {dtype} has not been handled!")
-					elif target_dtype == "single-geometry":
-						sql_cmd = sql_cmd + " ST_AsText(" + col_name + "),"
-					else:
-						sql_cmd = sql_cmd + " `" + col_name + "`,"
-				#join sql
-				sql_cmd = sql_cmd[:-1] + " FROM " + table_name
-				db_cursor = db_connection.cursor();
-				#execute sql
-				db_cursor.execute(sql_cmd)
-				#fetch data and convert
-				fetched_data = db_cursor.fetchall()
-				db_cursor.close()
-				return fetched_data 
+		for fetched_data_list in self.iterate_fetched_data_chunks(table_name, table_slice=table_slice):
+			convert_data_list = self.store_fetched_data_to_mongodb(table_name, fetched_data_list)
+			store_json_to_mongodb(mongodb_connection, table_name, convert_data_list,
+				batch_size=self.conv_process_option.insert_batch_size,
+				batch_bytes=self.conv_process_option.insert_batch_bytes,
+				max_in_flight=self.conv_process_option.insert_max_in_flight)
+
+	def generate_sql_selecting_table(self, table_name, table_slice = None, ordered = False):
+		"""
+		Generate SQL command for selecting all columns of table from MySQL.
+		Columns are selected in the same order as get_table_column_and_data_type(), geometry columns are selected as WKT.
+		If table_slice is given, only rows of that primary key slice are selected (with %s placeholders for slice params).
+		If ordered is True, rows are selected in primary key order.
+		"""
+		colname_coltype_dict = self.schema.get_table_column_and_data_type()[table_name]
+		sql_cmd = "SELECT"
+		for col_name in colname_coltype_dict.keys():
+			dtype = colname_coltype_dict[col_name]
+			target_dtype = self.find_converted_dtype(dtype)
+
+			# Generating SQL for selecting from MySQL Database
+			if target_dtype is None:
+				raise Exception(f"Data type {dtype} has not been handled!")
+			elif target_dtype == "single-geometry":
+				sql_cmd = sql_cmd + " ST_AsText(" + col_name + "),"
 			else:
-				print("Connect fail!")
-		
-		except Exception as e:
-			print("Error while writing to MongoDB", e)
-		
+				sql_cmd = sql_cmd + " `" + col_name + "`,"
+		#join sql
+		sql_cmd = sql_cmd[:-1] + " FROM " + table_name
+		if table_slice is not None:
+			sql_cmd = sql_cmd + " WHERE " + table_slice["condition"]
+		key_columns = self.schema.get_table_primary_key_columns(table_name) if ordered else []
+		if len(key_columns) > 0:
+			sql_cmd = sql_cmd + " ORDER BY " + ", ".join([f"`{col_name}`" for col_name in key_columns])
+		return sql_cmd
+
+	def iterate_fetched_data_chunks(self, table_name, chunk_size = None, table_slice = None, ordered = False):
+		"""
+		Fetch data of table from MySQL chunk by chunk.
+		Rows are read from an unbuffered cursor, so the MySQL server streams result set while we are fetching
+		and at most one chunk (a list of no more than chunk_size rows) is held in memory at a time.
+		Params:
+			chunk_size: Number of rows per chunk. Default is ConvProcessOption.migration_chunk_size.
+			table_slice: Primary key slice of table (see get_table_slices()). Default is the whole table.
+			ordered: If True, rows are fetched in primary key order.
+		"""
+		if chunk_size is None:
+			chunk_size = self.conv_process_option.migration_chunk_size
+		sql_cmd = self.generate_sql_selecting_table(table_name, table_slice, ordered)
+		sql_params = table_slice["params"] if table_slice is not None else None
+		db_connection = open_connection_mysql(
+			self.schema_conv_init_option.host, 
+			self.schema_conv_init_option.username, 
+			self.schema_conv_init_option.password, 
+			self.schema_conv_init_option.dbname, 
+		)
+		db_cursor = None
+		try:
+			db_cursor = db_connection.cursor(buffered=False)
+			# TIMESTAMP values are selected in UTC, like mysqldump writes them (see migrate_sql_dump_to_mongodb()),
+			# so both migration modes store the same values whatever time zone of server is.
+			db_cursor.execute("SET time_zone = '+00:00'")
+			db_cursor.execute(sql_cmd, sql_params)
+			while True:
+				fetched_data = db_cursor.fetchmany(chunk_size)
+				if len(fetched_data) == 0:
+					break
+				yield fetched_data
 		finally:
-			if (db_connection.is_connected()):
+			if db_cursor is not None:
+				# If consumer stopped early (or failed), rows which were not fetched must be read before cursor can be closed.
+				if db_connection.unread_result:
+					db_connection.consume_results()
+				db_cursor.close()
+			if db_connection.is_connected():
 				db_connection.close()
 				print("MySQL connection is closed!")
 
+	def get_row_converter(self, table_name):
+		"""
+		Get precompiled row converter of table, which is built once per table.
+		"""
+		if not hasattr(self, "row_converter_dict"):
+			self.row_converter_dict = {}
+		if table_name not in self.row_converter_dict:
+			colname_coltype_dict = self.schema.get_table_column_and_data_type()[table_name]
+			self.row_converter_dict[table_name] = RowConverter(list(colname_coltype_dict.keys()), list(colname_coltype_dict.values()))
+		return self.row_converter_dict[table_name]
 
 	def store_fetched_data_to_mongodb(self, table_name, fetched_data):
 		"""
-		Parallel
+		Convert fetched MySQL rows of table to MongoDB documents.
 		"""
-		colname_coltype_dict = self.schema.get_table_column_and_data_type()[table_name]
-		rows = []
-		### Parallel start from here
-		for row in fetched_data:
-			data = {}
-			col_fetch_seq = list(colname_coltype_dict.keys())
-			for i in range(len(col_fetch_seq)):
-				col = col_fetch_seq[i]
-				dtype = colname_coltype_dict[col]
-				target_dtype = self.find_converted_dtype(dtype)
-				#generate SQL
-				cell_data = row[i]
-				if cell_data != None:
-					# if dtype == "GEOMETRY":
-					# 	geodata = [float(num) for num in cell_data[6:-1].split()]
-					# 	geo_x, geo_y = geodata[:2]
-					# 	if geo_x > 180 or geo_x < -180:
-					# 		geo_x = 0
-					# 	if geo_y > 90 or geo_y < -90:
-					# 		geo_y = 0
-					# 	converted_data = {
-					# 		"type": "Point",
-					# 		"coordinates": [geo_x, geo_y]
-					# 	}
-					if dtype == "GEOMETRY":
-						converted_data = cell_data
-					if dtype == "VARBINARY":
-						# print(type(cell_data), str(cell_data))
-						converted_data = bytes(cell_data)
-						# print(type(converted_data), converted_data)
-						# return
-					elif dtype == "VARCHAR":
-						# print(str[cell_data], type(cell_data))
-						# return
-						converted_data = str(cell_data)
-					elif dtype == "BIT":
-						###get col type from schema attribute 
-						# mysql_col_type = self.schema.get_col_type_from_schema_attribute(table, col)
-						# if mysql_col_type == "tinyint(1)":
-						# 	binary_num = cell_data
-						# 	converted_data = binary_num.to_bytes(len(str(binary_num)), byteorder="big")
-						# else:
-						# 	converted_data = cell_data
-						converted_data = cell_data
-					# elif dtype == "YEAR":
-						# print(cell_data, type(cell_data))
-					elif dtype == "DATE":
-						# print(cell_data, type(cell_data))
-						converted_data = datetime(cell_data.year, cell_data.month, cell_data.day)#, cell_data.hour, cell_data.minute, cell_data.second)
-					# elif dtype == "JSON":
-						# print(type(cell_data), cell_data)
-						# return
-					# elif dtype == "BLOB":
-						# print(cell_data, type(cell_data))
-						# return
-					elif target_dtype == "decimal":
-						converted_data = Decimal128(cell_data)
-					elif target_dtype == "object":
-						if type(cell_data) is str:
-							converted_data = cell_data
-						else:
-							converted_data = tuple(cell_data)
-					else:
-						converted_data = cell_data
-					data[col_fetch_seq[i]] = converted_data 
-			rows.append(data)
-		### Parallel end here
-
-		#assign to obj
-		#store to mongodb
-		# print("Start migrating table ", table)
-		return rows
+		return self.get_row_converter(table_name).convert_rows(fetched_data)
 
 	# def migrate_json_to_mongodb(self):
 	# 	"""
@@ -1059,6 +1337,58 @@ class DataConversion:
 	def convert_relations_to_references(self):
 		"""
 		Convert relations of MySQL table to database references of MongoDB
+		Keys which are used for matching documents are indexed (temporarily if needed) before conversion,
+		otherwise every relation would scan the whole collection for each key.
+		Relations are grouped by referencing collection: groups are converted concurrently by ConvProcessOption.relation_workers threads
+		(the work itself runs inside MongoDB), relations of one group are converted one by one because they write into the same collection.
+		"""
+		relation_list = self.get_relation_list()
+		created_index_list = self.create_relation_indexes(relation_list)
+		try:
+			relation_group_list = self.group_relations_by_referencing_collection(relation_list)
+			workers = self.conv_process_option.relation_workers
+			if workers is None or workers <= 1 or len(relation_group_list) <= 1:
+				for relation_group in relation_group_list:
+					self.convert_relation_group_to_references(relation_group)
+			else:
+				with open_worker_pool("thread", min(workers, len(relation_group_list))) as pool:
+					pool.map(self.convert_relation_group_to_references, relation_group_list, chunksize=1)
+		finally:
+			self.drop_relation_indexes(created_index_list)
+		print("Convert relations successfully!")
+
+	def group_relations_by_referencing_collection(self, relation_list):
+		"""
+		Group relations which write into the same referencing collection.
+		Return list of groups (list of relations), biggest groups first.
+		"""
+		relation_group_dict = {}
+		for relation_detail in relation_list:
+			relation_group_dict.setdefault(relation_detail["referencing_collection_name"], []).append(relation_detail)
+		return sorted(relation_group_dict.values(), key=len, reverse=True)
+
+	def convert_relation_group_to_references(self, relation_group):
+		"""
+		Convert relations of one group one by one.
+		"""
+		for relation_detail in relation_group:
+			self.convert_one_relation_to_reference(
+				relation_detail["original_collection_name"], 
+				relation_detail["referencing_collection_name"], 
+				relation_detail["original_key"], 
+				relation_detail["referencing_key"]) 
+
+	def get_relation_list(self):
+		"""
+		Get list of relations which will be converted, ordered by original table.
+		List[
+			Dict(
+				"original_collection_name": <name of table which holds primary key of relation>,
+				"referencing_collection_name": <name of table which holds foreign key of relation>,
+				"original_key": <primary key column name>,
+				"referencing_key": <foreign key column name>
+			)
+		]
 		"""
 		tables_name_list = self.schema.get_tables_name_list()
 		# db_connection = open_connection_mongodb(mongodb_connection_info)
@@ -1074,20 +1404,168 @@ class DataConversion:
 					if original_table not in edited_table_relations_dict.keys():
 						edited_table_relations_dict[original_table] = []
 					edited_table_relations_dict[original_table] = edited_table_relations_dict[original_table] + [extract_dict(["primary_key_column", "foreign_key_table", "foreign_key_column"])(tables_relations[key])]
-		# Convert each relation of each table
+		# List each relation of each table
+		relation_list = []
 		for original_collection_name in tables_name_list:
 			if original_collection_name in original_tables_set:
 				for relation_detail in edited_table_relations_dict[original_collection_name]:
-					referencing_collection_name = relation_detail["foreign_key_table"]
-					original_key = relation_detail["primary_key_column"]
-					referencing_key = relation_detail["foreign_key_column"]
-					self.convert_one_relation_to_reference(original_collection_name, referencing_collection_name, original_key, referencing_key) 
-		print("Convert relations successfully!")
+					relation_list.append({
+						"original_collection_name": original_collection_name,
+						"referencing_collection_name": relation_detail["foreign_key_table"],
+						"original_key": relation_detail["primary_key_column"],
+						"referencing_key": relation_detail["foreign_key_column"],
+					})
+		return relation_list
+
+	def create_relation_indexes(self, relation_list):
+		"""
+		Make sure every key which is used for matching documents of relations has an index, depending on ConvProcessOption.relation_conversion_mode:
+			- "lookup": Original key on original collection (matched by $lookup, referencing collection is scanned anyway).
+			- "bulk", "update": Referencing key on referencing collection (matched by UpdateMany, original collection is scanned anyway).
+		Only indexes which did not exist are created, and they are returned so they can be dropped after conversion.
+		Return List[tuple(<collection name>, <index name>)]
+		"""
+		db_connection = open_connection_mongodb(
+			self.schema_conv_output_option.host,
+			self.schema_conv_output_option.username,
+			self.schema_conv_output_option.password,
+			self.schema_conv_output_option.port, 
+			self.schema_conv_output_option.dbname
+			)
+		relation_conversion_mode = self.conv_process_option.relation_conversion_mode
+		indexed_key_set = set()
+		for relation_detail in relation_list:
+			if relation_conversion_mode == "lookup":
+				indexed_key_set.add((relation_detail["original_collection_name"], relation_detail["original_key"]))
+			else:
+				indexed_key_set.add((relation_detail["referencing_collection_name"], relation_detail["referencing_key"]))
+		created_index_list = []
+		total_time_taken = 0
+		for collection_name, key in sorted(indexed_key_set):
+			collection = db_connection[collection_name]
+			# An index can be used if key is its first field.
+			if any(index_info["key"][0][0] == key for index_info in collection.index_information().values()):
+				continue
+			tic = time.time()
+			index_name = collection.create_index(key)
+			time_taken = round((time.time() - tic) * 1000, 1)
+			total_time_taken = total_time_taken + time_taken
+			print(f"Create temporary index {index_name} on collection {collection_name} in {time_taken} ms")
+			created_index_list.append((collection_name, index_name))
+		print(f"Time for creating {len(created_index_list)} temporary indexes of relations: {round(total_time_taken, 1)}")
+		return created_index_list
+
+	def drop_relation_indexes(self, created_index_list):
+		"""
+		Drop temporary indexes which were created by create_relation_indexes().
+		"""
+		db_connection = open_connection_mongodb(
+			self.schema_conv_output_option.host,
+			self.schema_conv_output_option.username,
+			self.schema_conv_output_option.password,
+			self.schema_conv_output_option.port, 
+			self.schema_conv_output_option.dbname
+			)
+		for collection_name, index_name in created_index_list:
+			db_connection[collection_name].drop_index(index_name)
 
 
 	def convert_one_relation_to_reference(self, original_collection_name, referencing_collection_name, original_key, referencing_key):
 		"""
 		Convert one relation of MySQL table to database reference of MongoDB
+		Method of conversion is chosen by ConvProcessOption.relation_conversion_mode.
+		"""
+		relation_conversion_mode = self.conv_process_option.relation_conversion_mode
+		if relation_conversion_mode == "lookup":
+			self.convert_one_relation_to_reference_by_lookup(original_collection_name, referencing_collection_name, original_key, referencing_key)
+		elif relation_conversion_mode == "bulk":
+			self.convert_one_relation_to_reference_by_bulk_write(original_collection_name, referencing_collection_name, original_key, referencing_key)
+		elif relation_conversion_mode == "update":
+			self.convert_one_relation_to_reference_by_update(original_collection_name, referencing_collection_name, original_key, referencing_key)
+		else:
+			raise Exception(f"Relation conversion mode {relation_conversion_mode} has not been handled!")
+
+	def convert_one_relation_to_reference_by_lookup(self, original_collection_name, referencing_collection_name, original_key, referencing_key):
+		"""
+		Convert one relation of MySQL table to database reference of MongoDB, using a single aggregation inside MongoDB:
+			- $lookup the referenced document of each referencing document by key.
+			- Build DBRef field db_ref_<referencing key> from _id of referenced document.
+			- $merge new field back into referencing collection.
+		Documents never pass through this worker. Require MongoDB 4.4 or newer ($merge into the aggregated collection).
+		"""
+		db_connection = open_connection_mongodb(
+			self.schema_conv_output_option.host,
+			self.schema_conv_output_option.username,
+			self.schema_conv_output_option.password,
+			self.schema_conv_output_option.port, 
+			self.schema_conv_output_option.dbname
+			)
+		referencing_key_new_name = "db_ref_" + referencing_key
+		# Field names of DBRef start with "$", so they must be built by $arrayToObject with literal keys.
+		new_reference = {"$arrayToObject": [[
+			{"k": {"$literal": "$ref"}, "v": {"$literal": original_collection_name}},
+			{"k": {"$literal": "$id"}, "v": {"$arrayElemAt": ["$_referenced_documents._id", -1]}},
+			{"k": {"$literal": "$db"}, "v": {"$literal": self.schema_conv_output_option.dbname}},
+		]]}
+		pipeline = [
+			{"$match": {referencing_key: {"$ne": None}}},
+			{"$lookup": {
+				"from": original_collection_name,
+				"localField": referencing_key,
+				"foreignField": original_key,
+				"as": "_referenced_documents"
+			}},
+			{"$match": {"_referenced_documents.0": {"$exists": True}}},
+			{"$project": {"_id": 1, referencing_key_new_name: new_reference}},
+			{"$merge": {
+				"into": referencing_collection_name,
+				"on": "_id",
+				"whenMatched": "merge",
+				"whenNotMatched": "discard"
+			}},
+		]
+		db_connection[referencing_collection_name].aggregate(pipeline, allowDiskUse=True)
+
+	def convert_one_relation_to_reference_by_bulk_write(self, original_collection_name, referencing_collection_name, original_key, referencing_key):
+		"""
+		Convert one relation of MySQL table to database reference of MongoDB, by sending unordered bulk_write batches of UpdateMany operations,
+		ConvProcessOption.relation_bulk_batch_size operations per batch. Work with MongoDB servers which do not support $merge.
+		Referenced documents are streamed with projection, so the whole referenced collection is never held in memory.
+		"""
+		db_connection = open_connection_mongodb(
+			self.schema_conv_output_option.host,
+			self.schema_conv_output_option.username,
+			self.schema_conv_output_option.password,
+			self.schema_conv_output_option.port, 
+			self.schema_conv_output_option.dbname
+			)
+		batch_size = self.conv_process_option.relation_bulk_batch_size
+		referencing_key_new_name = "db_ref_" + referencing_key
+		referencing_documents = db_connection[referencing_collection_name]
+		original_documents = db_connection[original_collection_name].find({original_key: {"$ne": None}}, projection={original_key: 1}, batch_size=batch_size)
+		tic = time.time()
+		operations = []
+		operations_num = 0
+		modified_num = 0
+		for doc in original_documents:
+			new_reference = {}
+			new_reference["$ref"] = original_collection_name
+			new_reference["$id"] = doc["_id"]
+			new_reference["$db"] = self.schema_conv_output_option.dbname
+			operations.append(UpdateMany({referencing_key: doc[original_key]}, {"$set": {referencing_key_new_name: new_reference}}))
+			if len(operations) >= batch_size:
+				modified_num = modified_num + referencing_documents.bulk_write(operations, ordered=False).modified_count
+				operations_num = operations_num + len(operations)
+				operations = []
+		if len(operations) > 0:
+			modified_num = modified_num + referencing_documents.bulk_write(operations, ordered=False).modified_count
+			operations_num = operations_num + len(operations)
+		time_taken = max(time.time() - tic, 1e-6)
+		print(f"Convert relation {referencing_collection_name}.{referencing_key} -> {original_collection_name}.{original_key}: {operations_num} operations, {modified_num} documents modified in {round(time_taken * 1000, 1)} ms, {round(operations_num / time_taken)} operations/s.")
+
+	def convert_one_relation_to_reference_by_update(self, original_collection_name, referencing_collection_name, original_key, referencing_key):
+		"""
+		Convert one relation of MySQL table to database reference of MongoDB, by sending one update_many per referenced key.
 		"""
 		db_connection = open_connection_mongodb(
 			self.schema_conv_output_option.host,
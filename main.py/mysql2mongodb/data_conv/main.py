@@ -1,27 +1,45 @@
 from ckanext.mysql2mongodb.data_conv.schema_conversion import SchemaConversion
-from ckanext.mysql2mongodb.data_conv.database_connection import ConvInitOption, ConvOutputOption
+from ckanext.mysql2mongodb.data_conv.database_connection import ConvInitOption, ConvOutputOption, ConvProcessOption
 from ckanext.mysql2mongodb.data_conv.data_conversion import DataConversion
 from ckanext.mysql2mongodb.data_conv.utilities import open_connection_mysql
-import urllib, json, re, os, requests
+from ckanext.mysql2mongodb.data_conv.connection_manager import ConnectionManager
+from ckanext.mysql2mongodb.data_conv.sql_dump_parser import SqlDumpParseError, open_sql_dump, open_sql_dump_stream, restore_sql_dump_schema
+from ckanext.mysql2mongodb.data_conv.sql_dump_restore import restore_sql_dump, restore_sql_dump_stream
+from ckanext.mysql2mongodb.data_conv.sql_dump_download import FileDownload
+from ckanext.mysql2mongodb.data_conv.sql_dump_compression import split_sql_dump_file_name, check_sql_dump_compression, find_sql_dump_compression, open_decompressed_stream, iterate_stream_chunks
+import urllib, json, re, os, requests, ast
 from pprint import pprint
 
 
-def convert_data(resource_id, sql_file_name, sql_file_url):
+def convert_data(resource_id, sql_file_name, sql_file_url, sql_file_hash = None):
+	connection_manager = None
 	try:
 		pprint("Start conversion!")
-		if sql_file_name.split(".")[1] != "sql":
+		# Dumps may be compressed, e.g. "sakila.sql.gz", see sql_dump_compression.py.
+		sql_file_name_parts = split_sql_dump_file_name(sql_file_name)
+		if sql_file_name_parts is None:
 			print("Invalided MySQL backup file extension!")
 			raise Exception()
+		check_sql_dump_compression(sql_file_name_parts[1])
 		os.system("whoami")
 		os.chdir("/srv/app/src/ckanext-mysql2mongodb/ckanext/mysql2mongodb/data_conv")
 		# os.system("ll")
-		os.system(f"mkdir -p ./downloads/{resource_id}")
-		os.system(f"curl -o ./downloads/{resource_id}/{sql_file_name} {sql_file_url}")
 
 		db_conf = read_database_config()
 		package_conf = read_package_config()
+		conv_process_option = ConvProcessOption(**read_conversion_config())
+		# Connections are shared during the job, see ConnectionManager.
+		connection_manager = ConnectionManager(conv_process_option.mongodb_pool_size, conv_process_option.mysql_pool_size).open()
 
-		schema_name = sql_file_name.split(".")[0]
+		sql_download = FileDownload(sql_file_url, f"./downloads/{resource_id}/{sql_file_name}",
+			chunk_size=conv_process_option.download_chunk_size,
+			timeout=conv_process_option.download_timeout,
+			retries=conv_process_option.download_retries,
+			expected_hash=sql_file_hash)
+		if not conv_process_option.download_streaming:
+			sql_download.complete()
+
+		schema_name = sql_file_name_parts[0]
 
 		mysql_host = db_conf["mysql_host"]
 		mysql_username = db_conf["mysql_username"]
@@ -35,8 +53,6 @@ def convert_data(resource_id, sql_file_name, sql_file_url):
 		mysql_cur.close()
 		mysql_conn.close()
 		
-		os.system(f"mysql -h {mysql_host} -u {mysql_username} --password={mysql_password} {schema_name} < ./downloads/{resource_id}/{sql_file_name}")
-		
 		schema_conv_init_option = ConvInitOption(host = mysql_host, username = mysql_username, password = mysql_password, port = mysql_port, dbname = mysql_dbname)
 
 		mongodb_host = db_conf["mongodb_host"]
@@ -46,13 +62,18 @@ def convert_data(resource_id, sql_file_name, sql_file_url):
 		mongodb_dbname = schema_name
 		schema_conv_output_option = ConvOutputOption(host = mongodb_host, username = mongodb_username, password = mongodb_password, port = mongodb_port, dbname = mongodb_dbname)
 
-		schema_conversion = SchemaConversion()
-		schema_conversion.set_config(schema_conv_init_option, schema_conv_output_option)
-		schema_conversion.run()
+		converted = False
+		if conv_process_option.input_mode == "dump":
+			try:
+				convert_sql_dump(schema_conv_init_option, schema_conv_output_option, conv_process_option, sql_download)
+				converted = True
+			except SqlDumpParseError as e:
+				print(e)
+				print("Dump can not be parsed, stage it through MySQL instead!")
 
-		mysql2mongodb = DataConversion()
-		mysql2mongodb.set_config(schema_conv_init_option, schema_conv_output_option, schema_conversion)
-		mysql2mongodb.run()
+		if not converted:
+			restore_sql_download(schema_conv_init_option, conv_process_option, sql_download)
+			convert_database(schema_conv_init_option, schema_conv_output_option, conv_process_option)
 
 		os.system(f"mkdir -p mongodump_files")
 		os.system(f"mongodump --username {mongodb_username} --password {mongodb_password} --host {mongodb_host} --port {mongodb_port} --authenticationDatabase admin --db {mongodb_dbname} -o mongodump_files/")
@@ -73,6 +94,59 @@ def convert_data(resource_id, sql_file_name, sql_file_url):
 		pprint(e)
 		pprint("Convert fail!")
 
+	finally:
+		# Close shared connections when job completes.
+		if connection_manager is not None:
+			connection_manager.close()
+
+def convert_database(schema_conv_init_option, schema_conv_output_option, conv_process_option, sql_dump_file = None):
+	"""
+	Convert schema, then data, of MySQL database to MongoDB.
+	If sql_dump_file is given, data is parsed from that dump instead of being selected from MySQL.
+	"""
+	schema_conversion = SchemaConversion()
+	schema_conversion.set_config(schema_conv_init_option, schema_conv_output_option, conv_process_option)
+	schema_conversion.run()
+
+	mysql2mongodb = DataConversion()
+	mysql2mongodb.set_config(schema_conv_init_option, schema_conv_output_option, schema_conversion, conv_process_option, sql_dump_file)
+	mysql2mongodb.run()
+
+def restore_sql_download(schema_conv_init_option, conv_process_option, sql_download):
+	"""
+	Restore downloaded mysqldump file into MySQL database.
+	A streamed download which was not consumed yet is piped (decompressed, if dump is compressed) into one mysql client while it is being downloaded,
+	otherwise download is completed first and file is restored (concurrently, see ConvProcessOption.restore_workers).
+	"""
+	compression = find_sql_dump_compression(sql_download.file_path)
+	# Compressed dumps are restored by one client anyway, see restore_sql_dump().
+	if conv_process_option.download_streaming and (conv_process_option.restore_workers <= 1 or compression is not None) and not sql_download.has_started():
+		sql_chunks = iterate_stream_chunks(open_decompressed_stream(sql_download.open_stream(), compression))
+		restore_sql_dump_stream(schema_conv_init_option, sql_chunks, sql_download.url)
+		sql_download.complete()
+	else:
+		restore_sql_dump(schema_conv_init_option, sql_download.complete(), conv_process_option.restore_workers)
+
+def convert_sql_dump(schema_conv_init_option, schema_conv_output_option, conv_process_option, sql_download):
+	"""
+	Convert mysqldump file without staging its data in MySQL ("dump" input mode of ConvProcessOption).
+	Only definitions of dump are restored into MySQL database (while dump is being downloaded, if download is streamed),
+	so schema is converted as usual, then rows are parsed from downloaded file.
+	Raise SqlDumpParseError if dump can not be parsed, caller should restore the whole dump into MySQL instead.
+	"""
+	mysql_conn = open_connection_mysql(schema_conv_init_option.host, schema_conv_init_option.username, schema_conv_init_option.password, schema_conv_init_option.dbname)
+	try:
+		if conv_process_option.download_streaming and not sql_download.has_started():
+			compression = find_sql_dump_compression(sql_download.file_path)
+			sql_stream = open_sql_dump_stream(open_decompressed_stream(sql_download.open_stream(), compression))
+		else:
+			sql_stream = open_sql_dump(sql_download.complete())
+		with sql_stream:
+			restore_sql_dump_schema(mysql_conn, sql_stream)
+	finally:
+		mysql_conn.close()
+	convert_database(schema_conv_init_option, schema_conv_output_option, conv_process_option, sql_download.complete())
+
 def read_package_config(file_url = "package_config.txt"):
 	try:
 		package_conf = {}
@@ -139,4 +213,30 @@ def read_database_config():
 		
 	except Exception as e:
 		print(e)
-		print("Failed while reading database config!")
\ No newline at end of file
+		print("Failed while reading database config!")
+
+def read_conversion_config(file_url = "conversion_config.txt"):
+	"""
+	Read tuning options of conversion, which are used for constructing ConvProcessOption.
+	Each line looks like: <option name> = <python literal>, e.g. migration_chunk_size = 10000
+	Missing file means default options.
+	"""
+	try:
+		conv_conf = {}
+		if not os.path.isfile(file_url):
+			return conv_conf
+		with open(file_url, "r") as f:
+			lines = f.readlines()
+
+		for line in lines:
+			look_for_conf = re.search(r"^[a-z_]+[\s]+=[\s]+", line.strip(), re.IGNORECASE)
+			if look_for_conf is not None:
+				conf_key, conf_value = re.split(r'[\s]+=[\s]+', line.strip(), maxsplit=1)
+				conv_conf[conf_key] = ast.literal_eval(conf_value)
+
+		return conv_conf
+
+	except Exception as e:
+		print(e)
+		print("Failed while reading conversion config!")
+		return {}
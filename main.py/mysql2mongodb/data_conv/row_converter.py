@@ -0,0 +1,126 @@
+# row_converter.py: Per-table precompiled converters which turn fetched MySQL rows into MongoDB documents, and documents back into rows.
+
+import json
+from bson.decimal128 import Decimal128
+from datetime import datetime
+
+# Dict(key: <MySQL data type>, value: <converted data type>), built once instead of on every lookup.
+CONVERTED_DTYPE_DICT = {}
+for converted_dtype, mysql_dtype_list in [
+		("integer", ["TINYINT", "SMALLINT", "MEDIUMINT", "INT", "INTEGER", "BIGINT"]),
+		("decimal", ["DECIMAL", "DEC", "FIXED"]),
+		("double", ["FLOAT", "DOUBLE", "REAL"]),
+		("boolean", ["BOOL", "BOOLEAN"]),
+		("date", ["DATE", "YEAR"]),
+		("timestamp", ["DATETIME", "TIMESTAMP", "TIME"]),
+		("binary", ["BIT", "BINARY", "VARBINARY"]),
+		("blob", ["TINYBLOB", "BLOB", "MEDIUMBLOB", "LONGBLOB"]),
+		("string", ["CHARACTER", "CHARSET", "ASCII", "UNICODE", "CHAR", "VARCHAR", "TINYTEXT", "TEXT", "MEDIUMTEXT", "LONGTEXT"]),
+		("object", ["ENUM", "SET", "JSON"]),
+		("single-geometry", ["GEOMETRY", "POINT", "LINESTRING", "POLYGON"]),
+		("multiple-geometry", ["MULTIPOINT", "MULTILINESTRING", "MULTIPOLYGON", "GEOMETRYCOLLECTION"]),
+	]:
+	for mysql_dtype in mysql_dtype_list:
+		CONVERTED_DTYPE_DICT[mysql_dtype] = converted_dtype
+
+def find_converted_dtype(mysql_dtype):
+	"""
+	Mapping data type from MySQL to MongoDB.
+	Return None if MySQL data type has not been handled.
+	"""
+	return CONVERTED_DTYPE_DICT.get(mysql_dtype)
+
+def convert_date_cell(cell_data):
+	return datetime(cell_data.year, cell_data.month, cell_data.day)
+
+def convert_object_cell(cell_data):
+	if type(cell_data) is str:
+		return cell_data
+	return tuple(cell_data)
+
+def find_cell_converter(mysql_dtype):
+	"""
+	Get conversion function for cells of a MySQL data type.
+	Return None if cells are stored as they were fetched.
+	Conversion functions must be picklable (no lambda), so converters can be sent to worker processes.
+	"""
+	if mysql_dtype == "VARBINARY":
+		return bytes
+	elif mysql_dtype == "VARCHAR":
+		return str
+	elif mysql_dtype == "DATE":
+		return convert_date_cell
+	target_dtype = find_converted_dtype(mysql_dtype)
+	if target_dtype == "decimal":
+		return Decimal128
+	elif target_dtype == "object":
+		return convert_object_cell
+	return None
+
+class RowConverter:
+	"""
+	Row converter of one table.
+	Conversion functions of all columns are looked up once, when the converter is built,
+	so converting a row is just a loop over pairs of (column name, converter) zipped with row cells.
+	NULL cells are omitted from converted documents.
+	"""
+	def __init__(self, column_name_list, column_dtype_list):
+		super(RowConverter, self).__init__()
+		self.columns = tuple(zip(column_name_list, map(find_cell_converter, column_dtype_list)))
+
+	def convert_row(self, row):
+		doc = {}
+		for (col_name, converter), cell_data in zip(self.columns, row):
+			if cell_data is not None:
+				doc[col_name] = cell_data if converter is None else converter(cell_data)
+		return doc
+
+	def convert_rows(self, rows):
+		convert_row = self.convert_row
+		return [convert_row(row) for row in rows]
+
+def convert_decimal128_value(value):
+	if type(value) is Decimal128:
+		return value.to_decimal()
+	return value
+
+def convert_object_value(value):
+	# SET cells were stored as arrays, JSON cells may have been stored as embedded documents.
+	if type(value) is list:
+		return ",".join(map(str, value))
+	elif type(value) is dict:
+		return json.dumps(value, default=str)
+	return value
+
+def find_value_converter(mysql_dtype):
+	"""
+	Get conversion function for values of a MySQL data type, which turns value of a MongoDB document back into MySQL cell.
+	Return None if values are inserted as they were loaded.
+	"""
+	target_dtype = find_converted_dtype(mysql_dtype)
+	if target_dtype == "decimal":
+		return convert_decimal128_value
+	elif target_dtype == "object":
+		return convert_object_value
+	return None
+
+class DocumentConverter:
+	"""
+	Document converter of one collection, the reverse of RowConverter.
+	Conversion functions of all columns are looked up once, when the converter is built.
+	Converted rows are tuples of cells in column order, missing fields are NULL cells.
+	"""
+	def __init__(self, column_name_list, column_dtype_list):
+		super(DocumentConverter, self).__init__()
+		self.columns = tuple(zip(column_name_list, map(find_value_converter, column_dtype_list)))
+
+	def convert_document(self, doc):
+		row = []
+		for col_name, converter in self.columns:
+			value = doc.get(col_name)
+			row.append(value if converter is None or value is None else converter(value))
+		return tuple(row)
+
+	def convert_documents(self, docs):
+		convert_document = self.convert_document
+		return [convert_document(doc) for doc in docs]
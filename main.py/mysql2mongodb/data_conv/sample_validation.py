@@ -0,0 +1,64 @@
+# sample_validation.py: Sample primary keys of MySQL tables for statistical validation, and bound mismatch rate of a clean sample.
+
+import random
+from ckanext.mysql2mongodb.data_conv.table_partition import fetch_keyset_boundaries
+
+def fetch_random_sample_keys(mysql_cursor, table_name, key_columns, sample_rows):
+	"""
+	Sample primary keys of table uniformly at random.
+	Only primary key is read, and LIMIT keeps just sample_rows keys while sorting, so table is not sorted.
+	"""
+	key_sql = ", ".join([f"`{col}`" for col in key_columns])
+	mysql_cursor.execute(f"SELECT {key_sql} FROM `{table_name}` ORDER BY RAND() LIMIT {int(sample_rows)}")
+	return [tuple(row) for row in mysql_cursor.fetchall()]
+
+def fetch_stratified_sample_keys(mysql_cursor, table_name, key_columns, numeric_key, sample_rows, rows_num):
+	"""
+	Sample one primary key per stratum, table is split into sample_rows strata of primary key.
+	Numeric keys: range [MIN, MAX] is split evenly, the first key from a random point of every stratum is read by one index seek.
+	Other keys: strata are keyset pages, the first key of every page is sampled (see fetch_keyset_boundaries()).
+	"""
+	if numeric_key and len(key_columns) == 1:
+		key_column = key_columns[0]
+		mysql_cursor.execute(f"SELECT MIN(`{key_column}`), MAX(`{key_column}`) FROM `{table_name}`")
+		min_key, max_key = mysql_cursor.fetchone()
+		if min_key is None:
+			return []
+		step = max((max_key - min_key + 1) / sample_rows, 1)
+		key_set = set()
+		stratum_start = min_key
+		while stratum_start <= max_key:
+			mysql_cursor.execute(f"SELECT `{key_column}` FROM `{table_name}` WHERE `{key_column}` >= %s ORDER BY `{key_column}` LIMIT 1", (int(stratum_start + random.random() * step),))
+			row = mysql_cursor.fetchone()
+			if row is not None:
+				key_set.add(tuple(row))
+			stratum_start = stratum_start + step
+		return sorted(key_set)
+	key_sql = ", ".join([f"`{col}`" for col in key_columns])
+	mysql_cursor.execute(f"SELECT {key_sql} FROM `{table_name}` ORDER BY {key_sql} LIMIT 1")
+	first_key = mysql_cursor.fetchone()
+	if first_key is None:
+		return []
+	return [tuple(first_key)] + fetch_keyset_boundaries(mysql_cursor, table_name, key_columns, sample_rows, max(rows_num, sample_rows))
+
+def generate_key_slice(key_columns, key_list):
+	"""
+	Generate slice of table (see table_partition.generate_primary_key_slices()) which selects rows of listed primary keys.
+	"""
+	key_sql = "(" + ", ".join([f"`{col}`" for col in key_columns]) + ")"
+	placeholder_sql = "(" + ", ".join(["%s"] * len(key_columns)) + ")"
+	return {
+		"condition": f"{key_sql} IN ({', '.join([placeholder_sql] * len(key_list))})",
+		"params": tuple([cell for key in key_list for cell in key]),
+	}
+
+def compute_mismatch_rate_upper_bound(sample_rows, rows_num, confidence):
+	"""
+	Upper bound of rate of mismatched rows of table, at given confidence, when a random sample of sample_rows rows has no mismatch:
+	(1 - p) ^ sample_rows = 1 - confidence (about 3 / sample_rows at 95% confidence). 0 if the whole table was sampled.
+	"""
+	if sample_rows >= rows_num:
+		return 0.0
+	if sample_rows <= 0:
+		return 1.0
+	return 1 - (1 - confidence) ** (1 / sample_rows)
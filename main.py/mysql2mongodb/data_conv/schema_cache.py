@@ -0,0 +1,45 @@
+# schema_cache.py: Persistent cache of converted schemas, keyed by fingerprint of MySQL schema definition.
+# Cache is stored in its own MongoDB database, because target database is dropped on every conversion.
+
+import json, time
+
+# Bump when shape of cached entries changes, so old entries are not reused.
+SCHEMA_CACHE_VERSION = 1
+SCHEMA_CACHE_COLLECTION = "schemas"
+
+def load_cached_schema(cache_db_connection, fingerprint):
+	"""
+	Load cache entry of a schema fingerprint.
+	Return None on cache miss, otherwise:
+		Dict(
+			"schema": <schema document>,
+			"validators": Dict(key: <table name>, value: <validator>),
+			"index-plan": Dict(key: <table name>, value: List[Dict("keys": List[[<column name>, 1]], "unique": <unique option>)])
+		)
+	"""
+	cached = cache_db_connection[SCHEMA_CACHE_COLLECTION].find_one({"_id": fingerprint, "version": SCHEMA_CACHE_VERSION})
+	if cached is None:
+		return None
+	cache_db_connection[SCHEMA_CACHE_COLLECTION].update_one({"_id": fingerprint}, {"$set": {"last-used": time.time()}})
+	return {
+		"schema": cached["schema"],
+		# Validators are stored as JSON text, since field names of stored documents can not start with "$" (e.g. "$jsonSchema").
+		"validators": json.loads(cached["validators"]),
+		"index-plan": cached["index-plan"],
+	}
+
+def store_cached_schema(cache_db_connection, fingerprint, db_schema, validator_dict, index_plan_dict):
+	"""
+	Store (or replace) cache entry of a schema fingerprint.
+	"""
+	db_schema = dict(db_schema)
+	db_schema.pop("_id", None)
+	cache_db_connection[SCHEMA_CACHE_COLLECTION].replace_one({"_id": fingerprint}, {
+		"_id": fingerprint,
+		"version": SCHEMA_CACHE_VERSION,
+		"schema": db_schema,
+		"validators": json.dumps(validator_dict),
+		"index-plan": index_plan_dict,
+		"created": time.time(),
+		"last-used": time.time(),
+	}, upsert=True)
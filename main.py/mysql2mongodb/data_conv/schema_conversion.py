@@ -1,7 +1,12 @@
 import json, os, re
 from collections import OrderedDict
-from pymongo import GEO2D, TEXT
-from ckanext.mysql2mongodb.data_conv.utilities import extract_dict, import_json_to_mongodb, open_connection_mongodb, open_connection_mysql, drop_mongodb_database, load_mongodb_collection, store_json_to_mongodb
+import time
+from pymongo import GEO2D, TEXT, IndexModel
+from ckanext.mysql2mongodb.data_conv.utilities import extract_dict, import_json_to_mongodb, open_connection_mongodb, open_connection_mysql, drop_mongodb_database, load_mongodb_collection, store_json_to_mongodb, open_worker_pool
+from ckanext.mysql2mongodb.data_conv.database_connection import ConvProcessOption
+from ckanext.mysql2mongodb.data_conv.schema_model import SchemaModel
+from ckanext.mysql2mongodb.data_conv.schema_introspection import introspect_mysql_schema, fingerprint_mysql_schema, refresh_table_statistics
+from ckanext.mysql2mongodb.data_conv.schema_cache import load_cached_schema, store_cached_schema
 	
 class SchemaConversion:
 	"""
@@ -21,25 +26,63 @@ class SchemaConversion:
 		# Define a name for schema file, which will be place at intermediate folder.
 		self.schema_filename = "schema.json"
 
-	def set_config(self, schema_conv_init_option, schema_conv_output_option):
+	def set_config(self, schema_conv_init_option, schema_conv_output_option, conv_process_option = None):
 		"""
 		To set up connections, you need to provide:
 			- schema_conv_init_option:_ instance of class ConvInitOption, which specified connection to "Input" database (MySQL).
 			- schema_conv_output_option: instance of class ConvOutputOption, which specified connection to "Out" database (MongoDB).
+			- conv_process_option: (optional) instance of class ConvProcessOption, which specified tuning options of conversion.
 		"""
 		self.schema_conv_init_option = schema_conv_init_option
 		self.schema_conv_output_option = schema_conv_output_option
+		if conv_process_option is None:
+			conv_process_option = ConvProcessOption()
+		self.conv_process_option = conv_process_option
 
 	def run(self):
 		self.__drop_mongodb()
-		self.__generate_mysql_schema()
-		self.__save()
+		if not self.__load_schema_cache():
+			if self.conv_process_option.schema_backend == "information_schema":
+				self.__introspect_mysql_schema()
+			elif self.conv_process_option.schema_backend == "schemacrawler":
+				self.__generate_mysql_schema()
+				self.__save()
+			else:
+				raise ValueError(f"Schema backend {self.conv_process_option.schema_backend} has not been handled!")
+			self.__store_schema_cache()
 		self.save_schema_view()
-		self.create_mongo_schema_validators()
-		self.create_mongo_indexes()
+		if self.conv_process_option.constraint_mode == "after-load":
+			# Validators and indexes are created by create_mongo_constraints(), after data is loaded.
+			self.create_mongo_collections()
+		else:
+			self.create_mongo_schema_validators()
+			self.create_mongo_indexes()
 		self.drop_view()
 		return True
 
+	def create_mongo_constraints(self):
+		"""
+		Build secondary indexes and attach schema validators to collections which were loaded already ("after-load" constraint mode).
+		Building an index once over loaded data is much cheaper than maintaining it (and validating) on every insert.
+		"""
+		tic = time.time()
+		self.create_mongo_indexes()
+		self.attach_mongo_schema_validators()
+		toc = time.time()
+		time_taken = round((toc-tic)*1000, 1)
+		print(f"Time for creating constraints: {time_taken}")
+		return True
+
+	def __map_schema_workers(self, func, item_list):
+		"""
+		Apply func to every item, concurrently by ConvProcessOption.schema_workers threads (the work itself runs inside MongoDB).
+		"""
+		workers = self.conv_process_option.schema_workers
+		if workers is None or workers <= 1 or len(item_list) <= 1:
+			return list(map(func, item_list))
+		with open_worker_pool("thread", min(workers, len(item_list))) as pool:
+			return pool.map(func, item_list, chunksize=1)
+
 	def get(self):
 		self.load_schema()
 		return self.db_schema
@@ -74,11 +117,103 @@ class SchemaConversion:
 				self.schema_conv_output_option.port, 
 				self.schema_conv_output_option.dbname, 
 				"schema")
-			self.db_schema = db_schema[0]
-			# Most used variable
-			self.all_table_columns = self.db_schema["all-table-columns"]
-			self.tables_schema = self.db_schema["catalog"]["tables"]
-			self.extracted_tables_schema = self.extract_tables_schema()
+			self.set_schema(db_schema[0])
+
+	def set_schema(self, db_schema):
+		"""
+		Set schema document (SchemaCrawler-like), which was loaded from MongoDB or introspected.
+		"""
+		self.db_schema = db_schema
+		# Most used variable
+		self.all_table_columns = self.db_schema["all-table-columns"]
+		self.tables_schema = self.db_schema["catalog"]["tables"]
+		self.extracted_tables_schema = self.extract_tables_schema()
+		# Indexed schema model, which all schema lookups read from.
+		self.schema_model = SchemaModel(self.db_schema)
+
+	def __open_schema_cache(self):
+		return open_connection_mongodb(
+			self.schema_conv_output_option.host, 
+			self.schema_conv_output_option.username, 
+			self.schema_conv_output_option.password, 
+			self.schema_conv_output_option.port, 
+			self.conv_process_option.schema_cache_dbname)
+
+	def __load_schema_cache(self):
+		"""
+		Look up schema cache (if ConvProcessOption.schema_cache is enabled) by fingerprint of MySQL schema definition.
+		On cache hit, cached schema (with refreshed table statistics), validators and index plan are reused,
+		schema is saved to MongoDB database like a generated one.
+		Return True on cache hit.
+		"""
+		if not self.conv_process_option.schema_cache:
+			return False
+		if self.conv_process_option.schema_cache_dbname == self.schema_conv_output_option.dbname:
+			raise ValueError(f"Schema cache database {self.conv_process_option.schema_cache_dbname} must not be the target database!")
+		mysql_connection = open_connection_mysql(
+			self.schema_conv_init_option.host, 
+			self.schema_conv_init_option.username, 
+			self.schema_conv_init_option.password, 
+			self.schema_conv_init_option.dbname, 
+			)
+		self.schema_fingerprint = fingerprint_mysql_schema(mysql_connection, self.schema_conv_init_option.dbname, salt=self.conv_process_option.schema_backend)
+		cached = load_cached_schema(self.__open_schema_cache(), self.schema_fingerprint)
+		if cached is None:
+			mysql_connection.close()
+			print(f"Schema cache miss: {self.schema_fingerprint}")
+			return False
+		db_schema = refresh_table_statistics(cached["schema"], mysql_connection, self.schema_conv_init_option.dbname)
+		mysql_connection.close()
+		db_connection = open_connection_mongodb(
+			self.schema_conv_output_option.host, 
+			self.schema_conv_output_option.username, 
+			self.schema_conv_output_option.password, 
+			self.schema_conv_output_option.port, 
+			self.schema_conv_output_option.dbname) 
+		store_json_to_mongodb(db_connection, "schema", db_schema)
+		self.set_schema(db_schema)
+		self.validator_dict = cached["validators"]
+		self.index_plan_dict = cached["index-plan"]
+		print(f"Schema cache hit: {self.schema_fingerprint}")
+		return True
+
+	def __store_schema_cache(self):
+		"""
+		Store schema, validators and index plan in schema cache (if ConvProcessOption.schema_cache is enabled).
+		"""
+		if not self.conv_process_option.schema_cache:
+			return False
+		self.load_schema()
+		store_cached_schema(self.__open_schema_cache(), self.schema_fingerprint, self.db_schema, self.get_mongo_schema_validators(), self.get_mongo_index_plan())
+		return True
+
+	def __introspect_mysql_schema(self):
+		"""
+		Introspect MySQL schema from INFORMATION_SCHEMA, then save it to MongoDB database.
+		Unlike SchemaCrawler, it does not start a JVM nor go through an intermediate JSON file,
+		and the introspected schema is kept, so it is not loaded back from MongoDB.
+		"""
+		tic = time.time()
+		mysql_connection = open_connection_mysql(
+			self.schema_conv_init_option.host, 
+			self.schema_conv_init_option.username, 
+			self.schema_conv_init_option.password, 
+			self.schema_conv_init_option.dbname, 
+			)
+		db_schema = introspect_mysql_schema(mysql_connection, self.schema_conv_init_option.dbname)
+		mysql_connection.close()
+		db_connection = open_connection_mongodb(
+			self.schema_conv_output_option.host, 
+			self.schema_conv_output_option.username, 
+			self.schema_conv_output_option.password, 
+			self.schema_conv_output_option.port, 
+			self.schema_conv_output_option.dbname) 
+		store_json_to_mongodb(db_connection, "schema", db_schema)
+		self.set_schema(db_schema)
+		toc = time.time()
+		time_taken = round((toc-tic)*1000, 1)
+		print(f"Introspect MySQL database {self.schema_conv_init_option.dbname} schema successfully! Time taken: {time_taken}")
+		return True
 	
 	def __generate_mysql_schema(self, info_level="maximum"):
 		"""
@@ -143,11 +278,8 @@ class SchemaConversion:
 		Return a dictionary with @uuid as key and column name as value
 		Dict(key: <column uuid>, value: <column name>)
 		"""
-		all_table_columns = self.db_schema["all-table-columns"]
-		col_dict = {}
-		for col in all_table_columns:
-			col_dict[col["@uuid"]] = col["name"]
-		return col_dict
+		self.load_schema()
+		return self.schema_model.column_names_dict
 
 	def get_tables_dict(self):
 		"""
@@ -155,11 +287,8 @@ class SchemaConversion:
 		Return a dictionary with @uuid as key and table name as value
 		Dict(key: <column uuid>, value: <name of table has that column>)
 		"""
-		table_dict = {}
-		for table in self.tables_schema:
-			for col in table["columns"]:
-				table_dict[str(col)] = table["name"]
-		return table_dict
+		self.load_schema()
+		return self.schema_model.column_tables_dict
 
 
 	def get_tables_relations(self):
@@ -179,42 +308,57 @@ class SchemaConversion:
 
 		)
 		"""
-		col_dict = self.get_columns_dict()
-		table_dict = self.get_tables_dict()
-
-		relations_dict = {}
-		for table in self.extracted_tables_schema:
-			for foreign_key in table["foreign-keys"]:
-				if(isinstance(foreign_key, dict)):
-					relation_uuid = foreign_key["@uuid"]
-					foreign_key_uuid = foreign_key["column-references"][0]["foreign-key-column"]
-					primary_key_uuid = foreign_key["column-references"][0]["primary-key-column"]
-					relations_dict[relation_uuid] = {}
-					relations_dict[relation_uuid]["primary_key_table"] = table_dict[primary_key_uuid]
-					relations_dict[relation_uuid]["foreign_key_table"] = table_dict[foreign_key_uuid]
-					relations_dict[relation_uuid]["primary_key_column"] = col_dict[primary_key_uuid]
-					relations_dict[relation_uuid]["foreign_key_column"] = col_dict[foreign_key_uuid]
-		return relations_dict
+		self.load_schema()
+		return self.schema_model.relations_dict
 
 	def get_tables_name_list(self):
 		"""
 		Get list of name of all tables.
 		"""
 		self.load_schema()
-		table_name_list = list(map(lambda table: table["name"], list(filter(lambda table: table["remarks"] == "", self.tables_schema))))
-		return table_name_list
+		return list(self.schema_model.table_names)
+
+	def get_tables_size_dict(self):
+		"""
+		Get estimated data size (in bytes) of all tables, which was crawled from INFORMATION_SCHEMA.TABLES.DATA_LENGTH.
+		Dict(key: <table name>, value: <data length>)
+		"""
+		self.load_schema()
+		table_size_dict = {}
+		for table_name, table in self.schema_model.tables_dict.items():
+			table_size_dict[table_name] = table["attributes"].get("DATA_LENGTH") or 0
+		return table_size_dict
+
+	def get_tables_rows_dict(self):
+		"""
+		Get estimated number of rows of all tables, which was crawled from INFORMATION_SCHEMA.TABLES.TABLE_ROWS.
+		Dict(key: <table name>, value: <number of rows>)
+		"""
+		self.load_schema()
+		table_rows_dict = {}
+		for table_name, table in self.schema_model.tables_dict.items():
+			table_rows_dict[table_name] = table["attributes"].get("TABLE_ROWS") or 0
+		return table_rows_dict
+
+	def get_table_primary_key_columns(self, table_name):
+		"""
+		Get list of name of primary key columns of table, ordered as in primary index.
+		Return an empty list if table has no primary key.
+		"""
+		self.load_schema()
+		return list(self.schema_model.table_primary_keys_dict.get(table_name, ()))
 
 	def get_tables_and_views_list(self):
 		"""
 		Get list of name of all tables and views.
 		"""
 		self.load_schema()
-		table_and_view_name_list = list(map(lambda table: table["name"], self.extracted_tables_schema))
-		return table_and_view_name_list
+		return list(self.schema_model.table_and_view_names)
 
 	def get_table_column_and_data_type(self):
 		"""
 		Get dict of tables, columns name and columns data type.
+		Columns of each table are in ordinal order.
 		Dict(
 			key: <table name>
 			value: Dict(
@@ -222,52 +366,27 @@ class SchemaConversion:
 				value: <MySQL column data type>
 			)
 		)
+		Returned dict is read-only.
 		"""
 		self.load_schema()
-		table_dict = self.get_tables_dict()
-		all_columns = self.db_schema["all-table-columns"]
-		schema_type_dict = {}
-		for col in all_columns:
-			dtype = col["column-data-type"]
-			if type(dtype) is dict:
-				schema_type_dict[dtype["@uuid"]] = dtype["name"].split()[0]
-		table_list = self.get_tables_and_views_list()
-		res = {}
-		for table_name in table_list:
-			res[table_name] = {}
-		for col in all_columns:
-			dtype = col["column-data-type"]
-			if type(dtype) is dict:
-				res[table_dict[col["@uuid"]]][col["name"]] = schema_type_dict[dtype["@uuid"]]
-			else:
-				res[table_dict[col["@uuid"]]][col["name"]] = schema_type_dict[dtype]
-		return res
+		return self.schema_model.table_columns_dict
 
 	def create_mongo_schema_validators(self):
 		"""
-		Specify MongoDB schema validator for all tables.
+		Create MongoDB collections of all tables and views, and specify schema validator for all tables.
+		Each collection is created with its full validator in a single create command.
 		"""
-		table_view_column_dtype = self.get_table_column_and_data_type()
-		table_list = self.get_tables_name_list()
-		uuid_col_dict = self.get_columns_dict()
-		table_column_dtype = {}
-		for table in table_list:
-			table_column_dtype[table] = table_view_column_dtype[table]
-		table_cols_uuid = {}
-		for table in self.tables_schema:
-			table_name = table["name"]
-			if table_name in table_list:
-				table_cols_uuid[table_name] = table["columns"]
-		enum_col_dict = {}
-		for col in self.all_table_columns:
-			if col["attributes"]["COLUMN_TYPE"][:4] == "enum":
-				data = {}
-				table_name, col_name = col["short-name"].split(".")[:2]
-				if table_name in table_list:
-					data = list(map(lambda ele: ele[1:-1], col["attributes"]["COLUMN_TYPE"][5:-1].split(",")))
-					sub_dict = {}
-					sub_dict[col_name] = data
-					enum_col_dict[table_name] = sub_dict
+		self.create_mongo_collections(self.get_mongo_schema_validators())
+		print("Create validator done!")
+
+	def create_mongo_collections(self, validator_dict = None):
+		"""
+		Create MongoDB collections of all tables and views, concurrently by ConvProcessOption.schema_workers threads.
+		Params:
+			validator_dict: (optional) Dict(key: <table name>, value: <validator>), collections are created without validator if omitted.
+		"""
+		if validator_dict is None:
+			validator_dict = {}
 		db_connection = open_connection_mongodb(
 			self.schema_conv_output_option.host,
 			self.schema_conv_output_option.username,
@@ -275,16 +394,103 @@ class SchemaConversion:
 			self.schema_conv_output_option.port, 
 			self.schema_conv_output_option.dbname
 			)
-		for table in self.get_tables_and_views_list():
-			db_connection.create_collection(table)
-		for table in table_cols_uuid:
+		collection_list = [(table, validator_dict.get(table)) for table in self.get_tables_and_views_list()]
+
+		def create_collection(collection_detail):
+			collection_name, validator = collection_detail
+			if validator is None:
+				db_connection.create_collection(collection_name)
+			else:
+				db_connection.create_collection(collection_name, validator=validator)
+
+		self.__map_schema_workers(create_collection, collection_list)
+
+	def attach_mongo_schema_validators(self):
+		"""
+		Attach schema validators to existing collections of all tables with one collMod per collection,
+		then validate documents which were loaded before.
+		"""
+		validator_dict = self.get_mongo_schema_validators()
+		db_connection = open_connection_mongodb(
+			self.schema_conv_output_option.host,
+			self.schema_conv_output_option.username,
+			self.schema_conv_output_option.password,
+			self.schema_conv_output_option.port, 
+			self.schema_conv_output_option.dbname
+			)
+
+		def attach_validator(collection_name):
+			cmd = OrderedDict([('collMod', collection_name), ('validator', validator_dict[collection_name])])
+			db_connection.command(cmd)
+
+		self.__map_schema_workers(attach_validator, list(validator_dict.keys()))
+		print("Attach validator done!")
+		return self.validate_mongo_documents(validator_dict)
+
+	def validate_mongo_documents(self, validator_dict = None):
+		"""
+		Validate existing documents against schema validators offline, since collMod does not check documents which were stored already.
+		Documents are counted (not fetched) with query {"$nor": [<validator>]}, which matches documents that fail the validator.
+		Return Dict(key: <table name>, value: <number of invalid documents>), only collections which have invalid documents.
+		"""
+		if validator_dict is None:
+			validator_dict = self.get_mongo_schema_validators()
+		db_connection = open_connection_mongodb(
+			self.schema_conv_output_option.host,
+			self.schema_conv_output_option.username,
+			self.schema_conv_output_option.password,
+			self.schema_conv_output_option.port, 
+			self.schema_conv_output_option.dbname
+			)
+
+		def count_invalid_documents(collection_name):
+			return db_connection[collection_name].count_documents({"$nor": [validator_dict[collection_name]]})
+
+		collection_name_list = list(validator_dict.keys())
+		invalid_documents_dict = {}
+		for collection_name, invalid_num in zip(collection_name_list, self.__map_schema_workers(count_invalid_documents, collection_name_list)):
+			if invalid_num > 0:
+				print(f"Collection {collection_name} has {invalid_num} documents which do not match schema validator!")
+				invalid_documents_dict[collection_name] = invalid_num
+		if len(invalid_documents_dict) == 0:
+			print("Validate documents done, all documents match schema validators!")
+		return invalid_documents_dict
+
+	def get_mongo_schema_validators(self):
+		"""
+		Get schema validators, which are generated once (or reused from schema cache).
+		"""
+		if not hasattr(self, "validator_dict"):
+			self.validator_dict = self.generate_mongo_schema_validators()
+		return self.validator_dict
+
+	def generate_mongo_schema_validators(self):
+		"""
+		Generate MongoDB schema validators of all tables (views have no validator), in one pass over columns of each table.
+		Validator structure:
+			Dict(
+				key: <table name>,
+				value: Dict(
+					"$jsonSchema": Dict(
+						"bsonType": "object",
+						"properties": Dict(
+							key: <column name>,
+							value: Dict("bsonType": <MongoDB data type>) or Dict("enum": <list of enum values>, "description": <description>)
+						)
+					)
+				)
+			)
+		"""
+		self.load_schema()
+		validator_dict = {}
+		for table_name in self.get_tables_name_list():
 			props = {}
-			for col_uuid in table_cols_uuid[table]:
-				col_name = uuid_col_dict[col_uuid]
-				mysql_dtype = table_column_dtype[table][col_name]
+			for column_schema in self.schema_model.table_column_schemas_dict[table_name]:
+				col_name = column_schema["name"]
+				mysql_dtype = self.schema_model.table_columns_dict[table_name][col_name]
 				if mysql_dtype == "ENUM":
 					data = {
-						"enum": enum_col_dict[table][col_name],
+						"enum": self.get_enum_values(column_schema["attributes"]["COLUMN_TYPE"]),
 						"description": "can only be one of the enum values"
 					}
 				else:
@@ -292,15 +498,19 @@ class SchemaConversion:
 						"bsonType": self.data_type_schema_mapping(mysql_dtype)
 					}
 				props[col_name] = data
-				json_schema = {}
-				json_schema["bsonType"] = "object"
-				json_schema["properties"] = props
-				# print(json_schema)
-				vexpr = {"$jsonSchema": json_schema}
-				cmd = OrderedDict([('collMod', table), ('validator', vexpr)])
-				db_connection.command(cmd)
-		print("Create validator done!")
-		
+			json_schema = {}
+			json_schema["bsonType"] = "object"
+			json_schema["properties"] = props
+			validator_dict[table_name] = {"$jsonSchema": json_schema}
+		return validator_dict
+
+	def get_enum_values(self, column_type):
+		"""
+		Get values of MySQL enum column.
+		Input: MySQL column type, e.g. "enum('G','PG','PG-13')".
+		Output: List of enum values, e.g. ["G", "PG", "PG-13"].
+		"""
+		return list(map(lambda ele: ele[1:-1], column_type[5:-1].split(",")))
 
 	def data_type_schema_mapping(self, mysql_type):
 		"""
@@ -335,6 +545,40 @@ class SchemaConversion:
 		"""
 		Add index to MongoDB collection.
 		Just use for running time. Need to remove indexes before exporting MongoDB database.
+		Indexes of each collection are built together by one createIndexes command, collections are indexed concurrently by ConvProcessOption.schema_workers threads.
+		"""
+		index_plan_dict = self.get_mongo_index_plan()
+		mongodb_connection = open_connection_mongodb(
+			self.schema_conv_output_option.host,
+			self.schema_conv_output_option.username,
+			self.schema_conv_output_option.password,
+			self.schema_conv_output_option.port, 
+			self.schema_conv_output_option.dbname
+			) 
+
+		def create_collection_indexes(collection_name):
+			index_model_list = [IndexModel([tuple(key) for key in index_plan["keys"]], unique = index_plan["unique"]) for index_plan in index_plan_dict[collection_name]]
+			mongodb_connection[collection_name].create_indexes(index_model_list)
+
+		self.__map_schema_workers(create_collection_indexes, list(index_plan_dict.keys()))
+		print("Create indexes done!")
+
+	def get_mongo_index_plan(self):
+		"""
+		Get index plan, which is generated once (or reused from schema cache).
+		"""
+		if not hasattr(self, "index_plan_dict"):
+			self.index_plan_dict = self.generate_mongo_index_plan()
+		return self.index_plan_dict
+
+	def generate_mongo_index_plan(self):
+		"""
+		Generate plan of MongoDB secondary indexes from MySQL indexes.
+		Plan is made of plain values, so it can be cached:
+			Dict(
+				key: <table name>,
+				value: List[Dict("keys": List[[<column name>, 1]], "unique": <unique option>)]
+			)
 		"""
 		table_view_list = self.get_tables_and_views_list()
 		
@@ -360,23 +604,19 @@ class SchemaConversion:
 						# print(idx_name)
 					idx_table_name_type_dict[table_name] = {}
 				idx_table_name_type_dict[table_name][idx_name] = idx_type
+		mysql_cursor.close()
+		mysql_connection.close()
 		col_dict = self.get_columns_dict()
-		mongodb_connection = open_connection_mongodb(
-			self.schema_conv_output_option.host,
-			self.schema_conv_output_option.username,
-			self.schema_conv_output_option.password,
-			self.schema_conv_output_option.port, 
-			self.schema_conv_output_option.dbname
-			) 
+		index_plan_dict = {}
 		for table in self.tables_schema:
-			collection = mongodb_connection[table["name"]]
+			index_plan_list = []
 			index_list = table["indexes"]
 			for index in index_list:
 				if(type(index) is not str): ### need to check all indexes again
 					# print(index)
 					if table["name"] in idx_table_name_type_dict:
 						index_name = index["name"]
-						index_type = idx_table_name_type_dict[table["name"]][index_name]
+						index_type = idx_table_name_type_dict[table["name"]].get(index_name)
 						index_unique = index["unique"]
 						index_cols = index["columns"]
 						num_sub_index = len(index_cols)
@@ -384,33 +624,26 @@ class SchemaConversion:
 							if num_sub_index == 1:
 								# mongo_index_type = "default"
 								col_name = col_dict[index_cols[0]]
-								# print(type(col_name))
-								# collection.create_index("idx_" + col_name, unique = index_unique)
 								if col_name != "_id":
-									collection.create_index(col_name, unique = index_unique)
+									index_plan_list.append({"keys": [[col_name, 1]], "unique": index_unique})
 							else:
 								# mongo_index_type = "compound"
-								# index_keys = {}
-								# for idx_uuid in index_cols:
-									# index_keys[col_dict[idx_uuid]] = 1
-								collection.create_index([(col_dict[idx_uuid], 1) for idx_uuid in index_cols], unique = index_unique)
+								index_plan_list.append({"keys": [[col_dict[idx_uuid], 1] for idx_uuid in index_cols], "unique": index_unique})
 						# elif index_type == "SPATIAL":
 						# 	# mongo_index_type = "spatial"
-						# 	# print(col_dict[index_cols[0]])
 						# 	if num_sub_index == 1:
-						# 		# collection.create_index([(col_dict[index_cols[0]], GEO2D)], unique = index_unique)
-						# 		collection.create_index([(col_dict[index_cols[0]], "2dsphere")], unique = index_unique)
+						# 		index_plan_list.append({"keys": [[col_dict[index_cols[0]], "2dsphere"]], "unique": index_unique})
 						# 	else:
-						# 		collection.create_index([(col_dict[idx_uuid], TEXT) for idx_uuid in index_cols], unique = index_unique)
-						# 	pass
+						# 		index_plan_list.append({"keys": [[col_dict[idx_uuid], TEXT] for idx_uuid in index_cols], "unique": index_unique})
 						# elif index_type == "FULLTEXT":
 						# 	# mongo_index_type = "text-index"
-						# 	if num_sub_index == 1:
-						# 		collection.create_index(col_dict[index_cols[0]], TEXT, unique = index_unique)
-						# 	else:
-						# 		collection.create_index([(col_dict[idx_uuid], TEXT) for idx_uuid in index_cols], unique = index_unique)
+						# 	index_plan_list.append({"keys": [[col_dict[idx_uuid], TEXT] for idx_uuid in index_cols], "unique": index_unique})
 						# else:
 							# print(f"MySQL index type {index_type} has not been handled!")
+			if len(index_plan_list) > 0:
+				index_plan_dict[table["name"]] = index_plan_list
+
+		return index_plan_dict
 		
 
 
@@ -421,9 +654,9 @@ class SchemaConversion:
 		Output: Column uuid
 		"""
 		self.load_schema()
-		for col in self.all_table_columns():
-			if f"{table_name}.{col_name}" == col["short-name"]:
-				return col["@uuid"]
+		col = self.schema_model.short_name_columns_dict.get(f"{table_name}.{col_name}")
+		if col is not None:
+			return col["@uuid"]
 		print(f"Can not find column {col_name} from table {table_name}!")
 		return None
 
@@ -434,16 +667,17 @@ class SchemaConversion:
 		Output: MySQL data type of column.
 		"""
 		self.load_schema()
-		for col in self.all_table_columns:
-			if f"{table_name}.{col_name}" == col["short-name"]:
-				return col["attributes"]["COLUMN_TYPE"]
+		col = self.schema_model.short_name_columns_dict.get(f"{table_name}.{col_name}")
+		if col is not None:
+			return col["attributes"]["COLUMN_TYPE"]
 		print(f"Can not find column {col_name} from table {table_name}!")
 		return None
 
-	def save_schema_view(self):
+	def generate_schema_view(self):
 		"""
-		Store a MySQL converted schema in MongoDB. 
-		This schema will be used for generated detail schema in future by end-user.
+		Generate a MySQL converted schema, which is stored by save_schema_view().
+		Columns and index columns are looked up from per-table maps of schema model,
+		so cost of generating is linear in schema size.
 		Converted schema structure:
 			Dict(
 				"Converted schema": Dict(
@@ -470,6 +704,9 @@ class SchemaConversion:
 		converted_schema["tables"] = []
 		converted_schema["foreign-keys"] = []
 
+		columns_schema_dict = self.schema_model.columns_dict
+		table_dict = self.get_tables_dict()
+		cols_dict = self.get_columns_dict()
 		tables_schema = catalog_schema["tables"]
 		for table_schema in tables_schema:
 			table_info = {}
@@ -501,54 +738,59 @@ class SchemaConversion:
 					}
 					table_info["triggers"].append(table_trigger)
 
-			columns_schema = self.db_schema["all-table-columns"]
 			table_info["columns"] = []
-			for column_schema in columns_schema:
-				if column_schema["@uuid"] in table_schema["columns"]:
-					column_info = {
-						"name": column_schema["name"],
-						"character-set-name": column_schema["attributes"]["CHARACTER_SET_NAME"],
-						"collation-name": column_schema["attributes"]["COLLATION_NAME"],
-						"column-type": column_schema["attributes"]["COLUMN_TYPE"],
-						"nullable": column_schema["attributes"]["IS_NULLABLE"],
-						"auto-incremented": column_schema["auto-incremented"],
-						"nullable": column_schema["nullable"],
-						"default-value" : column_schema["default-value"],
-					}
-					table_info["columns"].append(column_info)
+			for column_schema in self.schema_model.table_column_schemas_dict[table_schema["name"]]:
+				column_info = {
+					"name": column_schema["name"],
+					"character-set-name": column_schema["attributes"]["CHARACTER_SET_NAME"],
+					"collation-name": column_schema["attributes"]["COLLATION_NAME"],
+					"column-type": column_schema["attributes"]["COLUMN_TYPE"],
+					"auto-incremented": column_schema["auto-incremented"],
+					"nullable": column_schema["nullable"],
+					"default-value" : column_schema["default-value"],
+				}
+				table_info["columns"].append(column_info)
 
 			table_info["indexes"] = []
-			for index_schema in table_schema["indexes"]:
-				if type(index_schema) is dict:
-					index_column_list = list(map(lambda col_sche: {"name": col_sche["name"], "table": col_sche["short-name"].split(".")[0]}, list(filter(lambda col_sche: col_sche["@uuid"] in index_schema["columns"], columns_schema))))
-					index_info = {
-						"name": index_schema["name"],
-						"unique": index_schema["unique"],
-						"columns": index_column_list
-					}
-					table_info["indexes"].append(index_info)
+			for index_schema in self.schema_model.table_indexes_dict[table_schema["name"]]:
+				index_column_list = [
+					{"name": columns_schema_dict[col_uuid]["name"], "table": columns_schema_dict[col_uuid]["short-name"].split(".")[0]}
+					for col_uuid in index_schema["columns"] if col_uuid in columns_schema_dict
+				]
+				index_info = {
+					"name": index_schema["name"],
+					"unique": index_schema["unique"],
+					"columns": index_column_list
+				}
+				table_info["indexes"].append(index_info)
 
 			converted_schema["tables"].append(table_info)
 
-			table_dict = self.get_tables_dict()
-			cols_dict = self.get_columns_dict()
-			for foreign_key_schema in table_schema["foreign-keys"]:
-				if type(foreign_key_schema) is dict:
-					col_refs = list(map(lambda fk_sche: {
-							"key-sequence": fk_sche["key-sequence"],
-							"foreign-key-column": cols_dict[fk_sche["foreign-key-column"]], 
-							"foreign-key-table": table_dict[fk_sche["foreign-key-column"]],
-							"primary-key-column": cols_dict[fk_sche["primary-key-column"]], 
-							"primary-key-table": table_dict[fk_sche["primary-key-column"]],
-						}, 
-						foreign_key_schema["column-references"]))
-					foreign_key_info = {
-						"name": foreign_key_schema["name"],
-						"column-references": col_refs,
-						"delete-rule": foreign_key_schema["delete-rule"],
-						"update-rule": foreign_key_schema["update-rule"],
-					}
-					converted_schema["foreign-keys"].append(foreign_key_info)
+			for foreign_key_schema in self.schema_model.table_foreign_keys_dict[table_schema["name"]]:
+				col_refs = list(map(lambda fk_sche: {
+						"key-sequence": fk_sche["key-sequence"],
+						"foreign-key-column": cols_dict[fk_sche["foreign-key-column"]], 
+						"foreign-key-table": table_dict[fk_sche["foreign-key-column"]],
+						"primary-key-column": cols_dict[fk_sche["primary-key-column"]], 
+						"primary-key-table": table_dict[fk_sche["primary-key-column"]],
+					}, 
+					foreign_key_schema["column-references"]))
+				foreign_key_info = {
+					"name": foreign_key_schema["name"],
+					"column-references": col_refs,
+					"delete-rule": foreign_key_schema["delete-rule"],
+					"update-rule": foreign_key_schema["update-rule"],
+				}
+				converted_schema["foreign-keys"].append(foreign_key_info)
+		return converted_schema
+
+	def save_schema_view(self):
+		"""
+		Store a MySQL converted schema in MongoDB. 
+		This schema will be used for generated detail schema in future by end-user.
+		Structure of stored schema is described in generate_schema_view().
+		"""
+		converted_schema = self.generate_schema_view()
 		
 		mongodb_connection = open_connection_mongodb(
 			self.schema_conv_output_option.host,
@@ -0,0 +1,114 @@
+# schema_model.py: Immutable, indexed model of a MySQL schema which was generated by SchemaCrawler.
+
+class FrozenDict(dict):
+	"""
+	Read-only dictionary.
+	Unlike types.MappingProxyType, it can be pickled, so schema can be sent to worker processes.
+	"""
+	def __readonly(self, *args, **kwargs):
+		raise TypeError("Schema model is read-only!")
+
+	__setitem__ = __readonly
+	__delitem__ = __readonly
+	clear = __readonly
+	pop = __readonly
+	popitem = __readonly
+	setdefault = __readonly
+	update = __readonly
+
+	def __reduce__(self):
+		return (FrozenDict, (dict(self),))
+
+class SchemaModel:
+	"""
+	Indexed model of MySQL schema.
+	It is built once from schema document (the one SchemaCrawler serialized), so every lookup afterward is O(1):
+		- columns_dict: Dict(key: <column uuid>, value: <column schema>)
+		- column_names_dict: Dict(key: <column uuid>, value: <column name>)
+		- column_tables_dict: Dict(key: <column uuid>, value: <name of table has that column>)
+		- short_name_columns_dict: Dict(key: <table name>.<column name>, value: <column schema>)
+		- tables_dict: Dict(key: <table name>, value: <table schema>)
+		- table_columns_dict: Dict(key: <table name>, value: Dict(key: <column name>, value: <MySQL column data type>)), columns are in ordinal order.
+		- table_column_schemas_dict: Dict(key: <table name>, value: Tuple[<column schema>]), columns are in ordinal order.
+		- table_primary_keys_dict: Dict(key: <table name>, value: Tuple[<primary key column name>])
+		- table_foreign_keys_dict: Dict(key: <table name>, value: Tuple[<foreign key schema>])
+		- table_indexes_dict: Dict(key: <table name>, value: Tuple[<index schema>])
+		- table_names: Tuple[<table name>], tables only.
+		- table_and_view_names: Tuple[<table or view name>]
+		- relations_dict: same as SchemaConversion.get_tables_relations()
+	Models must not be modified, all dictionaries are read-only.
+	"""
+	def __init__(self, db_schema):
+		super(SchemaModel, self).__init__()
+		all_table_columns = db_schema["all-table-columns"]
+		tables_schema = db_schema["catalog"]["tables"]
+
+		# Column data types are serialized once as object, then referenced by uuid.
+		data_types_dict = {}
+		for data_type in db_schema["catalog"].get("column-data-types", []) + db_schema["catalog"].get("system-column-data-types", []):
+			if type(data_type) is dict:
+				data_types_dict[data_type["@uuid"]] = data_type["name"].split()[0]
+		for col in all_table_columns:
+			dtype = col["column-data-type"]
+			if type(dtype) is dict:
+				data_types_dict[dtype["@uuid"]] = dtype["name"].split()[0]
+
+		columns_dict = {}
+		column_names_dict = {}
+		short_name_columns_dict = {}
+		column_dtypes_dict = {}
+		for col in all_table_columns:
+			columns_dict[col["@uuid"]] = col
+			column_names_dict[col["@uuid"]] = col["name"]
+			short_name_columns_dict[col["short-name"]] = col
+			dtype = col["column-data-type"]
+			column_dtypes_dict[col["@uuid"]] = data_types_dict[dtype["@uuid"] if type(dtype) is dict else dtype]
+
+		column_tables_dict = {}
+		tables_dict = {}
+		table_columns_dict = {}
+		table_column_schemas_dict = {}
+		table_primary_keys_dict = {}
+		table_foreign_keys_dict = {}
+		table_indexes_dict = {}
+		for table in tables_schema:
+			table_name = table["name"]
+			tables_dict[table_name] = table
+			for col_uuid in table["columns"]:
+				column_tables_dict[str(col_uuid)] = table_name
+			table_columns = [col_uuid for col_uuid in table["columns"] if col_uuid in columns_dict]
+			table_columns_dict[table_name] = FrozenDict([(column_names_dict[col_uuid], column_dtypes_dict[col_uuid]) for col_uuid in table_columns])
+			table_column_schemas_dict[table_name] = tuple([columns_dict[col_uuid] for col_uuid in table_columns])
+			indexes = tuple(filter(lambda index: type(index) is dict, table["indexes"]))
+			table_indexes_dict[table_name] = indexes
+			primary_key = table.get("primary-key")
+			if type(primary_key) is str:
+				primary_key = next(filter(lambda index: index["@uuid"] == primary_key, indexes), None)
+			table_primary_keys_dict[table_name] = tuple([column_names_dict[col_uuid] for col_uuid in primary_key["columns"]]) if primary_key is not None else ()
+			table_foreign_keys_dict[table_name] = tuple(filter(lambda foreign_key: type(foreign_key) is dict, table["foreign-keys"]))
+
+		relations_dict = {}
+		for table in tables_schema:
+			for foreign_key in table_foreign_keys_dict[table["name"]]:
+				foreign_key_uuid = foreign_key["column-references"][0]["foreign-key-column"]
+				primary_key_uuid = foreign_key["column-references"][0]["primary-key-column"]
+				relations_dict[foreign_key["@uuid"]] = FrozenDict({
+					"primary_key_table": column_tables_dict[primary_key_uuid],
+					"foreign_key_table": column_tables_dict[foreign_key_uuid],
+					"primary_key_column": column_names_dict[primary_key_uuid],
+					"foreign_key_column": column_names_dict[foreign_key_uuid],
+				})
+
+		self.columns_dict = FrozenDict(columns_dict)
+		self.column_names_dict = FrozenDict(column_names_dict)
+		self.column_tables_dict = FrozenDict(column_tables_dict)
+		self.short_name_columns_dict = FrozenDict(short_name_columns_dict)
+		self.tables_dict = FrozenDict(tables_dict)
+		self.table_columns_dict = FrozenDict(table_columns_dict)
+		self.table_column_schemas_dict = FrozenDict(table_column_schemas_dict)
+		self.table_primary_keys_dict = FrozenDict(table_primary_keys_dict)
+		self.table_foreign_keys_dict = FrozenDict(table_foreign_keys_dict)
+		self.table_indexes_dict = FrozenDict(table_indexes_dict)
+		self.table_names = tuple([table["name"] for table in tables_schema if table["remarks"] == ""])
+		self.table_and_view_names = tuple([table["name"] for table in tables_schema])
+		self.relations_dict = FrozenDict(relations_dict)
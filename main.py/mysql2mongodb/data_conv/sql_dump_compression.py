@@ -0,0 +1,75 @@
+# sql_dump_compression.py: Compressed mysqldump files (.sql.gz, .sql.bz2, .sql.zst), which are decompressed as streams, never to disk.
+
+import bz2, gzip, os
+try:
+	import zstandard
+except ImportError:
+	# zstandard is optional, only .sql.zst dumps need it.
+	zstandard = None
+
+# Compression of dump by extension which follows ".sql".
+SQL_DUMP_COMPRESSION_DICT = {"gz": "gzip", "bz2": "bz2", "zst": "zstd"}
+
+def split_sql_dump_file_name(file_name):
+	"""
+	Split file name of mysqldump, e.g. "sakila.sql" or "sakila.sql.gz", into Tuple(<schema name>, <compression or None>).
+	Return None if file name is not one of a (compressed) SQL file.
+	"""
+	name_parts = os.path.basename(file_name).split(".")
+	compression = None
+	if len(name_parts) > 2 and name_parts[-1].lower() in SQL_DUMP_COMPRESSION_DICT:
+		compression = SQL_DUMP_COMPRESSION_DICT[name_parts[-1].lower()]
+		name_parts = name_parts[:-1]
+	if len(name_parts) < 2 or name_parts[-1].lower() != "sql":
+		return None
+	return (name_parts[0], compression)
+
+def find_sql_dump_compression(file_path):
+	"""
+	Find compression of mysqldump file by its extension, None if it is not compressed.
+	"""
+	file_name_parts = split_sql_dump_file_name(file_path)
+	return file_name_parts[1] if file_name_parts is not None else None
+
+def check_sql_dump_compression(compression):
+	"""
+	Raise Exception if dumps of compression can not be decompressed here (zstandard is not installed),
+	so such dump is refused before it is downloaded.
+	"""
+	if compression == "zstd" and zstandard is None:
+		raise Exception("Package zstandard is not installed, .zst dumps can not be decompressed!")
+
+def open_decompressed_stream(byte_stream, compression):
+	"""
+	Open binary stream which decompresses byte_stream (a file, or a non-seekable stream such as a running download) while it is read.
+	Concatenated members (e.g. of pigz or pbzip2) and frames are all read. byte_stream is returned as is if compression is None.
+	"""
+	if compression is None:
+		return byte_stream
+	if compression == "gzip":
+		return gzip.GzipFile(fileobj=byte_stream, mode="rb")
+	if compression == "bz2":
+		return bz2.BZ2File(byte_stream, mode="rb")
+	if compression == "zstd":
+		check_sql_dump_compression(compression)
+		return zstandard.ZstdDecompressor().stream_reader(byte_stream, read_across_frames=True, closefd=True)
+	raise Exception(f"Compression {compression} has not been handled!")
+
+def open_sql_dump_file(file_path):
+	"""
+	Open (compressed) mysqldump file as binary stream of its SQL script, file is closed along with stream.
+	"""
+	compression = find_sql_dump_compression(file_path)
+	if compression == "gzip":
+		return gzip.open(file_path, "rb")
+	if compression == "bz2":
+		return bz2.open(file_path, "rb")
+	return open_decompressed_stream(open(file_path, "rb"), compression)
+
+def iterate_stream_chunks(byte_stream, chunk_size = 1024 * 1024):
+	"""
+	Read binary stream chunk by chunk, until its end, then close it.
+	"""
+	with byte_stream:
+		for chunk in iter(lambda: byte_stream.read(chunk_size), b""):
+			yield chunk
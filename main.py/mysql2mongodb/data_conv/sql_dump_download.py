@@ -0,0 +1,263 @@
+# sql_dump_download.py: In-process download of source dumps, with chunked streaming, HTTP range resume, content hash and progress.
+
+import hashlib, io, os, time
+import requests
+
+# Hash algorithms which are guessed by length of a hexadecimal digest without "<algorithm>:" prefix.
+HASH_ALGORITHM_BY_LENGTH = {32: "md5", 40: "sha1", 64: "sha256", 128: "sha512"}
+
+class DownloadError(Exception):
+	pass
+
+def parse_expected_hash(expected_hash):
+	"""
+	Parse expected hash of a file, as "<algorithm>:<hex digest>" (e.g. "sha256:9f86...") or a bare hex digest.
+	Return None if no (or an unrecognized) hash is given, otherwise Tuple(<algorithm>, <hex digest>).
+	"""
+	if expected_hash is None or expected_hash.strip() == "":
+		return None
+	algorithm, _, hex_digest = expected_hash.strip().rpartition(":")
+	hex_digest = hex_digest.lower()
+	if algorithm == "":
+		algorithm = HASH_ALGORITHM_BY_LENGTH.get(len(hex_digest))
+	if algorithm is None or algorithm.lower() not in hashlib.algorithms_available:
+		print(f"Hash {expected_hash} has not been handled, it is not checked!")
+		return None
+	return (algorithm.lower(), hex_digest)
+
+def get_response_validator(response):
+	"""
+	Get validator of downloaded file from response headers, which can be sent back in If-Range: a strong ETag, otherwise Last-Modified.
+	Return None if response has neither of them.
+	"""
+	etag = response.headers.get("ETag")
+	if etag is not None and not etag.startswith("W/"):
+		return etag
+	return response.headers.get("Last-Modified")
+
+def iterate_file_chunks(file_path, size, chunk_size):
+	"""
+	Read the first <size> bytes of file, chunk by chunk.
+	"""
+	with open(file_path, "rb") as f:
+		while size > 0:
+			chunk = f.read(min(chunk_size, size))
+			if len(chunk) == 0:
+				break
+			size = size - len(chunk)
+			yield chunk
+
+class ChunkReader(io.RawIOBase):
+	"""
+	Read-only binary stream over an iterator of byte chunks, so chunks (e.g. of a running download) can be read like a file.
+	"""
+	def __init__(self, chunks):
+		super(ChunkReader, self).__init__()
+		self.chunks = iter(chunks)
+		self.buffer = b""
+
+	def readable(self):
+		return True
+
+	def readinto(self, output):
+		while len(self.buffer) == 0:
+			self.buffer = next(self.chunks, None)
+			if self.buffer is None:
+				self.buffer = b""
+				return 0
+		size = min(len(output), len(self.buffer))
+		output[:size] = self.buffer[:size]
+		self.buffer = self.buffer[size:]
+		return size
+
+class FileDownload:
+	"""
+	Download of one file from URL to local path.
+	Data is received chunk by chunk and written to <file path>.part, which is renamed to <file path> when download completes.
+	Download can be consumed while it is running: iterate_chunks() yields every chunk once it is written
+	(e.g. for piping dump into mysql client or parser), complete() finishes download and returns local path.
+	Integrity:
+		- An interrupted transfer (timeout, connection error) is resumed with an HTTP Range request, at most <retries> times in a row.
+		  Data of a previous job (<file path>.part) is resumed too, if validator of file (ETag or Last-Modified, stored in <file path>.part.validator) is known.
+		- Range requests are sent with If-Range, so a file which changed on server is downloaded again from the first byte.
+		  If chunks of the old file were yielded already, download fails instead (they can not be taken back).
+		- Size is checked against Content-Length / Content-Range.
+		- Content hash (SHA-256, or algorithm of expected_hash) is computed on the fly and checked against expected_hash if it is given.
+	"""
+	def __init__(self, url, file_path, chunk_size = 1024 * 1024, timeout = 60, retries = 5, expected_hash = None):
+		super(FileDownload, self).__init__()
+		self.url = url
+		self.file_path = file_path
+		self.part_file_path = file_path + ".part"
+		self.validator_file_path = self.part_file_path + ".validator"
+		self.chunk_size = chunk_size
+		self.timeout = timeout
+		self.retries = retries
+		self.expected_hash = parse_expected_hash(expected_hash)
+		self.hex_digest = None
+		self.chunk_iterator = None
+
+	def iterate_chunks(self):
+		"""
+		Get iterator of downloaded chunks, from the first byte of file.
+		There is only one iterator per download, chunks which were consumed already are not yielded again.
+		"""
+		if self.chunk_iterator is None:
+			self.chunk_iterator = self.__download()
+		return self.chunk_iterator
+
+	def has_started(self):
+		"""
+		Check if download was started, i.e. its chunks can not be iterated from the first byte any more.
+		"""
+		return self.chunk_iterator is not None
+
+	def open_stream(self):
+		"""
+		Open download as binary file-like stream.
+		"""
+		return io.BufferedReader(ChunkReader(self.iterate_chunks()), buffer_size=self.chunk_size)
+
+	def complete(self):
+		"""
+		Finish download (consume chunks which were not consumed yet) and return local path of file.
+		"""
+		for _ in self.iterate_chunks():
+			pass
+		return self.file_path
+
+	def __read_validator(self):
+		if not os.path.isfile(self.validator_file_path):
+			return None
+		with open(self.validator_file_path, "r") as f:
+			validator = f.read().strip()
+		return validator if validator != "" else None
+
+	def __write_validator(self, validator):
+		if validator is None:
+			if os.path.isfile(self.validator_file_path):
+				os.remove(self.validator_file_path)
+			return
+		with open(self.validator_file_path, "w") as f:
+			f.write(validator)
+
+	def __remove_part_file(self):
+		for path in [self.part_file_path, self.validator_file_path]:
+			if os.path.isfile(path):
+				os.remove(path)
+
+	def __download(self):
+		tic = time.time()
+		content_hash = hashlib.new(self.expected_hash[0] if self.expected_hash is not None else "sha256")
+		offset = 0
+		os.makedirs(os.path.dirname(os.path.abspath(self.part_file_path)), exist_ok=True)
+		validator = self.__read_validator()
+		if os.path.isfile(self.part_file_path) and validator is None:
+			print(f"Data of interrupted download of {self.url} can not be validated, download it again.")
+			self.__remove_part_file()
+		if os.path.isfile(self.part_file_path):
+			# Data of an interrupted download is hashed now, but it is only yielded once server confirms that file has not changed.
+			with open(self.part_file_path, "rb") as f:
+				for chunk in iter(lambda: f.read(self.chunk_size), b""):
+					content_hash.update(chunk)
+					offset = offset + len(chunk)
+			print(f"Resume download of {self.url} from byte {offset}.")
+		# Bytes at the start of .part file which were not yielded yet.
+		unyielded_size = offset
+		total_size = None
+		failures = 0
+		progress_time = time.time()
+		with open(self.part_file_path, "ab") as part_file:
+			while total_size is None or offset < total_size:
+				# Encoded (e.g. gzip) responses are refused, since ranges and sizes must be counted in bytes of file.
+				headers = {"Accept-Encoding": "identity"}
+				if offset > 0:
+					headers["Range"] = f"bytes={offset}-"
+					if validator is not None:
+						headers["If-Range"] = validator
+				try:
+					with requests.get(self.url, headers=headers, stream=True, timeout=self.timeout) as response:
+						response_validator = get_response_validator(response)
+						if response.status_code == 416 and offset > 0:
+							# Requested range is empty: the whole file was downloaded already, if server reports the same size (Content-Range: bytes */<total size>).
+							reported_size = response.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+							file_changed = not reported_size.isdigit() or int(reported_size) != offset or (response_validator is not None and response_validator != validator)
+						else:
+							response.raise_for_status()
+							if offset == 0:
+								file_changed = False
+							elif response.status_code == 206:
+								file_changed = validator is not None and response_validator is not None and response_validator != validator
+							else:
+								# Server ignored Range, received bytes are only kept if file is known to be the same.
+								file_changed = validator is None or response_validator != validator
+						if file_changed:
+							if offset > unyielded_size:
+								self.__remove_part_file()
+								raise DownloadError(f"{self.url} changed on server while it was downloaded, download it again!")
+							print(f"{self.url} changed on server since download was interrupted, download it again.")
+							part_file.seek(0)
+							part_file.truncate()
+							content_hash = hashlib.new(content_hash.name)
+							offset = 0
+							unyielded_size = 0
+							if response.status_code != 200:
+								validator = None
+								continue
+						if offset == 0:
+							validator = response_validator
+							self.__write_validator(validator)
+						if unyielded_size > 0:
+							for chunk in iterate_file_chunks(self.part_file_path, unyielded_size, self.chunk_size):
+								yield chunk
+							unyielded_size = 0
+						if response.status_code == 416:
+							total_size = offset
+							break
+						skipped_size = 0
+						if response.status_code == 206:
+							# Content-Range: bytes <first byte>-<last byte>/<total size or *>
+							total_size = response.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+						else:
+							skipped_size = offset
+							total_size = response.headers.get("Content-Length", "")
+						total_size = int(total_size) if total_size.isdigit() else None
+						for chunk in response.iter_content(chunk_size=self.chunk_size):
+							if skipped_size > 0:
+								skipped_chunk_size = min(skipped_size, len(chunk))
+								chunk = chunk[skipped_chunk_size:]
+								skipped_size = skipped_size - skipped_chunk_size
+								if len(chunk) == 0:
+									continue
+							part_file.write(chunk)
+							content_hash.update(chunk)
+							offset = offset + len(chunk)
+							failures = 0
+							if time.time() - progress_time >= 10:
+								progress_time = time.time()
+								print(f"Downloaded {offset // (1024 * 1024)} of {total_size // (1024 * 1024) if total_size is not None else '?'} MB of {self.url}")
+							yield chunk
+						part_file.flush()
+						if total_size is not None and offset < total_size:
+							raise requests.ConnectionError("Connection was closed before end of file")
+					if total_size is None:
+						# Size is unknown, response was read until server closed it.
+						total_size = offset
+				except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+					part_file.flush()
+					failures = failures + 1
+					if failures > self.retries:
+						raise DownloadError(f"Failed while downloading {self.url}: {e}")
+					print(f"Download of {self.url} was interrupted at byte {offset} ({e}), resume it.")
+					time.sleep(min(2 ** failures, 30))
+		if offset != total_size:
+			raise DownloadError(f"Downloaded {offset} bytes of {self.url}, but expected {total_size} bytes!")
+		self.hex_digest = content_hash.hexdigest()
+		if self.expected_hash is not None and self.hex_digest != self.expected_hash[1]:
+			self.__remove_part_file()
+			raise DownloadError(f"{content_hash.name} of {self.url} is {self.hex_digest}, but expected {self.expected_hash[1]}!")
+		os.replace(self.part_file_path, self.file_path)
+		self.__write_validator(None)
+		toc = time.time()
+		time_taken = round((toc-tic)*1000, 1)
+		print(f"Time for downloading {self.url} ({offset} bytes, {content_hash.name} {self.hex_digest}): {time_taken}")
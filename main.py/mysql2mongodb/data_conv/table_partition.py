@@ -0,0 +1,91 @@
+# table_partition.py: Split a MySQL table into contiguous primary key slices, so one table can be migrated by several workers.
+
+def split_numeric_key_range(min_key, max_key, partitions):
+	"""
+	Split numeric range [min_key, max_key] into (at most) <partitions> contiguous sub-ranges.
+	Return list of boundaries, each boundary is the first key of a sub-range (except the first sub-range).
+	"""
+	if min_key is None or max_key is None or partitions <= 1:
+		return []
+	step = -(-(max_key - min_key + 1) // partitions)
+	boundaries = []
+	for i in range(1, partitions):
+		boundary = min_key + i * step
+		if boundary > max_key:
+			break
+		boundaries.append(boundary)
+	return boundaries
+
+def fetch_numeric_key_boundaries(mysql_cursor, table_name, key_column, partitions):
+	"""
+	Find boundaries of numeric primary key ranges by using MIN and MAX of key, which are read from primary index.
+	"""
+	mysql_cursor.execute(f"SELECT MIN(`{key_column}`), MAX(`{key_column}`) FROM `{table_name}`")
+	min_key, max_key = mysql_cursor.fetchone()
+	return [(boundary,) for boundary in split_numeric_key_range(min_key, max_key, partitions)]
+
+def fetch_keyset_boundaries(mysql_cursor, table_name, key_columns, partitions, rows_num):
+	"""
+	Find boundaries of primary key pages by reading every <rows_num / partitions>-th key in key order.
+	This works with any (non-numeric or composite) primary key.
+	Every page is read from the previous boundary, so primary index is scanned once for all boundaries.
+	"""
+	if partitions <= 1:
+		return []
+	page_size = -(-rows_num // partitions)
+	key_sql = ", ".join([f"`{col}`" for col in key_columns])
+	placeholder_sql = ", ".join(["%s"] * len(key_columns))
+	boundaries = []
+	for i in range(1, partitions):
+		if len(boundaries) == 0:
+			mysql_cursor.execute(f"SELECT {key_sql} FROM `{table_name}` ORDER BY {key_sql} LIMIT 1 OFFSET {page_size}")
+		else:
+			mysql_cursor.execute(f"SELECT {key_sql} FROM `{table_name}` WHERE ({key_sql}) >= ({placeholder_sql}) ORDER BY {key_sql} LIMIT 1 OFFSET {page_size}", boundaries[-1])
+		row = mysql_cursor.fetchone()
+		if row is None:
+			break
+		boundaries.append(tuple(row))
+	return boundaries
+
+def generate_primary_key_slices(key_columns, boundaries):
+	"""
+	Generate slices of table from list of key boundaries.
+	Slices are contiguous and cover the whole table: (-inf, b1), [b1, b2), ..., [bn, +inf).
+	Each slice looks like:
+		Dict(
+			"condition": <SQL condition with %s placeholders>,
+			"params": <tuple of condition params>
+		)
+	"""
+	if len(boundaries) == 0:
+		return [None]
+	key_sql = "(" + ", ".join([f"`{col}`" for col in key_columns]) + ")"
+	placeholder_sql = "(" + ", ".join(["%s"] * len(key_columns)) + ")"
+	slices = [{"condition": f"{key_sql} < {placeholder_sql}", "params": tuple(boundaries[0])}]
+	for lower, upper in zip(boundaries[:-1], boundaries[1:]):
+		slices.append({
+			"condition": f"{key_sql} >= {placeholder_sql} AND {key_sql} < {placeholder_sql}",
+			"params": tuple(lower) + tuple(upper)
+		})
+	slices.append({"condition": f"{key_sql} >= {placeholder_sql}", "params": tuple(boundaries[-1])})
+	return slices
+
+def get_primary_key_slices(mysql_connection, table_name, key_columns, numeric_key, partitions, rows_num):
+	"""
+	Split table into <partitions> contiguous primary key slices.
+	Params:
+		key_columns: List of primary key columns name.
+		numeric_key: True if primary key is a single integer column, then table is split by key range, otherwise by keyset pages.
+		partitions: Expected number of slices.
+		rows_num: (Estimated) number of rows of table, used for keyset pages.
+	Return [None] if table can not be split, which means the whole table.
+	"""
+	if partitions <= 1 or len(key_columns) == 0:
+		return [None]
+	mysql_cursor = mysql_connection.cursor(buffered=True)
+	if numeric_key and len(key_columns) == 1:
+		boundaries = fetch_numeric_key_boundaries(mysql_cursor, table_name, key_columns[0], partitions)
+	else:
+		boundaries = fetch_keyset_boundaries(mysql_cursor, table_name, key_columns, partitions, rows_num)
+	mysql_cursor.close()
+	return generate_primary_key_slices(key_columns, boundaries)
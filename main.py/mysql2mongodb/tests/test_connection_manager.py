@@ -0,0 +1,70 @@
+"""Tests for shared MySQL connections of connection_manager.py, with connections which do not talk to a server."""
+import mysql.connector
+import mysql.connector.pooling
+from mysql.connector.connection import MySQLConnection
+
+import pytest
+
+from ckanext.mysql2mongodb.data_conv.connection_manager import ConnectionManager, get_active_connection_manager
+from ckanext.mysql2mongodb.data_conv.utilities import open_connection_mysql
+
+class FakeMySQLConnection(MySQLConnection):
+	"""
+	MySQL connection which is "connected" once it is created with connection arguments, every such connection is recorded.
+	"""
+	opened_list = []
+
+	def __init__(self, **kwargs):
+		super(FakeMySQLConnection, self).__init__()
+		self.connected = len(kwargs) > 0
+		if self.connected:
+			FakeMySQLConnection.opened_list.append(self)
+
+	def is_connected(self):
+		return self.connected
+
+	def reset_session(self, *args, **kwargs):
+		pass
+
+	def get_server_info(self):
+		return "8.0.22"
+
+	def disconnect(self):
+		self.connected = False
+
+	close = disconnect
+
+@pytest.fixture
+def fake_mysql(monkeypatch):
+	FakeMySQLConnection.opened_list = []
+	monkeypatch.setattr(mysql.connector.pooling, "Connect", FakeMySQLConnection)
+	monkeypatch.setattr(mysql.connector, "connect", FakeMySQLConnection)
+	return FakeMySQLConnection.opened_list
+
+def test_pooled_connection_is_reused(fake_mysql):
+	connection_manager = ConnectionManager(mysql_pool_size=1).open()
+	try:
+		assert get_active_connection_manager() is connection_manager
+		mysql_connection = open_connection_mysql("localhost", "user", "password", "sakila")
+		assert len(fake_mysql) == 1
+		server_info = mysql_connection.get_server_info()
+		mysql_connection.close()
+		# Connection was given back to pool, the next one is the same.
+		mysql_connection = open_connection_mysql("localhost", "user", "password", "sakila")
+		assert mysql_connection.get_server_info() == server_info
+		assert len(fake_mysql) == 1
+		# Pool is exhausted, so a new connection is opened.
+		other_mysql_connection = open_connection_mysql("localhost", "user", "password", "sakila")
+		assert len(fake_mysql) == 2 and other_mysql_connection is fake_mysql[1]
+		other_mysql_connection.close()
+		mysql_connection.close()
+	finally:
+		connection_manager.close()
+	assert get_active_connection_manager() is None
+	assert [connection.is_connected() for connection in fake_mysql] == [False, False]
+
+def test_connections_are_not_pooled_without_job(fake_mysql):
+	mysql_connection = open_connection_mysql("localhost", "user", "password", "sakila")
+	assert mysql_connection is fake_mysql[0]
+	mysql_connection.close()
+	assert open_connection_mysql("localhost", "user", "password", "sakila") is fake_mysql[1]
@@ -0,0 +1,34 @@
+"""Tests for splitting documents into batches of utilities.py."""
+import bson
+
+from ckanext.mysql2mongodb.data_conv.utilities import split_documents_into_batches
+
+def generate_mixed_documents():
+	# A tiny document first, then big ones, so the first size says nothing about the rest.
+	yield {"_id": 0}
+	for doc_idx in range(1, 201):
+		yield {"_id": doc_idx, "payload": "x" * (100000 + doc_idx)}
+	yield {"_id": 201, "payload": "y" * 2500000}
+	yield {"_id": 202}
+
+def test_batches_are_bounded_by_bytes():
+	documents = list(generate_mixed_documents())
+	batches = list(split_documents_into_batches(iter(documents), batch_bytes=1000000))
+	assert [doc for batch, _ in batches for doc in batch] == documents
+	assert len(batches) > 1
+	for batch, batch_size_in_bytes in batches:
+		assert batch_size_in_bytes == sum(len(bson.encode(doc)) for doc in batch)
+		# Only a document bigger than batch_bytes may exceed it, alone in its batch.
+		assert batch_size_in_bytes <= 1000000 or len(batch) == 1
+	assert [batch for batch, _ in batches if len(batch) == 1 and batch[0]["_id"] == 201] != []
+
+def test_batches_are_bounded_by_number_and_bytes():
+	documents = list(generate_mixed_documents())
+	batches = list(split_documents_into_batches(documents, batch_size=4, batch_bytes=1000000))
+	assert [doc for batch, _ in batches for doc in batch] == documents
+	assert all(len(batch) <= 4 and batch_size_in_bytes <= 1000000 or len(batch) == 1 for batch, batch_size_in_bytes in batches)
+	assert [len(batch) for batch, _ in batches][:2] == [4, 4]
+
+def test_batches_without_bytes_cap():
+	batches = list(split_documents_into_batches(range(10), batch_size=3))
+	assert batches == [([0, 1, 2], None), ([3, 4, 5], None), ([6, 7, 8], None), ([9], None)]
@@ -0,0 +1,22 @@
+"""Tests for LOAD DATA LOCAL INFILE files of load_data_infile.py."""
+import io
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from ckanext.mysql2mongodb.data_conv.load_data_infile import generate_sql_loading_data, write_load_data_file
+
+def test_write_load_data_file():
+	f = io.BytesIO()
+	write_load_data_file([
+		(1, "a\tb\\c\nd", None, Decimal("1.50"), b"\x00\xff", True),
+		(2, datetime(2021, 1, 2, 3, 4, 5), date(2021, 1, 2), timedelta(days=-1, seconds=1), 0.1, ""),
+	], f)
+	assert f.getvalue() == (
+		b"1\ta\\tb\\\\c\\nd\t\\N\t1.50\t\\0\xff\t1\n"
+		b"2\t2021-01-02 03:04:05\t2021-01-02\t-23:59:59.000000\t0.1\t\n"
+	)
+
+def test_generate_sql_loading_data():
+	sql = generate_sql_loading_data("address", ["address_id", "location"], ["location"])
+	assert sql.startswith("LOAD DATA LOCAL INFILE '{file_path}' IGNORE INTO TABLE address CHARACTER SET binary")
+	assert sql.endswith("(`address_id`, @col_1) SET `location` = ST_GeomFromText(@col_1)")
@@ -0,0 +1,67 @@
+"""Tests for read-only indexes of schema_model.py."""
+import pickle
+
+import pytest
+
+from ckanext.mysql2mongodb.data_conv.schema_model import FrozenDict, SchemaModel
+from ckanext.mysql2mongodb.tests.test_schema_view import generate_synthetic_schema
+
+def test_frozen_dict_is_read_only():
+	frozen_dict = FrozenDict({"a": 1, "b": FrozenDict({"c": 2})})
+	assert frozen_dict["a"] == 1 and frozen_dict.get("x") is None and dict(frozen_dict) == {"a": 1, "b": {"c": 2}}
+	for modify in [
+		lambda: frozen_dict.__setitem__("a", 2),
+		lambda: frozen_dict.__delitem__("a"),
+		lambda: frozen_dict.clear(),
+		lambda: frozen_dict.pop("a"),
+		lambda: frozen_dict.popitem(),
+		lambda: frozen_dict.setdefault("x", 3),
+		lambda: frozen_dict.update({"x": 3}),
+		lambda: frozen_dict["b"].__setitem__("c", 3),
+	]:
+		with pytest.raises(TypeError):
+			modify()
+	assert frozen_dict == {"a": 1, "b": {"c": 2}}
+
+def test_frozen_dict_can_be_pickled():
+	frozen_dict = pickle.loads(pickle.dumps(FrozenDict({"a": (1, 2), "b": FrozenDict({"c": 2})})))
+	assert type(frozen_dict) is FrozenDict and type(frozen_dict["b"]) is FrozenDict
+	assert frozen_dict == {"a": (1, 2), "b": {"c": 2}}
+	with pytest.raises(TypeError):
+		frozen_dict["a"] = 1
+
+def test_schema_model_indexes():
+	db_schema = generate_synthetic_schema(3, 4)
+	# A view, whose primary key is serialized inline and whose column data type is declared in catalog.
+	db_schema["catalog"]["column-data-types"] = [{"@uuid": "dtype-text", "name": "TEXT CHARACTER SET utf8mb4"}]
+	db_schema["all-table-columns"].append({"@uuid": "col-view-0", "name": "title", "short-name": "view_0.title", "column-data-type": "dtype-text"})
+	db_schema["catalog"]["tables"].append({
+		"name": "view_0",
+		"remarks": "VIEW",
+		"columns": ["col-view-0"],
+		"primary-key": {"@uuid": "pk-view", "columns": ["col-view-0"]},
+		"indexes": [],
+		"foreign-keys": [],
+	})
+	schema_model = SchemaModel(db_schema)
+	assert schema_model.table_names == ("table_0", "table_1", "table_2")
+	assert schema_model.table_and_view_names == ("table_0", "table_1", "table_2", "view_0")
+	assert schema_model.table_columns_dict["table_1"] == {"col_0": "INT", "col_1": "INT", "col_2": "INT", "col_3": "INT"}
+	assert list(schema_model.table_columns_dict["table_1"].keys()) == ["col_0", "col_1", "col_2", "col_3"]
+	assert schema_model.table_columns_dict["view_0"] == {"title": "TEXT"}
+	assert [col["@uuid"] for col in schema_model.table_column_schemas_dict["table_2"]] == ["col-2-0", "col-2-1", "col-2-2", "col-2-3"]
+	assert schema_model.column_names_dict["col-2-3"] == "col_3"
+	assert schema_model.column_tables_dict["col-2-3"] == "table_2"
+	assert schema_model.short_name_columns_dict["table_2.col_3"] is schema_model.columns_dict["col-2-3"]
+	assert schema_model.tables_dict["view_0"]["remarks"] == "VIEW"
+	assert schema_model.table_primary_keys_dict == {"table_0": ("col_0",), "table_1": ("col_0",), "table_2": ("col_0",), "view_0": ("title",)}
+	assert [index["name"] for index in schema_model.table_indexes_dict["table_0"]] == ["PRIMARY", "idx_0"]
+	assert [foreign_key["name"] for foreign_key in schema_model.table_foreign_keys_dict["table_2"]] == ["fk_2"]
+	assert schema_model.table_foreign_keys_dict["table_0"] == ()
+	assert schema_model.relations_dict == {
+		"fk-1": {"primary_key_table": "table_0", "foreign_key_table": "table_1", "primary_key_column": "col_0", "foreign_key_column": "col_1"},
+		"fk-2": {"primary_key_table": "table_1", "foreign_key_table": "table_2", "primary_key_column": "col_0", "foreign_key_column": "col_1"},
+	}
+	for index_dict in [schema_model.columns_dict, schema_model.table_columns_dict, schema_model.table_columns_dict["table_0"], schema_model.relations_dict["fk-1"]]:
+		with pytest.raises(TypeError):
+			index_dict["x"] = None
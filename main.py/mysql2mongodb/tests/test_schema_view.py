@@ -0,0 +1,112 @@
+"""Tests for schema view generation of schema_conversion.py."""
+from ckanext.mysql2mongodb.data_conv.schema_conversion import SchemaConversion
+from ckanext.mysql2mongodb.data_conv.schema_model import SchemaModel
+
+class CountingColumn(dict):
+	"""
+	Column schema which counts how many times its fields are read, by all columns together.
+	"""
+	lookups_num = 0
+
+	def __getitem__(self, key):
+		CountingColumn.lookups_num = CountingColumn.lookups_num + 1
+		return super(CountingColumn, self).__getitem__(key)
+
+def generate_synthetic_schema(tables_num, columns_num):
+	"""
+	Generate a SchemaCrawler-like schema with <tables_num> tables, each has <columns_num> columns,
+	a primary key, a two-column index and a foreign key to the previous table.
+	"""
+	all_table_columns = []
+	tables = []
+	for table_idx in range(tables_num):
+		table_name = f"table_{table_idx}"
+		column_uuids = []
+		for col_idx in range(columns_num):
+			col_uuid = f"col-{table_idx}-{col_idx}"
+			column_uuids.append(col_uuid)
+			all_table_columns.append(CountingColumn({
+				"@uuid": col_uuid,
+				"name": f"col_{col_idx}",
+				"short-name": f"{table_name}.col_{col_idx}",
+				"column-data-type": {"@uuid": "dtype-int", "name": "INT"} if table_idx == 0 and col_idx == 0 else "dtype-int",
+				"attributes": {
+					"CHARACTER_SET_NAME": None,
+					"COLLATION_NAME": None,
+					"COLUMN_TYPE": "int",
+					"IS_NULLABLE": "NO",
+				},
+				"auto-incremented": col_idx == 0,
+				"nullable": col_idx != 0,
+				"default-value": None,
+			}))
+		foreign_keys = []
+		if table_idx > 0:
+			foreign_keys.append({
+				"@uuid": f"fk-{table_idx}",
+				"name": f"fk_{table_idx}",
+				"column-references": [{
+					"key-sequence": 1,
+					"foreign-key-column": f"col-{table_idx}-1",
+					"primary-key-column": f"col-{table_idx - 1}-0",
+				}],
+				"delete-rule": "restrict",
+				"update-rule": "cascade",
+			})
+		tables.append({
+			"name": table_name,
+			"remarks": "",
+			"attributes": {"ENGINE": "InnoDB", "TABLE_COLLATION": "utf8mb4_0900_ai_ci"},
+			"table-constraints": [],
+			"triggers": [],
+			"columns": column_uuids,
+			"primary-key": f"pk-{table_idx}",
+			"indexes": [
+				{"@uuid": f"pk-{table_idx}", "name": "PRIMARY", "unique": True, "columns": [column_uuids[0]]},
+				{"@uuid": f"idx-{table_idx}", "name": f"idx_{table_idx}", "unique": False, "columns": [column_uuids[2], column_uuids[1]]},
+			],
+			"foreign-keys": foreign_keys,
+		})
+	return {
+		"catalog": {
+			"name": "synthetic",
+			"database-info": {"product-name": "MySQL", "product-version": "8.0.22"},
+			"tables": tables,
+		},
+		"all-table-columns": all_table_columns,
+	}
+
+def build_schema_conversion(db_schema):
+	schema_conv = SchemaConversion()
+	# Schema is loaded already, so load_schema() will not read it from MongoDB.
+	schema_conv.db_schema = db_schema
+	schema_conv.schema_model = SchemaModel(db_schema)
+	return schema_conv
+
+def count_schema_view_lookups(tables_num, columns_num):
+	schema_conv = build_schema_conversion(generate_synthetic_schema(tables_num, columns_num))
+	CountingColumn.lookups_num = 0
+	schema_conv.generate_schema_view()
+	return CountingColumn.lookups_num
+
+def test_generate_schema_view():
+	converted_schema = build_schema_conversion(generate_synthetic_schema(3, 4)).generate_schema_view()
+	assert [table["name"] for table in converted_schema["tables"]] == ["table_0", "table_1", "table_2"]
+	assert [col["name"] for col in converted_schema["tables"][1]["columns"]] == ["col_0", "col_1", "col_2", "col_3"]
+	assert converted_schema["tables"][1]["indexes"][1]["columns"] == [
+		{"name": "col_2", "table": "table_1"},
+		{"name": "col_1", "table": "table_1"},
+	]
+	assert len(converted_schema["foreign-keys"]) == 2
+	assert converted_schema["foreign-keys"][0]["column-references"][0]["primary-key-table"] == "table_0"
+	assert converted_schema["foreign-keys"][0]["column-references"][0]["foreign-key-column"] == "col_1"
+
+def test_schema_view_scales_linearly():
+	"""
+	Every table of synthetic catalog has the same shape, so a linear implementation reads the same number of column fields per added table:
+	going from 100 to 200 tables costs exactly twice as much as going from 50 to 100 tables.
+	A quadratic implementation (like the former scan of all columns per table) would read more fields per table as catalog grows.
+	"""
+	columns_num = 30
+	lookups_num_list = [count_schema_view_lookups(tables_num, columns_num) for tables_num in (50, 100, 200)]
+	assert lookups_num_list[2] - lookups_num_list[1] == 2 * (lookups_num_list[1] - lookups_num_list[0])
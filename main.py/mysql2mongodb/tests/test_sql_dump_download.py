@@ -0,0 +1,141 @@
+"""Tests for resumable downloads of sql_dump_download.py, against a local HTTP server."""
+import hashlib, http.server, os, threading
+
+import pytest
+
+from ckanext.mysql2mongodb.data_conv import sql_dump_download
+from ckanext.mysql2mongodb.data_conv.sql_dump_download import DownloadError, FileDownload
+
+DATA = bytes(range(256)) * 1200
+
+class DumpRequestHandler(http.server.BaseHTTPRequestHandler):
+	"""
+	Serve server.data with Range and If-Range support, which can be turned off or broken by server.state:
+		- "ranges": False makes server ignore Range (always 200).
+		- "fail_after": Number of bytes after which the next response is cut off.
+		- "extra_length": Bytes which are announced in Content-Length but never sent.
+	"""
+	protocol_version = "HTTP/1.1"
+
+	def log_message(self, *args):
+		pass
+
+	def do_GET(self):
+		state = self.server.state
+		data = self.server.data
+		state["requests"].append(dict(self.headers))
+		start = 0
+		range_header = self.headers.get("Range")
+		if_range = self.headers.get("If-Range")
+		if range_header is not None and state["ranges"] and (if_range is None or if_range == state["etag"]):
+			start = int(range_header.split("=")[1].split("-")[0])
+			if start >= len(data):
+				self.send_response(416)
+				self.send_header("Content-Range", f"bytes */{len(data)}")
+				self.send_header("Content-Length", "0")
+				self.end_headers()
+				return
+			self.send_response(206)
+			self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+		else:
+			self.send_response(200)
+		body = data[start:]
+		self.send_header("ETag", state["etag"])
+		self.send_header("Content-Length", str(len(body) + state["extra_length"]))
+		self.end_headers()
+		fail_after = state["fail_after"]
+		if fail_after is not None or state["extra_length"] > 0:
+			state["fail_after"] = None
+			self.wfile.write(body[:fail_after])
+			self.wfile.flush()
+			self.close_connection = True
+			return
+		self.wfile.write(body)
+
+@pytest.fixture
+def dump_server(monkeypatch):
+	monkeypatch.setattr(sql_dump_download.time, "sleep", lambda seconds: None)
+	server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), DumpRequestHandler)
+	# Client drops some responses on purpose, server must not report them.
+	server.handle_error = lambda request, client_address: None
+	server.data = DATA
+	server.state = {"ranges": True, "fail_after": None, "extra_length": 0, "etag": '"v1"', "requests": []}
+	server.url = f"http://127.0.0.1:{server.server_port}/dump.sql"
+	thread = threading.Thread(target=server.serve_forever, daemon=True)
+	thread.start()
+	yield server
+	server.shutdown()
+	server.server_close()
+
+def test_download_resumes_with_range(dump_server, tmp_path):
+	dump_server.state["fail_after"] = 6 * 16384
+	file_path = str(tmp_path / "dump.sql")
+	download = FileDownload(dump_server.url, file_path, chunk_size=16384, expected_hash="sha256:" + hashlib.sha256(DATA).hexdigest())
+	assert download.open_stream().read() == DATA
+	assert download.complete() == file_path
+	with open(file_path, "rb") as f:
+		assert f.read() == DATA
+	assert not os.path.exists(file_path + ".part") and not os.path.exists(file_path + ".part.validator")
+	resumed_request = dump_server.state["requests"][-1]
+	assert resumed_request["Range"] == f"bytes={6 * 16384}-" and resumed_request["If-Range"] == '"v1"'
+
+def test_download_resumes_when_server_ignores_range(dump_server, tmp_path):
+	dump_server.state["ranges"] = False
+	dump_server.state["fail_after"] = 123457
+	download = FileDownload(dump_server.url, str(tmp_path / "dump.sql"), chunk_size=16384)
+	assert b"".join(download.iterate_chunks()) == DATA
+	assert download.hex_digest == hashlib.sha256(DATA).hexdigest()
+
+def test_download_fails_when_file_changes_while_it_is_streamed(dump_server, tmp_path):
+	dump_server.state["fail_after"] = 100000
+	file_path = str(tmp_path / "dump.sql")
+	chunks = FileDownload(dump_server.url, file_path, chunk_size=16384).iterate_chunks()
+	next(chunks)
+	dump_server.state["etag"] = '"v2"'
+	with pytest.raises(DownloadError):
+		for _ in chunks:
+			pass
+	assert not os.path.exists(file_path + ".part")
+
+def test_download_discards_part_of_changed_file(dump_server, tmp_path):
+	file_path = str(tmp_path / "dump.sql")
+	with open(file_path + ".part", "wb") as f:
+		f.write(b"old" * 1000)
+	with open(file_path + ".part.validator", "w") as f:
+		f.write('"v0"')
+	assert FileDownload(dump_server.url, file_path).open_stream().read() == DATA
+	with open(file_path, "rb") as f:
+		assert f.read() == DATA
+
+def test_download_416(dump_server, tmp_path):
+	# The whole file was downloaded by a previous job, server confirms its size.
+	file_path = str(tmp_path / "complete.sql")
+	with open(file_path + ".part", "wb") as f:
+		f.write(DATA)
+	with open(file_path + ".part.validator", "w") as f:
+		f.write('"v1"')
+	assert FileDownload(dump_server.url, file_path).open_stream().read() == DATA
+	assert dump_server.state["requests"][-1]["Range"] == f"bytes={len(DATA)}-"
+	# .part is longer than file on server, so it is not complete but stale.
+	file_path = str(tmp_path / "stale.sql")
+	with open(file_path + ".part", "wb") as f:
+		f.write(DATA + b"stale")
+	with open(file_path + ".part.validator", "w") as f:
+		f.write('"v1"')
+	assert FileDownload(dump_server.url, file_path).open_stream().read() == DATA
+	with open(file_path, "rb") as f:
+		assert f.read() == DATA
+
+def test_download_length_mismatch(dump_server, tmp_path):
+	dump_server.state["ranges"] = False
+	dump_server.state["extra_length"] = 10
+	file_path = str(tmp_path / "dump.sql")
+	with pytest.raises(DownloadError):
+		FileDownload(dump_server.url, file_path, retries=1).complete()
+	assert not os.path.exists(file_path)
+
+def test_download_hash_mismatch(dump_server, tmp_path):
+	file_path = str(tmp_path / "dump.sql")
+	with pytest.raises(DownloadError):
+		FileDownload(dump_server.url, file_path, expected_hash="0" * 64).complete()
+	assert not os.path.exists(file_path) and not os.path.exists(file_path + ".part")
@@ -0,0 +1,26 @@
+"""Tests for checksum comparison of table copies of table_checksum.py."""
+from collections import Counter
+from datetime import date
+from decimal import Decimal
+
+from ckanext.mysql2mongodb.data_conv.table_checksum import compare_slice_row_hashes, generate_sql_row_hash
+
+def test_generate_sql_row_hash():
+	assert generate_sql_row_hash(["id", "name"]) == "CAST(CONV(LEFT(MD5(CONCAT_WS('#', `id`, `name`, CONCAT(ISNULL(`id`), ISNULL(`name`)))), 16), 16, 10) AS UNSIGNED)"
+
+def test_compare_slice_row_hashes():
+	difference_list = compare_slice_row_hashes(
+		{(1,): 10, (2,): 20, (Decimal("3.5"), date(2021, 1, 2)): 30},
+		{(1,): 10, (2,): 21, (4,): 40},
+	)
+	assert sorted(difference_list, key=lambda difference: difference["difference"]) == [
+		{"key": [2], "difference": "changed"},
+		{"key": [4], "difference": "extra"},
+		{"key": ["3.5", "2021-01-02"], "difference": "missing"},
+	]
+
+def test_compare_slice_row_hashes_without_primary_key():
+	assert compare_slice_row_hashes(Counter([1, 1, 2]), Counter([1, 2, 2, 3])) == [
+		{"count": 1, "difference": "missing"},
+		{"count": 2, "difference": "extra"},
+	]
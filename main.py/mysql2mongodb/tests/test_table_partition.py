@@ -0,0 +1,92 @@
+"""Tests for splitting tables into primary key slices of table_partition.py."""
+import re
+
+from ckanext.mysql2mongodb.data_conv.table_partition import fetch_keyset_boundaries, generate_primary_key_slices, get_primary_key_slices, split_numeric_key_range
+
+class FakeKeyCursor:
+	"""
+	Cursor which answers the MIN/MAX and keyset page queries of table_partition.py from a list of key tuples.
+	"""
+	def __init__(self, key_list):
+		self.key_list = sorted(key_list)
+		self.row = None
+		self.query_list = []
+
+	def execute(self, query, params = None):
+		self.query_list.append((query, params))
+		if query.startswith("SELECT MIN("):
+			self.row = (self.key_list[0][0], self.key_list[-1][0]) if len(self.key_list) > 0 else (None, None)
+			return
+		offset = int(re.search(r"OFFSET (\d+)$", query).group(1))
+		key_list = [key for key in self.key_list if params is None or key >= tuple(params)]
+		self.row = key_list[offset] if offset < len(key_list) else None
+
+	def fetchone(self):
+		return self.row
+
+	def close(self):
+		pass
+
+class FakeKeyConnection:
+	def __init__(self, key_list):
+		self.key_list = key_list
+
+	def cursor(self, buffered = False):
+		return FakeKeyCursor(self.key_list)
+
+def key_in_slice(key, key_slice):
+	# Evaluate condition of a slice generated by generate_primary_key_slices() for one key.
+	if key_slice is None:
+		return True
+	params = key_slice["params"]
+	if " AND " in key_slice["condition"]:
+		return tuple(params[:len(key)]) <= key < tuple(params[len(key):])
+	if " < " in key_slice["condition"]:
+		return key < tuple(params)
+	return key >= tuple(params)
+
+def assert_slices_cover_keys(key_list, slices):
+	# Every key falls in exactly one slice, so there is neither gap nor overlap.
+	for key in key_list:
+		assert len([key_slice for key_slice in slices if key_in_slice(key, key_slice)]) == 1, key
+
+def test_split_numeric_key_range():
+	assert split_numeric_key_range(1, 100, 4) == [26, 51, 76]
+	assert split_numeric_key_range(1, 3, 8) == [2, 3]
+	assert split_numeric_key_range(5, 5, 4) == []
+	assert split_numeric_key_range(None, None, 4) == []
+	assert split_numeric_key_range(1, 100, 1) == []
+	for min_key, max_key, partitions in [(1, 100, 4), (-7, 13, 3), (0, 1000, 7), (10, 12, 5), (1, 2, 32)]:
+		boundaries = split_numeric_key_range(min_key, max_key, partitions)
+		assert len(boundaries) < partitions
+		assert boundaries == sorted(set(boundaries))
+		assert all(min_key < boundary <= max_key for boundary in boundaries)
+		key_list = [(key,) for key in range(min_key, max_key + 1)]
+		assert_slices_cover_keys(key_list, generate_primary_key_slices(["id"], [(boundary,) for boundary in boundaries]))
+
+def test_numeric_key_slices():
+	key_list = [(key,) for key in range(3, 1000, 7)]
+	connection = FakeKeyConnection(key_list)
+	slices = get_primary_key_slices(connection, "payment", ["payment_id"], True, 4, len(key_list))
+	assert len(slices) == 4
+	assert slices[0] == {"condition": "(`payment_id`) < (%s)", "params": (252,)}
+	assert slices[-1] == {"condition": "(`payment_id`) >= (%s)", "params": (750,)}
+	assert_slices_cover_keys(key_list, slices)
+
+def test_keyset_boundaries():
+	key_list = [(store_id, name) for store_id in range(1, 4) for name in ["a", "b", "c", "d"]]
+	cursor = FakeKeyCursor(key_list)
+	boundaries = fetch_keyset_boundaries(cursor, "inventory", ["store_id", "name"], 3, len(key_list))
+	assert boundaries == [(2, "a"), (3, "a")]
+	# Every page after the first one is read from the previous boundary.
+	assert cursor.query_list[1] == ("SELECT `store_id`, `name` FROM `inventory` WHERE (`store_id`, `name`) >= (%s, %s) ORDER BY `store_id`, `name` LIMIT 1 OFFSET 4", (2, "a"))
+	slices = generate_primary_key_slices(["store_id", "name"], boundaries)
+	assert slices[1] == {"condition": "(`store_id`, `name`) >= (%s, %s) AND (`store_id`, `name`) < (%s, %s)", "params": (2, "a", 3, "a")}
+	assert_slices_cover_keys(key_list, slices)
+	assert [len([key for key in key_list if key_in_slice(key, key_slice)]) for key_slice in slices] == [4, 4, 4]
+
+def test_keyset_boundaries_of_small_table():
+	key_list = [("x",), ("y",)]
+	assert fetch_keyset_boundaries(FakeKeyCursor(key_list), "language", ["name"], 4, 10) == []
+	assert get_primary_key_slices(FakeKeyConnection(key_list), "language", ["name"], False, 4, 10) == [None]
+	assert get_primary_key_slices(FakeKeyConnection(key_list), "language", [], False, 4, 10) == [None]